@@ -5,15 +5,26 @@ A Flask web application for finding eco-friendly travel routes with emissions ca
 """
 
 import os
+import hashlib
 import logging
 from typing import Dict, List, Optional, Tuple
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import (
+    Flask, Response, render_template, request, jsonify, flash, redirect, url_for,
+    stream_with_context
+)
 from werkzeug.exceptions import BadRequest
 from config import DevelopmentConfig
-from services.route_service import RouteService
-from services.emissions_service import EmissionsService
-from utils.validators import validate_location_input
-from utils.exceptions import RouteFinderException, ValidationError
+from services.route_service import Location, RouteService, format_location
+from services.emissions_service import EmissionsService, thaw
+from services.cache import create_cache, create_redis_client
+from services.concurrency import Deadline
+from services.gazetteer import LocalGeocoder, SuggestionIndex, load_gazetteer
+from services.routing_engine import create_routing_engine
+from services.geometry import GEOMETRY_FORMATS, encode_geometry, simplify_for_display
+from utils.compression import init_compression
+from utils.json_provider import RouteJSONProvider
+from utils.validators import validate_coordinates, validate_location_input
+from utils.exceptions import DeadlineExceededError, RouteFinderException, ValidationError
 
 # Configure logging
 logging.basicConfig(
@@ -22,14 +33,308 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+EVENT_STREAM_MIMETYPE = 'text/event-stream'
+
+def parse_location(value, field_name: str) -> Location:
+    """
+    Extract a location given as text or as a {"lat": ..., "lon": ...} object.
+    
+    Args:
+        value: JSON value of the field
+        field_name: Name of the field for error messages
+        
+    Returns:
+        Cleaned location string, or (longitude, latitude) coordinates
+        
+    Raises:
+        ValidationError: If the location or coordinates are invalid
+    """
+    if isinstance(value, dict):
+        latitude, longitude = validate_coordinates(value.get('lat'), value.get('lon'))
+        return longitude, latitude
+    if value and not isinstance(value, str):
+        raise ValidationError(f"{field_name.title()} must be a string or a lat/lon object")
+    return validate_location_input((value or '').strip(), field_name)
+
+def parse_form_location(form: Dict, field_name: str) -> Location:
+    """
+    Extract a location from form fields.
+    
+    Coordinates in <field>_lat and <field>_lon take precedence over the
+    free-text <field>.
+    
+    Args:
+        form: Submitted form data
+        field_name: Name of the location field
+        
+    Returns:
+        Cleaned location string, or (longitude, latitude) coordinates
+        
+    Raises:
+        ValidationError: If the location or coordinates are invalid
+    """
+    latitude = form.get(f'{field_name}_lat', '').strip()
+    longitude = form.get(f'{field_name}_lon', '').strip()
+    if latitude or longitude:
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except ValueError:
+            raise ValidationError("Coordinates must be numeric")
+        latitude, longitude = validate_coordinates(latitude, longitude)
+        return longitude, latitude
+    return validate_location_input(form.get(field_name, '').strip(), field_name)
+
+def parse_vehicle(data: Dict) -> Tuple[str, str]:
+    """
+    Extract the optional vehicle type and model from a JSON object.
+    
+    Args:
+        data: JSON object with optional vehicle_type/vehicle_model
+        
+    Returns:
+        Tuple of (vehicle_type, vehicle_model), empty when not given
+        
+    Raises:
+        ValidationError: If either field is not a string
+    """
+    fields = []
+    for field_name in ('vehicle_type', 'vehicle_model'):
+        value = data.get(field_name) or ''
+        if not isinstance(value, str):
+            raise ValidationError(f"{field_name.replace('_', ' ').title()} must be a string")
+        fields.append(value.strip())
+    return fields[0], fields[1]
+
+def parse_route_request(data: Dict) -> Tuple[Location, Location, str, str]:
+    """
+    Extract and validate a route request from a JSON object.
+    
+    Args:
+        data: JSON object with origin, destination and optional
+            vehicle_type/vehicle_model; origin and destination are location
+            strings or {"lat": ..., "lon": ...} objects
+        
+    Returns:
+        Tuple of (origin, destination, vehicle_type, vehicle_model), with
+        coordinates as (longitude, latitude)
+        
+    Raises:
+        ValidationError: If the request is malformed or a location is invalid
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("Each route request must be an object")
+    
+    vehicle_type, vehicle_model = parse_vehicle(data)
+    
+    # Validate inputs
+    origin = parse_location(data.get('origin'), 'origin')
+    destination = parse_location(data.get('destination'), 'destination')
+    
+    return origin, destination, vehicle_type, vehicle_model
+
+def parse_flag(value, field_name: str) -> bool:
+    """
+    Interpret an optional on/off request option.
+    
+    Args:
+        value: JSON boolean, or form value such as 'on', 'true' or '1'
+        field_name: Name of the option for error messages
+        
+    Returns:
+        True if the option is enabled
+        
+    Raises:
+        ValidationError: If the value is not a boolean or a known form value
+    """
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ('', '0', 'false', 'off', 'no', '1', 'true', 'on', 'yes'):
+        return value.strip().lower() in ('1', 'true', 'on', 'yes')
+    raise ValidationError(f"{field_name.replace('_', ' ').title()} must be true or false")
+
+
+def parse_geometry_options(data: Dict) -> Tuple[Optional[float], Optional[int], str]:
+    """
+    Extract the requested map zoom level, geometry point budget and encoding.
+    
+    Args:
+        data: Request JSON object or form data
+        
+    Returns:
+        Tuple of (zoom, max_points, geometry_format); zoom and max_points
+        are None when not requested
+        
+    Raises:
+        ValidationError: If a value is invalid
+    """
+    zoom = data.get('zoom')
+    max_points = data.get('max_points')
+    try:
+        zoom = float(zoom) if zoom not in (None, '') else None
+        max_points = int(max_points) if max_points not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValidationError("Zoom and max points must be numeric")
+    
+    if zoom is not None and not (0 <= zoom <= 22):
+        raise ValidationError("Zoom must be between 0 and 22")
+    if max_points is not None and max_points < 0:
+        raise ValidationError("Max points must not be negative")
+    
+    geometry_format = data.get('geometry_format') or 'latlon'
+    if geometry_format not in GEOMETRY_FORMATS:
+        raise ValidationError(
+            f"Invalid geometry format. Must be one of: {', '.join(GEOMETRY_FORMATS)}"
+        )
+    
+    return zoom, max_points, geometry_format
+
 def create_app(config_class=DevelopmentConfig):
     """Application factory pattern for creating Flask app."""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = RouteJSONProvider(app)
+    init_compression(app)
+    
+    # Initialize services; with CACHE_TYPE 'redis' both caches share one
+    # Redis connection pool across all workers
+    redis_client = None
+    if app.config['CACHE_TYPE'].lower() == 'redis':
+        redis_client = create_redis_client(
+            app.config['CACHE_REDIS_URL'],
+            timeout=app.config['CACHE_REDIS_TIMEOUT']
+        )
     
-    # Initialize services
-    route_service = RouteService(app.config['ORS_API_KEY'])
+    # The gazetteer seeds location suggestions and the offline geocoder
+    places = load_gazetteer(app.config['GAZETTEER_PATH'])
+    suggestion_index = SuggestionIndex(
+        limit=app.config['SUGGEST_MAX_RESULTS'],
+        max_entries=app.config['SUGGEST_MAX_ENTRIES']
+    )
+    suggestion_index.add_places(places)
+    local_geocoder = None
+    if app.config['GEOCODE_LOCAL_ENABLED']:
+        local_geocoder = LocalGeocoder(places, min_score=app.config['GEOCODE_LOCAL_MIN_SCORE'])
+    
+    route_service = RouteService(
+        app.config['ORS_API_KEY'],
+        max_workers=app.config['ROUTE_MAX_WORKERS'],
+        batch_workers=app.config['BATCH_MAX_CONCURRENCY'],
+        geocode_cache=create_cache(
+            app.config['CACHE_TYPE'],
+            max_size=app.config['GEOCODE_CACHE_SIZE'],
+            ttl=app.config['GEOCODE_CACHE_TTL'],
+            namespace='geocode',
+            redis_client=redis_client
+        ),
+        geocode_negative_ttl=app.config['GEOCODE_NEGATIVE_CACHE_TTL'],
+        route_cache=create_cache(
+            app.config['CACHE_TYPE'],
+            max_size=app.config['ROUTE_CACHE_SIZE'],
+            ttl=app.config['CACHE_DEFAULT_TIMEOUT'],
+            namespace='routes',
+            redis_client=redis_client
+        ),
+        route_cache_precision=app.config['ROUTE_CACHE_PRECISION'],
+        suggestion_index=suggestion_index,
+        local_geocoder=local_geocoder,
+        routing_engine=create_routing_engine(
+            app.config['ROUTING_ENGINE'],
+            app.config['ROUTING_GRAPH_PATH'],
+            landmarks=app.config['ROUTING_LANDMARKS'],
+            max_snap_distance=app.config['ROUTING_MAX_SNAP_DISTANCE']
+        ),
+        ors_settings={
+            'pool_size': app.config['ORS_POOL_SIZE'],
+            'timeout': (app.config['ORS_CONNECT_TIMEOUT'], app.config['ORS_READ_TIMEOUT']),
+            'retries': app.config['ORS_RETRIES'],
+            'retry_backoff': app.config['ORS_RETRY_BACKOFF'],
+            'retry_timeout': app.config['ORS_RETRY_TIMEOUT'],
+            'retry_over_query_limit': app.config['ORS_RETRY_OVER_QUERY_LIMIT']
+        },
+        breaker_settings={
+            'window_size': app.config['ORS_BREAKER_WINDOW'],
+            'min_calls': app.config['ORS_BREAKER_MIN_CALLS'],
+            'failure_rate': app.config['ORS_BREAKER_FAILURE_RATE'],
+            'slow_call_duration': app.config['ORS_BREAKER_SLOW_CALL_SECONDS'],
+            'slow_call_rate': app.config['ORS_BREAKER_SLOW_CALL_RATE'],
+            'reset_timeout': app.config['ORS_BREAKER_RESET_TIMEOUT']
+        },
+        hedge_percentile=(
+            app.config['ORS_HEDGE_PERCENTILE'] if app.config['ORS_HEDGE_ENABLED'] else None
+        ),
+        hedge_min_samples=app.config['ORS_HEDGE_MIN_SAMPLES']
+    )
     emissions_service = EmissionsService()
+    app.extensions['route_service'] = route_service
+    app.extensions['emissions_service'] = emissions_service
+    
+    def process_routes(routes: List[Dict], vehicle_type: str = '',
+                       vehicle_model: str = '', zoom: Optional[float] = None,
+                       max_points: Optional[int] = None,
+                       geometry_format: str = 'latlon',
+                       all_vehicles: bool = False) -> List[Dict]:
+        """
+        Attach emissions to routes and sort them lowest emission first.
+        
+        Geometry is simplified for the requested zoom level or point budget,
+        falling back to the GEOMETRY_MAX_POINTS budget (0 disables it), then
+        encoded in the requested geometry format. With all_vehicles, each
+        route also gets the emissions of every vehicle type and model.
+        """
+        if zoom is None and max_points is None:
+            max_points = app.config['GEOMETRY_MAX_POINTS']
+        
+        vehicle_tables = None
+        if all_vehicles:
+            vehicle_tables = emissions_service.calculate_vehicle_emission_table(
+                [route['distance'] for route in routes]
+            )
+        
+        processed_routes = []
+        for index, route in enumerate(routes):
+            route = {
+                **route,
+                'geometry': encode_geometry(
+                    simplify_for_display(route['geometry'], zoom=zoom, max_points=max_points),
+                    geometry_format
+                ),
+                'geometry_format': geometry_format
+            }
+            
+            # Use vehicle-specific calculation if vehicle is selected
+            if vehicle_type and vehicle_model and route['mode'] == 'driving':
+                emission = emissions_service.calculate_vehicle_emission(
+                    route['distance'], vehicle_type, vehicle_model
+                )
+                vehicle_info = emissions_service.get_vehicle_info(vehicle_type, vehicle_model)
+                vehicle_name = vehicle_info.get('name', 'Custom Vehicle')
+                vehicle_emission_rate = vehicle_info.get('emission_rate', 'Custom rate')
+            else:
+                emission = emissions_service.calculate_emission(
+                    route['distance'], route['mode']
+                )
+                vehicle_name = None
+                vehicle_emission_rate = None
+            
+            processed_routes.append({
+                **route,
+                'emission': emission,
+                'emission_per_km': round(emission / route['distance'], 3) if route['distance'] > 0 else 0,
+                'vehicle_name': vehicle_name,
+                'vehicle_emission_rate': vehicle_emission_rate
+            })
+            if vehicle_tables is not None:
+                processed_routes[-1]['vehicle_emissions'] = vehicle_tables[index]
+        
+        # Sort by emission (lowest first)
+        processed_routes.sort(key=lambda x: x['emission'])
+        return processed_routes
+    
+    def request_deadline() -> Optional[Deadline]:
+        """Start the ROUTE_REQUEST_TIMEOUT budget for a route comparison (0 disables it)."""
+        timeout = app.config['ROUTE_REQUEST_TIMEOUT']
+        return Deadline(timeout) if timeout > 0 else None
     
     @app.errorhandler(404)
     def not_found_error(error):
@@ -54,42 +359,36 @@ def create_app(config_class=DevelopmentConfig):
     def api_routes():
         """API endpoint for getting route data as JSON."""
         try:
-            data = request.get_json()
+            data = request.get_json(silent=True)
             if not data:
                 raise BadRequest("No JSON data provided")
             
-            origin = data.get('origin', '').strip()
-            destination = data.get('destination', '').strip()
-            
-            # Validate inputs
-            validate_location_input(origin, 'origin')
-            validate_location_input(destination, 'destination')
+            origin, destination, vehicle_type, vehicle_model = parse_route_request(data)
+            zoom, max_points, geometry_format = parse_geometry_options(data)
+            all_vehicles = parse_flag(data.get('all_vehicles'), 'all_vehicles')
             
             # Get routes and calculate emissions
-            routes = route_service.get_routes(origin, destination)
-            processed_routes = []
-            
-            for route in routes:
-                emission = emissions_service.calculate_emission(
-                    route['distance'], route['mode']
-                )
-                processed_routes.append({
-                    **route,
-                    'emission': emission,
-                    'emission_per_km': round(emission / route['distance'], 3) if route['distance'] > 0 else 0
-                })
-            
-            # Sort by emission (lowest first)
-            processed_routes.sort(key=lambda x: x['emission'])
+            routes, missing_modes = route_service.compare_routes(
+                origin, destination, deadline=request_deadline()
+            )
+            processed_routes = process_routes(
+                routes, vehicle_type, vehicle_model, zoom=zoom, max_points=max_points,
+                geometry_format=geometry_format, all_vehicles=all_vehicles
+            )
             
             return jsonify({
                 'success': True,
                 'routes': processed_routes,
-                'origin': origin,
-                'destination': destination,
+                'missing_modes': missing_modes,
+                'origin': format_location(origin),
+                'destination': format_location(destination),
                 'best_route': processed_routes[0] if processed_routes else None
             })
             
+        except BadRequest as e:
+            return jsonify({'success': False, 'error': e.description}), 400
+        except DeadlineExceededError as e:
+            return jsonify({'success': False, 'error': str(e)}), 504
         except ValidationError as e:
             return jsonify({'success': False, 'error': str(e)}), 400
         except RouteFinderException as e:
@@ -98,21 +397,301 @@ def create_app(config_class=DevelopmentConfig):
             logger.error(f"Unexpected error in API route: {e}")
             return jsonify({'success': False, 'error': 'Internal server error'}), 500
     
+    def format_event(event: str, data: Dict) -> str:
+        """Format one Server-Sent Event with a JSON payload."""
+        return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+    
+    @app.route('/api/routes/stream', methods=['POST'])
+    def api_routes_stream():
+        """
+        API endpoint streaming each mode's route as Server-Sent Events.
+        
+        Takes the same JSON body as /api/routes. Request and geocoding errors
+        are returned as JSON before the stream starts; after that a 'route'
+        event is sent as soon as each mode finishes, followed by a 'done'
+        event, or a 'failure' event if no mode produced a route.
+        """
+        try:
+            data = request.get_json(silent=True)
+            if not data:
+                raise BadRequest("No JSON data provided")
+            
+            origin, destination, vehicle_type, vehicle_model = parse_route_request(data)
+            zoom, max_points, geometry_format = parse_geometry_options(data)
+            all_vehicles = parse_flag(data.get('all_vehicles'), 'all_vehicles')
+            
+            deadline = request_deadline()
+            mode_routes = route_service.iter_routes(origin, destination, deadline=deadline)
+            
+        except BadRequest as e:
+            return jsonify({'success': False, 'error': e.description}), 400
+        except DeadlineExceededError as e:
+            return jsonify({'success': False, 'error': str(e)}), 504
+        except ValidationError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except RouteFinderException as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Unexpected error in route stream: {e}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+        
+        modes = list(route_service.supported_modes.values())
+        
+        def generate():
+            yield format_event('start', {
+                'origin': format_location(origin),
+                'destination': format_location(destination),
+                'modes': modes
+            })
+            completed_modes = []
+            failed_modes = []
+            best_route = None
+            try:
+                for mode_name, route in mode_routes:
+                    completed_modes.append(mode_name)
+                    if not route:
+                        failed_modes.append(mode_name)
+                        continue
+                    processed_route = process_routes(
+                        [route], vehicle_type, vehicle_model, zoom=zoom,
+                        max_points=max_points, geometry_format=geometry_format,
+                        all_vehicles=all_vehicles
+                    )[0]
+                    if best_route is None or processed_route['emission'] < best_route['emission']:
+                        best_route = processed_route
+                    yield format_event('route', processed_route)
+            except Exception as e:
+                logger.error(f"Unexpected error streaming routes: {e}")
+                yield format_event('failure', {'error': 'Internal server error'})
+                return
+            
+            missing_modes = [mode for mode in modes if mode not in completed_modes]
+            if best_route is None:
+                origin_label, destination_label = format_location(origin), format_location(destination)
+                if missing_modes:
+                    error = f"Timed out finding routes between {origin_label} and {destination_label}"
+                else:
+                    error = (
+                        f"No routes found between {origin_label} and {destination_label}. "
+                        "Please check the locations and try again."
+                    )
+                yield format_event('failure', {'error': error, 'missing_modes': missing_modes})
+                return
+            
+            yield format_event('done', {
+                'best_mode': best_route['mode'],
+                'failed_modes': failed_modes,
+                'missing_modes': missing_modes
+            })
+        
+        response = Response(stream_with_context(generate()), mimetype=EVENT_STREAM_MIMETYPE)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    def build_batch_result(index: int, pair_request: Tuple[Location, Location, str, str],
+                           routes, geometry_options: Tuple[Optional[float], Optional[int], str]) -> Dict:
+        """Build the result record for one batch pair."""
+        origin, destination, vehicle_type, vehicle_model = pair_request
+        if isinstance(routes, RouteFinderException):
+            return {
+                'index': index,
+                'success': False,
+                'origin': format_location(origin),
+                'destination': format_location(destination),
+                'error': str(routes)
+            }
+        
+        zoom, max_points, geometry_format = geometry_options
+        processed_routes = process_routes(
+            routes, vehicle_type, vehicle_model, zoom=zoom, max_points=max_points,
+            geometry_format=geometry_format
+        )
+        return {
+            'index': index,
+            'success': True,
+            'origin': format_location(origin),
+            'destination': format_location(destination),
+            'routes': processed_routes,
+            'best_route': processed_routes[0] if processed_routes else None
+        }
+    
+    def wants_ndjson(data: Dict) -> bool:
+        """Check whether a batch request asked for streamed NDJSON output."""
+        if data.get('stream') is True:
+            return True
+        best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+        return best == NDJSON_MIMETYPE
+    
+    def stream_batch_results(invalid_results: List[Optional[Dict]],
+                             requests_to_route: List[Tuple[int, Tuple[Location, Location, str, str]]],
+                             od_pairs: List[Tuple[Location, Location]],
+                             geometry_options: Tuple[Optional[float], Optional[int], str]) -> Response:
+        """Stream one NDJSON record per pair as soon as it completes."""
+        def generate():
+            for result in invalid_results:
+                if result is not None:
+                    yield app.json.dumps(result) + '\n'
+            for position, routes in route_service.iter_routes_batch(od_pairs):
+                index, pair_request = requests_to_route[position]
+                yield app.json.dumps(
+                    build_batch_result(index, pair_request, routes, geometry_options)
+                ) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+    
+    @app.route('/api/routes/batch', methods=['POST'])
+    def api_routes_batch():
+        """API endpoint for comparing routes for many origin/destination pairs."""
+        try:
+            data = request.get_json(silent=True)
+            if not data:
+                raise BadRequest("No JSON data provided")
+            if not isinstance(data, dict):
+                raise ValidationError("Request body must be a JSON object")
+            
+            pairs = data.get('pairs')
+            if not isinstance(pairs, list) or not pairs:
+                raise ValidationError("Pairs must be a non-empty list")
+            
+            max_pairs = app.config['BATCH_MAX_PAIRS']
+            if len(pairs) > max_pairs:
+                raise ValidationError(f"A batch may contain at most {max_pairs} pairs")
+            
+            geometry_options = parse_geometry_options(data)
+            
+            # Validate every pair up front; invalid pairs are reported
+            # individually and never reach the route service
+            results = [None] * len(pairs)
+            requests_to_route = []
+            for index, pair in enumerate(pairs):
+                try:
+                    requests_to_route.append((index, parse_route_request(pair)))
+                except ValidationError as e:
+                    results[index] = {'index': index, 'success': False, 'error': str(e)}
+            
+            od_pairs = [
+                (origin, destination) for _, (origin, destination, _, _) in requests_to_route
+            ]
+            
+            if wants_ndjson(data):
+                return stream_batch_results(
+                    results, requests_to_route, od_pairs, geometry_options
+                )
+            
+            route_results = route_service.get_routes_batch(od_pairs)
+            for (index, pair_request), routes in zip(requests_to_route, route_results):
+                results[index] = build_batch_result(
+                    index, pair_request, routes, geometry_options
+                )
+            
+            return jsonify({
+                'success': True,
+                'count': len(results),
+                'results': results
+            })
+            
+        except BadRequest as e:
+            return jsonify({'success': False, 'error': e.description}), 400
+        except ValidationError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Unexpected error in batch API route: {e}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+    
+    @app.route('/api/routes/matrix', methods=['POST'])
+    def api_routes_matrix():
+        """API endpoint for many-to-many distance and emission comparisons."""
+        try:
+            data = request.get_json(silent=True)
+            if not data:
+                raise BadRequest("No JSON data provided")
+            if not isinstance(data, dict):
+                raise ValidationError("Request body must be a JSON object")
+            
+            origins = data.get('origins')
+            destinations = data.get('destinations')
+            if not isinstance(origins, list) or not origins:
+                raise ValidationError("Origins must be a non-empty list")
+            if not isinstance(destinations, list) or not destinations:
+                raise ValidationError("Destinations must be a non-empty list")
+            
+            max_locations = app.config['MATRIX_MAX_LOCATIONS']
+            if len(origins) + len(destinations) > max_locations:
+                raise ValidationError(f"A matrix may contain at most {max_locations} locations")
+            
+            origins = [validate_location_input(origin, 'origin') for origin in origins]
+            destinations = [
+                validate_location_input(destination, 'destination') for destination in destinations
+            ]
+            vehicle_type, vehicle_model = parse_vehicle(data)
+            
+            matrices = route_service.get_matrix(origins, destinations)
+            modes = {}
+            for matrix in matrices:
+                modes[matrix['mode']] = {
+                    'distances': matrix['distances'],
+                    'durations': matrix['durations'],
+                    'emissions': emissions_service.calculate_emission_matrix(
+                        matrix['distances'], matrix['mode'], vehicle_type, vehicle_model
+                    )
+                }
+            
+            return jsonify({
+                'success': True,
+                'origins': origins,
+                'destinations': destinations,
+                'modes': modes
+            })
+            
+        except BadRequest as e:
+            return jsonify({'success': False, 'error': e.description}), 400
+        except ValidationError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except RouteFinderException as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Unexpected error in matrix API route: {e}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+    
+    @app.route('/api/geocode/suggest')
+    def api_geocode_suggest():
+        """
+        API endpoint suggesting place names for a partly typed location.
+        
+        Suggestions come from the in-memory index of gazetteer places and
+        previously geocoded locations, so no geocoding request is made.
+        """
+        query = request.args.get('q', '')
+        limit = request.args.get('limit')
+        try:
+            limit = int(limit) if limit not in (None, '') else None
+        except ValueError:
+            limit = 0
+        if limit is not None and limit < 1:
+            return jsonify({'success': False, 'error': 'Limit must be a positive integer'}), 400
+        
+        return jsonify({
+            'success': True,
+            'query': query,
+            'suggestions': suggestion_index.suggest(query[:200], limit=limit)
+        })
+    
     @app.route('/result', methods=['POST'])
     def result():
         """Handle form submission and display route results."""
         try:
-            origin = request.form.get('origin', '').strip()
-            destination = request.form.get('destination', '').strip()
+            origin = parse_form_location(request.form, 'origin')
+            destination = parse_form_location(request.form, 'destination')
             vehicle_type = request.form.get('vehicle_type', '').strip()
             vehicle_model = request.form.get('vehicle_model', '').strip()
-            
-            # Validate inputs
-            validate_location_input(origin, 'origin')
-            validate_location_input(destination, 'destination')
+            all_vehicles = parse_flag(request.form.get('all_vehicles'), 'all_vehicles')
             
             # Get routes and calculate emissions
-            routes = route_service.get_routes(origin, destination)
+            routes, missing_modes = route_service.compare_routes(
+                origin, destination, deadline=request_deadline()
+            )
+            origin, destination = format_location(origin), format_location(destination)
             
             if not routes:
                 flash('No routes found between the specified locations. Please try different locations.', 'warning')
@@ -122,35 +701,19 @@ def create_app(config_class=DevelopmentConfig):
                                      destination=destination)
             
             # Process routes with emissions
-            processed_routes = []
-            for route in routes:
-                # Use vehicle-specific calculation if vehicle is selected
-                if vehicle_type and vehicle_model and route['mode'] == 'driving':
-                    emission = emissions_service.calculate_vehicle_emission(
-                        route['distance'], vehicle_type, vehicle_model
-                    )
-                    vehicle_info = emissions_service.get_available_vehicles().get(vehicle_type, {}).get(vehicle_model, {})
-                    route['vehicle_name'] = vehicle_info.get('name', 'Custom Vehicle')
-                    route['vehicle_emission_rate'] = vehicle_info.get('emission_rate', 'Custom rate')
-                else:
-                    emission = emissions_service.calculate_emission(
-                        route['distance'], route['mode']
-                    )
-                    route['vehicle_name'] = None
-                    route['vehicle_emission_rate'] = None
-                
-                processed_routes.append({
+            processed_routes = [
+                {
                     **route,
-                    'emission': emission,
-                    'emission_per_km': round(emission / route['distance'], 3) if route['distance'] > 0 else 0,
                     'origin': origin,
                     'destination': destination,
                     'vehicle_type': vehicle_type,
                     'vehicle_model': vehicle_model
-                })
-            
-            # Sort by emission (lowest first)
-            processed_routes.sort(key=lambda x: x['emission'])
+                }
+                for route in process_routes(
+                    routes, vehicle_type, vehicle_model, geometry_format='polyline',
+                    all_vehicles=all_vehicles
+                )
+            ]
             best_route = processed_routes[0]
             
             # Calculate savings compared to driving
@@ -165,6 +728,7 @@ def create_app(config_class=DevelopmentConfig):
                                  origin=origin,
                                  destination=destination,
                                  no_routes=False,
+                                 missing_modes=missing_modes,
                                  route_geometry=best_route.get('geometry'))
             
         except ValidationError as e:
@@ -186,20 +750,29 @@ def create_app(config_class=DevelopmentConfig):
     @app.route('/health')
     def health_check():
         """Health check endpoint for monitoring."""
-        return jsonify({'status': 'healthy', 'version': '1.0.0'})
+        return jsonify({
+            'status': 'healthy',
+            'version': '1.0.0',
+            'cache': route_service.get_cache_stats(),
+            'upstream': route_service.get_upstream_stats()
+        })
+    
+    # The vehicle catalogue never changes while the app runs, so its JSON
+    # body and strong ETag are computed once and revalidated with a 304
+    vehicles_body = app.json.dumps({
+        'success': True,
+        'vehicles': thaw(emissions_service.get_available_vehicles())
+    })
+    vehicles_etag = hashlib.sha256(vehicles_body.encode('utf-8')).hexdigest()
     
     @app.route('/api/vehicles')
     def api_vehicles():
         """API endpoint for getting vehicle information."""
-        try:
-            vehicles = emissions_service.get_available_vehicles()
-            return jsonify({
-                'success': True,
-                'vehicles': vehicles
-            })
-        except Exception as e:
-            logger.error(f"Error getting vehicle information: {e}")
-            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+        response = Response(vehicles_body, mimetype='application/json')
+        response.set_etag(vehicles_etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['VEHICLES_CACHE_MAX_AGE']
+        return response.make_conditional(request)
     
     return app
 
@@ -28,6 +28,105 @@ class Config:
     # Cache settings
     CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', '300'))
+    ROUTE_CACHE_SIZE = int(os.environ.get('ROUTE_CACHE_SIZE', '512'))
+    ROUTE_CACHE_PRECISION = int(os.environ.get('ROUTE_CACHE_PRECISION', '5'))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_REDIS_TIMEOUT = float(os.environ.get('CACHE_REDIS_TIMEOUT', '0.25'))
+    CACHE_REDIS_RETRY_INTERVAL = int(os.environ.get('CACHE_REDIS_RETRY_INTERVAL', '30'))
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'routefinder')
+    
+    # Route service settings
+    ROUTE_MAX_WORKERS = int(os.environ.get('ROUTE_MAX_WORKERS', '8'))
+    
+    # Seconds a route comparison may take; modes still running are reported
+    # missing instead of delaying the response (0 = wait for every mode)
+    ROUTE_REQUEST_TIMEOUT = float(os.environ.get('ROUTE_REQUEST_TIMEOUT', '10'))
+    
+    # Directions engine: 'ors' for the OpenRouteService API or 'local' for
+    # the offline engine over an OSM XML extract, with its number of ALT
+    # landmarks per profile and maximum snapping distance in metres
+    ROUTING_ENGINE = os.environ.get('ROUTING_ENGINE', 'ors')
+    ROUTING_GRAPH_PATH = os.environ.get(
+        'ROUTING_GRAPH_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sample_extract.osm')
+    )
+    ROUTING_LANDMARKS = int(os.environ.get('ROUTING_LANDMARKS', '8'))
+    ROUTING_MAX_SNAP_DISTANCE = float(os.environ.get('ROUTING_MAX_SNAP_DISTANCE', '2000'))
+    
+    # ORS HTTP client: pooled keep-alive connections (0 = match the route
+    # service threads), connect/read timeouts in seconds, retries of failed
+    # connections and 502/503/504 with exponential backoff, and the total
+    # time the ORS client keeps retrying
+    ORS_POOL_SIZE = int(os.environ.get('ORS_POOL_SIZE', '0'))
+    ORS_CONNECT_TIMEOUT = float(os.environ.get('ORS_CONNECT_TIMEOUT', '3.05'))
+    ORS_READ_TIMEOUT = float(os.environ.get('ORS_READ_TIMEOUT', '15'))
+    ORS_RETRIES = int(os.environ.get('ORS_RETRIES', '2'))
+    ORS_RETRY_BACKOFF = float(os.environ.get('ORS_RETRY_BACKOFF', '0.2'))
+    ORS_RETRY_TIMEOUT = int(os.environ.get('ORS_RETRY_TIMEOUT', '10'))
+    ORS_RETRY_OVER_QUERY_LIMIT = os.environ.get('ORS_RETRY_OVER_QUERY_LIMIT', 'True').lower() == 'true'
+    
+    # Circuit breaker per ORS endpoint: opens when the share of failed or
+    # slow calls among the last ORS_BREAKER_WINDOW calls reaches its rate,
+    # and probes again after ORS_BREAKER_RESET_TIMEOUT seconds
+    ORS_BREAKER_WINDOW = int(os.environ.get('ORS_BREAKER_WINDOW', '20'))
+    ORS_BREAKER_MIN_CALLS = int(os.environ.get('ORS_BREAKER_MIN_CALLS', '5'))
+    ORS_BREAKER_FAILURE_RATE = float(os.environ.get('ORS_BREAKER_FAILURE_RATE', '0.5'))
+    ORS_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('ORS_BREAKER_SLOW_CALL_SECONDS', '5'))
+    ORS_BREAKER_SLOW_CALL_RATE = float(os.environ.get('ORS_BREAKER_SLOW_CALL_RATE', '0.8'))
+    ORS_BREAKER_RESET_TIMEOUT = float(os.environ.get('ORS_BREAKER_RESET_TIMEOUT', '30'))
+    
+    # Hedged ORS requests: a second attempt starts once a call is slower than
+    # this latency percentile of the endpoint's recent calls
+    ORS_HEDGE_ENABLED = os.environ.get('ORS_HEDGE_ENABLED', 'False').lower() == 'true'
+    ORS_HEDGE_PERCENTILE = float(os.environ.get('ORS_HEDGE_PERCENTILE', '95'))
+    ORS_HEDGE_MIN_SAMPLES = int(os.environ.get('ORS_HEDGE_MIN_SAMPLES', '20'))
+    
+    # Batch route comparison settings
+    BATCH_MAX_PAIRS = int(os.environ.get('BATCH_MAX_PAIRS', '1000'))
+    BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', '4'))
+    MATRIX_MAX_LOCATIONS = int(os.environ.get('MATRIX_MAX_LOCATIONS', '50'))
+    
+    # Route geometry settings: base simplification tolerance in metres applied
+    # before caching, and the default point budget for responses (0 = unlimited)
+    GEOMETRY_BASE_TOLERANCE = float(os.environ.get('GEOMETRY_BASE_TOLERANCE', '1.0'))
+    GEOMETRY_MAX_POINTS = int(os.environ.get('GEOMETRY_MAX_POINTS', '1500'))
+    
+    # Geocoding cache settings
+    GEOCODE_CACHE_SIZE = int(os.environ.get('GEOCODE_CACHE_SIZE', '1024'))
+    GEOCODE_CACHE_TTL = int(os.environ.get('GEOCODE_CACHE_TTL', '86400'))
+    GEOCODE_NEGATIVE_CACHE_TTL = int(os.environ.get('GEOCODE_NEGATIVE_CACHE_TTL', '300'))
+    
+    # Location suggestions: gazetteer CSV seeding the index, suggestions per
+    # request and places kept, including names learned from geocoding
+    GAZETTEER_PATH = os.environ.get(
+        'GAZETTEER_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.csv')
+    )
+    SUGGEST_MAX_RESULTS = int(os.environ.get('SUGGEST_MAX_RESULTS', '8'))
+    SUGGEST_MAX_ENTRIES = int(os.environ.get('SUGGEST_MAX_ENTRIES', '50000'))
+    
+    # Offline geocoding of exact gazetteer names before calling pelias_search,
+    # and the minimum similarity (0-1) of a misspelt name to a gazetteer place
+    # when falling back to it while the geocoder is unavailable
+    GEOCODE_LOCAL_ENABLED = os.environ.get('GEOCODE_LOCAL_ENABLED', 'True').lower() == 'true'
+    GEOCODE_LOCAL_MIN_SCORE = float(os.environ.get('GEOCODE_LOCAL_MIN_SCORE', '0.8'))
+    
+    # Seconds browsers and proxies may reuse /api/vehicles before revalidating
+    VEHICLES_CACHE_MAX_AGE = int(os.environ.get('VEHICLES_CACHE_MAX_AGE', '3600'))
+    
+    # Decimals kept for float arrays such as route coordinates in JSON responses
+    JSON_FLOAT_PRECISION = int(os.environ.get('JSON_FLOAT_PRECISION', '6'))
+    
+    # Response compression: gzip level, brotli quality (used when the brotli
+    # package is installed), minimum body size in bytes and compressed types
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', '5'))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '500'))
+    COMPRESS_MIMETYPES = os.environ.get(
+        'COMPRESS_MIMETYPES',
+        'text/html,text/css,text/plain,text/javascript,application/javascript,application/json'
+    ).split(',')
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -0,0 +1,389 @@
+"""
+Cache utilities for the route finder services.
+Provides a thread-safe in-process LRU cache with per-entry expiry, a Redis
+tier shared by all workers, and a factory selecting the cache backend from
+the CACHE_TYPE setting.
+"""
+
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import numpy as np
+from config import Config
+from services.geometry import pack_delta, unpack_delta
+from utils.exceptions import ConfigurationError
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is listed in requirements
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned by cache lookups when no usable entry exists
+MISSING = object()
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept before LRU eviction
+            ttl: Default time-to-live in seconds for new entries
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss or an expired entry
+
+        Returns:
+            Cached value, or default if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, defaults to the cache TTL
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NullCache:
+    """Cache that stores nothing, used when caching is disabled."""
+
+    def __init__(self, *args, **kwargs):
+        self.max_size = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    def delete(self, key: Hashable) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 0}
+
+    def __len__(self) -> int:
+        return 0
+
+
+def serialize_value(value: Any) -> bytes:
+    """
+    Serialize a cached value to compact bytes.
+
+    Route geometry is stored as base64 delta-encoded integer microdegrees,
+    which keeps shared cache entries several times smaller than plain JSON.
+    """
+    if isinstance(value, dict) and isinstance(value.get('geometry'), (np.ndarray, list)):
+        value = dict(value, geometry={'delta': pack_delta(value['geometry'])})
+        if isinstance(value.get('bbox'), np.ndarray):
+            value['bbox'] = value['bbox'].tolist()
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+
+def deserialize_value(data: bytes) -> Any:
+    """Deserialize bytes produced by serialize_value."""
+    value = json.loads(zlib.decompress(data).decode('utf-8'))
+    if isinstance(value, dict) and isinstance(value.get('geometry'), dict):
+        geometry = unpack_delta(value['geometry']['delta'])
+        geometry.flags.writeable = False
+        value['geometry'] = geometry
+        if value.get('bbox') is not None:
+            value['bbox'] = np.array(value['bbox'], dtype=np.float64)
+            value['bbox'].flags.writeable = False
+    elif isinstance(value, list):
+        # JSON has no tuples; coordinates are cached as tuples
+        value = tuple(value)
+    return value
+
+
+class RedisCache:
+    """Cache stored in Redis so that all workers share one set of entries."""
+
+    def __init__(self, client, ttl: float = 300, namespace: str = 'default',
+                 key_prefix: str = 'routefinder'):
+        """
+        Initialize the cache.
+
+        Args:
+            client: Redis client (or any object with get/set/delete)
+            ttl: Default time-to-live in seconds for new entries
+            namespace: Namespace separating this cache from others
+            key_prefix: Prefix shared by all route finder keys
+        """
+        self.client = client
+        self.ttl = ttl
+        self.max_size = 0
+        self.hits = 0
+        self.misses = 0
+        self._prefix = f"{key_prefix}:{namespace}:"
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        data = self.client.get(self._prefix + str(key))
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return deserialize_value(data)
+
+    def get_with_ttl(self, key: Hashable, default: Any = MISSING) -> Tuple[Any, Optional[float]]:
+        """
+        Look up a value together with its remaining time-to-live.
+
+        Both are read in one round trip.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Tuple of (value, remaining seconds), with None as the remaining
+            time for a miss or an entry without expiry
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.get(self._prefix + str(key))
+        pipeline.pttl(self._prefix + str(key))
+        data, remaining_ms = pipeline.execute()
+        if data is None:
+            self.misses += 1
+            return default, None
+        self.hits += 1
+        remaining = remaining_ms / 1000 if remaining_ms is not None and remaining_ms > 0 else None
+        return deserialize_value(data), remaining
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self.client.set(
+            self._prefix + str(key),
+            serialize_value(value),
+            px=max(1, int(ttl * 1000))
+        )
+
+    def delete(self, key: Hashable) -> None:
+        self.client.delete(self._prefix + str(key))
+
+    def clear(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class TieredCache:
+    """
+    In-process cache backed by a shared remote cache.
+
+    Lookups try the local tier first and fill it from the remote tier. When
+    the remote tier fails, it is skipped for retry_interval seconds and the
+    cache keeps working on the local tier alone.
+    """
+
+    def __init__(self, local: TTLCache, remote: RedisCache, retry_interval: float = 30):
+        """
+        Initialize the cache.
+
+        Args:
+            local: Per-worker cache tier
+            remote: Shared cache tier
+            retry_interval: Seconds to wait before retrying a failed remote tier
+        """
+        self.local = local
+        self.remote = remote
+        self.retry_interval = retry_interval
+        self.max_size = local.max_size
+        self.remote_errors = 0
+        self._remote_down_until = 0.0
+
+    def _remote_available(self) -> bool:
+        return time.monotonic() >= self._remote_down_until
+
+    def _remote_failed(self, operation: str, error: Exception) -> None:
+        self.remote_errors += 1
+        self._remote_down_until = time.monotonic() + self.retry_interval
+        logger.warning(f"Shared cache {operation} failed, using local cache only: {error}")
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+        if self._remote_available():
+            try:
+                value, remaining = self.remote.get_with_ttl(key)
+            except Exception as e:
+                self._remote_failed('read', e)
+                return default
+            if value is not MISSING:
+                # Keep the local copy no longer than the shared entry lives
+                self.local.set(key, value, ttl=remaining)
+                return value
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.local.set(key, value, ttl=ttl)
+        if self._remote_available():
+            try:
+                self.remote.set(key, value, ttl=ttl)
+            except Exception as e:
+                self._remote_failed('write', e)
+
+    def delete(self, key: Hashable) -> None:
+        self.local.delete(key)
+        if self._remote_available():
+            try:
+                self.remote.delete(key)
+            except Exception as e:
+                self._remote_failed('delete', e)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.remote.clear()
+        self.remote_errors = 0
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.local.stats()
+        remote_stats = self.remote.stats()
+        stats.update({
+            'remote_hits': remote_stats['hits'],
+            'remote_misses': remote_stats['misses'],
+            'remote_errors': self.remote_errors,
+            'remote_available': self._remote_available()
+        })
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+
+def create_redis_client(url: str, timeout: float = 0.25):
+    """
+    Create a Redis client for the shared cache tier.
+
+    Args:
+        url: Redis connection URL
+        timeout: Connect and socket timeout in seconds
+
+    Returns:
+        Redis client
+
+    Raises:
+        ConfigurationError: If the redis package is not installed
+    """
+    if redis is None:
+        raise ConfigurationError("CACHE_TYPE 'redis' requires the redis package")
+    return redis.Redis.from_url(
+        url,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout
+    )
+
+
+def create_cache(cache_type: str, max_size: int, ttl: float,
+                 namespace: str = 'default', redis_client=None):
+    """
+    Create a cache for the configured CACHE_TYPE.
+
+    Args:
+        cache_type: 'simple' for an in-process cache, 'redis' for an
+            in-process cache backed by Redis, 'null' to disable caching
+        max_size: Maximum number of entries in the in-process tier
+        ttl: Default time-to-live in seconds
+        namespace: Namespace for keys in the shared tier
+        redis_client: Redis client for the shared tier, created from
+            CACHE_REDIS_URL when omitted
+
+    Returns:
+        Cache instance
+
+    Raises:
+        ConfigurationError: If the cache type is not supported
+    """
+    cache_type = (cache_type or 'simple').lower()
+    if cache_type in ('simple', 'simplecache'):
+        return TTLCache(max_size=max_size, ttl=ttl)
+    if cache_type in ('null', 'nullcache', 'none'):
+        return NullCache()
+    if cache_type in ('redis', 'rediscache'):
+        if redis_client is None:
+            redis_client = create_redis_client(
+                Config.CACHE_REDIS_URL, timeout=Config.CACHE_REDIS_TIMEOUT
+            )
+        return TieredCache(
+            TTLCache(max_size=max_size, ttl=ttl),
+            RedisCache(
+                redis_client,
+                ttl=ttl,
+                namespace=namespace,
+                key_prefix=Config.CACHE_KEY_PREFIX
+            ),
+            retry_interval=Config.CACHE_REDIS_RETRY_INTERVAL
+        )
+    raise ConfigurationError(f"Unsupported cache type: {cache_type}")
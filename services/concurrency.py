@@ -0,0 +1,343 @@
+"""
+Concurrency utilities for the route finder services.
+Provides request coalescing so identical upstream calls run only once,
+bounded fan-out of many calls over a shared executor, and circuit breaking
+and hedging of calls to a slow or failing upstream service.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+import numpy as np
+from utils.exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """Point in time by which a request must be answered."""
+
+    def __init__(self, timeout: float):
+        """
+        Start the time budget.
+
+        Args:
+            timeout: Seconds from now until the deadline
+        """
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """Get the seconds left, never below zero."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class _Call:
+    """An upstream call in flight, shared by the caller and its waiters."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func once for all concurrent callers using the same key.
+
+        Args:
+            key: Identity of the call
+            func: Function to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            Exception: Whatever func raised, re-raised in every waiter
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Get counters of executed and coalesced calls."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._in_flight)
+            }
+
+
+def bounded_as_completed(executor: Executor, func: Callable, items: Iterable,
+                         limit: int) -> Iterator[Tuple[int, Future]]:
+    """
+    Run func over items with at most limit calls in flight.
+
+    New calls are submitted as earlier ones finish, so a large batch never
+    floods the executor queue ahead of other requests.
+
+    Args:
+        executor: Executor running the calls
+        func: Function called with each item
+        items: Items to process
+        limit: Maximum number of calls in flight
+
+    Yields:
+        Tuples of (item index, completed future) in completion order
+    """
+    remaining = enumerate(items)
+    pending: Dict[Future, int] = {}
+
+    def submit_next() -> None:
+        for index, item in remaining:
+            pending[executor.submit(func, item)] = index
+            return
+
+    for _ in range(max(1, limit)):
+        submit_next()
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = pending.pop(future)
+            submit_next()
+            yield index, future
+
+
+class LatencyTracker:
+    """Rolling window of recent call durations."""
+
+    def __init__(self, size: int = 100):
+        self._durations = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Record the duration of a completed call."""
+        with self._lock:
+            self._durations.append(seconds)
+
+    def percentile(self, percent: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Get a percentile of the recorded durations.
+
+        Args:
+            percent: Percentile between 0 and 100
+            min_samples: Samples needed before a value is returned
+
+        Returns:
+            Duration in seconds, or None with fewer than min_samples samples
+        """
+        with self._lock:
+            if len(self._durations) < max(1, min_samples):
+                return None
+            durations = np.fromiter(self._durations, dtype=np.float64)
+        return float(np.percentile(durations, percent))
+
+    def __len__(self) -> int:
+        return len(self._durations)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream service is failing or slow.
+
+    The breaker tracks the outcome of the last window_size calls. Once at
+    least min_calls were seen and the share of failed or slow calls reaches
+    its threshold, the circuit opens and calls raise CircuitOpenError
+    without running. After reset_timeout seconds a single probe call is let
+    through; its success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, window_size: int = 20, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_duration: float = 5.0,
+                 slow_call_rate: float = 0.8, reset_timeout: float = 30,
+                 is_failure: Optional[Callable[[Exception], bool]] = None):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Name of the guarded endpoint, used in errors and logs
+            window_size: Number of recent calls considered
+            min_calls: Calls needed in the window before the circuit can open
+            failure_rate: Share of failed calls that opens the circuit
+            slow_call_duration: Seconds after which a call counts as slow
+            slow_call_rate: Share of slow calls that opens the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+            is_failure: Predicate deciding whether an exception counts as an
+                upstream failure; by default every exception does
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self.state = self.CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func unless the circuit is open.
+
+        Args:
+            func: Function calling the upstream service
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: Whatever func raised
+        """
+        self._before_call()
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(self.is_failure(e), time.monotonic() - start)
+            raise
+        self._record(False, time.monotonic() - start)
+        return result
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() >= self._opened_at + self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            if self.state != self.CLOSED:
+                self.rejected += 1
+                raise CircuitOpenError(f"Upstream service unavailable: {self.name}")
+
+    def _record(self, failed: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_duration
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    logger.info(f"Circuit closed for {self.name}")
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for call_failed, _ in self._outcomes if call_failed)
+            slow_calls = sum(1 for _, call_slow in self._outcomes if call_slow)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        logger.warning(f"Circuit opened for {self.name}, failing fast for {self.reset_timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the circuit state and counters."""
+        with self._lock:
+            return {
+                'state': self.state,
+                'opened': self.opened,
+                'rejected': self.rejected
+            }
+
+
+def hedged_call(executor: Executor, delay: Optional[float], func: Callable,
+                *args, **kwargs) -> Any:
+    """
+    Run func, starting a second attempt if the first is slower than delay.
+
+    The first attempt to succeed wins; the other is left to finish in the
+    background. If both attempts fail, the last error is raised.
+
+    Args:
+        executor: Executor running the attempts
+        delay: Seconds to wait before hedging, or None to call func directly
+        func: Function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of the first successful attempt
+    """
+    if delay is None:
+        return func(*args, **kwargs)
+
+    first = executor.submit(func, *args, **kwargs)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result()
+
+    pending = {first, executor.submit(func, *args, **kwargs)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
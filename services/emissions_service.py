@@ -7,18 +7,91 @@ Provides detailed emissions analysis and environmental impact calculations.
 """
 
 import logging
-from typing import Dict, Optional, Tuple, List
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, List, Union
+import numpy as np
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Emission rate used for transport modes without a configured rate
+DEFAULT_EMISSION_RATE = 0.1
+
+# Emission rate used for vehicle types without an average rate
+DEFAULT_VEHICLE_EMISSION_RATE = 0.120
+
+# Decimals kept in reported emissions
+EMISSION_DECIMALS = 3
+
+def _round_emissions(emissions: np.ndarray) -> np.ndarray:
+    """
+    Round emissions exactly like the built-in round().
+
+    np.round scales before rounding, so values sitting on a rounding tie can
+    land on the other side; those few are re-rounded with round().
+    """
+    rounded = np.array(np.round(emissions, EMISSION_DECIMALS))
+    scaled = emissions * 10 ** EMISSION_DECIMALS
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(value, EMISSION_DECIMALS) for value in emissions[ties].tolist()]
+    return rounded
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively wrap nested dicts in read-only mapping proxies."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively copy a frozen mapping back into plain dicts, e.g. for JSON."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    return value
+
+
+def _rates_for(keys: Union[str, Sequence[str]], lookup) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resolve each distinct key once.
+
+    Returns:
+        Tuple of (rate per distinct key, index into it for every key)
+    """
+    if isinstance(keys, str):
+        return np.array([lookup(keys)]), np.zeros((), dtype=np.intp)
+    unique_keys, inverse = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+    return np.array([lookup(key) for key in unique_keys.tolist()]), inverse
+
 class EmissionsService:
     """Service for calculating CO2 emissions for different transport modes."""
     
     def __init__(self):
-        """Initialize the emissions service with emission rates."""
+        """
+        Initialize the emissions service with emission rates.
+        
+        The vehicle rate tables and catalogue are built once here and frozen,
+        so lookups on the request path never rebuild or copy them.
+        """
         self.emission_rates = Config.get_emission_rates()
-        self.vehicle_emissions = self._get_vehicle_emission_rates()
+        self.vehicle_emissions = _freeze(self._get_vehicle_emission_rates())
+        self.vehicle_catalogue = _freeze(self._build_vehicle_catalogue())
+        self.vehicle_index = MappingProxyType({
+            (vehicle_type, vehicle_model): info
+            for vehicle_type, models in self.vehicle_catalogue.items()
+            for vehicle_model, info in models.items()
+        })
+        self.vehicle_rate_keys = tuple(
+            (vehicle_type, vehicle_model)
+            for vehicle_type, models in self.vehicle_emissions.items()
+            for vehicle_model in models
+        )
+        self.vehicle_rate_vector = np.array([
+            self.vehicle_emissions[vehicle_type][vehicle_model]
+            for vehicle_type, vehicle_model in self.vehicle_rate_keys
+        ])
+        self.vehicle_rate_vector.flags.writeable = False
         logger.info("Emissions service initialized with rates: %s", self.emission_rates)
     
     def _get_vehicle_emission_rates(self) -> Dict[str, Dict[str, float]]:
@@ -71,11 +144,10 @@ class EmissionsService:
         if distance_km <= 0:
             return 0.0
         
-        emission_rate = self.emission_rates.get(mode, 0.1)  # Default fallback rate
-        emission = distance_km * emission_rate
+        emission = distance_km * self._get_mode_rate(mode)
         
-        logger.debug(f"Calculated emission for {mode}: {emission:.3f} kg CO2 for {distance_km} km")
-        return round(emission, 3)
+        logger.debug("Calculated emission for %s: %.3f kg CO2 for %s km", mode, emission, distance_km)
+        return round(emission, EMISSION_DECIMALS)
     
     def calculate_vehicle_emission(self, distance_km: float, vehicle_type: str, vehicle_model: str = 'average') -> float:
         """
@@ -92,20 +164,157 @@ class EmissionsService:
         if distance_km <= 0:
             return 0.0
         
+        emission = distance_km * self._get_vehicle_rate(vehicle_type, vehicle_model)
+        
+        logger.debug("Calculated vehicle emission for %s/%s: %.3f kg CO2 for %s km",
+                     vehicle_type, vehicle_model, emission, distance_km)
+        return round(emission, EMISSION_DECIMALS)
+    
+    def _get_mode_rate(self, mode: str) -> float:
+        """Get the emission rate of a transport mode, with the default fallback."""
+        return self.emission_rates.get(mode, DEFAULT_EMISSION_RATE)
+    
+    def _get_vehicle_rate(self, vehicle_type: str, vehicle_model: str) -> float:
+        """Get the emission rate of a vehicle, falling back to its type average."""
         vehicle_rates = self.vehicle_emissions.get(vehicle_type, {})
-        emission_rate = vehicle_rates.get(vehicle_model, vehicle_rates.get('average', 0.120))
-        emission = distance_km * emission_rate
+        return vehicle_rates.get(vehicle_model, vehicle_rates.get('average', DEFAULT_VEHICLE_EMISSION_RATE))
+    
+    def calculate_emissions(self, distances_km: Sequence[float],
+                            modes: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Calculate CO2 emissions for many trips at once.
+        
+        Rounding and fallbacks match calculate_emission: unknown modes use the
+        default rate and non-positive distances give 0.0. NaN distances (None
+        in a list) stay NaN.
         
-        logger.debug(f"Calculated vehicle emission for {vehicle_type}/{vehicle_model}: {emission:.3f} kg CO2 for {distance_km} km")
-        return round(emission, 3)
+        Args:
+            distances_km: Distances in kilometers
+            modes: One transport mode for all trips, or one mode per trip
+            
+        Returns:
+            Array of CO2 emissions in kilograms
+        """
+        rates, index = _rates_for(modes, self._get_mode_rate)
+        return self._apply_rates(distances_km, rates[index])
     
-    def get_available_vehicles(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+    def calculate_vehicle_emissions(self, distances_km: Sequence[float],
+                                    vehicle_types: Union[str, Sequence[str]],
+                                    vehicle_models: Union[str, Sequence[str]] = 'average') -> np.ndarray:
+        """
+        Calculate CO2 emissions for many vehicle trips at once.
+        
+        Rounding and fallbacks match calculate_vehicle_emission: unknown
+        models use their type average and unknown types the default rate.
+        
+        Args:
+            distances_km: Distances in kilometers
+            vehicle_types: One vehicle type for all trips, or one per trip
+            vehicle_models: One vehicle model for all trips, or one per trip
+            
+        Returns:
+            Array of CO2 emissions in kilograms
+        """
+        type_keys = [vehicle_types] if isinstance(vehicle_types, str) else vehicle_types
+        model_keys = [vehicle_models] if isinstance(vehicle_models, str) else vehicle_models
+        unique_types, type_index = np.unique(np.asarray(type_keys, dtype=str), return_inverse=True)
+        unique_models, model_index = np.unique(np.asarray(model_keys, dtype=str), return_inverse=True)
+        
+        # Resolve every distinct (type, model) combination once
+        rate_table = np.array([
+            [self._get_vehicle_rate(vehicle_type, vehicle_model) for vehicle_model in unique_models.tolist()]
+            for vehicle_type in unique_types.tolist()
+        ])
+        return self._apply_rates(distances_km, rate_table[type_index, model_index])
+    
+    def calculate_vehicle_emission_table(self, distances_km: Sequence[float]) -> List[Dict[str, Dict[str, float]]]:
+        """
+        Calculate emissions of every vehicle type and model for each distance.
+        
+        All distances are scored against the whole rate table in one
+        vectorized pass, with the rounding of calculate_vehicle_emission.
+        
+        Args:
+            distances_km: Distances in kilometers
+            
+        Returns:
+            One {vehicle_type: {vehicle_model: emission}} table per distance
+        """
+        distances = np.asarray(distances_km, dtype=np.float64).reshape(-1, 1)
+        emissions = self._apply_rates(distances, self.vehicle_rate_vector)
+        
+        tables = []
+        for row in emissions.tolist():
+            table = {vehicle_type: {} for vehicle_type in self.vehicle_emissions}
+            for (vehicle_type, vehicle_model), emission in zip(self.vehicle_rate_keys, row):
+                table[vehicle_type][vehicle_model] = emission
+            tables.append(table)
+        return tables
+    
+    def _apply_rates(self, distances_km: Sequence[float], rates: np.ndarray) -> np.ndarray:
+        """Multiply distances by rates with the scalar rounding and zero-distance rules."""
+        distances = np.asarray(distances_km, dtype=np.float64)
+        emissions = _round_emissions(distances * rates)
+        # NaN <= 0 is False, so unknown distances stay NaN
+        return np.where(distances <= 0, 0.0, emissions)
+    
+    def calculate_emission_matrix(self, distances_km: List[List[Optional[float]]], mode: str,
+                                  vehicle_type: str = '', vehicle_model: str = '') -> List[List[Optional[float]]]:
+        """
+        Calculate CO2 emissions for a grid of distances in one pass.
+        
+        The emission rate is resolved once for the whole grid. Driving uses
+        the vehicle-specific rate when a vehicle type and model are given.
+        
+        Args:
+            distances_km: Distances in kilometers indexed [origin][destination],
+                with None for unreachable pairs
+            mode: Transport mode ('driving', 'transit', 'bicycling', 'walking')
+            vehicle_type: Optional vehicle type for driving
+            vehicle_model: Optional vehicle model for driving
+            
+        Returns:
+            Emissions in kilograms with the same shape, None where the
+            distance is None
+        """
+        if not distances_km:
+            return []
+        
+        distances = np.array(distances_km, dtype=np.float64)
+        if vehicle_type and vehicle_model and mode == 'driving':
+            emissions = self.calculate_vehicle_emissions(distances, vehicle_type, vehicle_model)
+        else:
+            emissions = self.calculate_emissions(distances, mode)
+        
+        return [
+            [None if np.isnan(emission) else emission for emission in row]
+            for row in emissions.tolist()
+        ]
+    
+    def get_available_vehicles(self) -> Mapping[str, Mapping[str, Mapping[str, str]]]:
         """
         Get all available vehicle options with descriptions.
         
         Returns:
-            Dictionary of vehicle types and their models with descriptions
+            Read-only mapping of vehicle types and their models with descriptions
+        """
+        return self.vehicle_catalogue
+    
+    def get_vehicle_info(self, vehicle_type: str, vehicle_model: str) -> Mapping[str, str]:
+        """
+        Look up the catalogue entry of one vehicle.
+        
+        Args:
+            vehicle_type: Vehicle type ('car', 'motorcycle', 'transit', 'truck')
+            vehicle_model: Specific vehicle model
+            
+        Returns:
+            Read-only vehicle description, empty if the vehicle is unknown
         """
+        return self.vehicle_index.get((vehicle_type, vehicle_model), MappingProxyType({}))
+    
+    def _build_vehicle_catalogue(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """Build the vehicle options with their descriptions."""
         return {
             'car': {
                 'gasoline_small': {
@@ -241,11 +450,9 @@ class EmissionsService:
         Returns:
             Dictionary with emissions for each mode
         """
-        comparison = {}
-        for mode, rate in self.emission_rates.items():
-            comparison[mode] = self.calculate_emission(distance_km, mode)
-        
-        return comparison
+        modes = list(self.emission_rates)
+        emissions = self.calculate_emissions(np.full(len(modes), distance_km, dtype=np.float64), modes)
+        return dict(zip(modes, emissions.tolist()))
     
     def calculate_environmental_impact(self, emission_kg: float) -> Dict[str, float]:
         """
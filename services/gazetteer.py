@@ -0,0 +1,394 @@
+"""
+Local gazetteer of well-known places.
+Loads a GeoNames-style CSV of place names and coordinates, and provides an
+offline geocoder with fuzzy matching and an in-memory prefix index for
+ranked location suggestions.
+"""
+
+import csv
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from utils.validators import normalize_location
+
+logger = logging.getLogger(__name__)
+
+def load_gazetteer(path: str) -> List[Dict]:
+    """
+    Load places from a gazetteer CSV file.
+
+    The file needs name, latitude and longitude columns; country and
+    population are optional. Malformed rows are skipped.
+
+    Args:
+        path: Path of the CSV file
+
+    Returns:
+        List of place dictionaries with name, country, coordinates as
+        (longitude, latitude) and population; empty if the file is missing
+    """
+    places = []
+    try:
+        with open(path, newline='', encoding='utf-8') as gazetteer_file:
+            for line_number, row in enumerate(csv.DictReader(gazetteer_file), start=2):
+                try:
+                    places.append({
+                        'name': row['name'].strip(),
+                        'country': (row.get('country') or '').strip(),
+                        'coordinates': (float(row['longitude']), float(row['latitude'])),
+                        'population': int(row.get('population') or 0)
+                    })
+                except (KeyError, AttributeError, TypeError, ValueError):
+                    logger.warning(f"Skipping malformed gazetteer row {line_number} in {path}")
+    except FileNotFoundError:
+        logger.warning(f"Gazetteer file not found: {path}")
+
+    logger.info(f"Loaded {len(places)} gazetteer places from {path}")
+    return places
+
+
+def trigrams(key: str) -> List[str]:
+    """Get the character trigrams of a normalized name, padded so its start weighs more."""
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(first: str, second: str) -> int:
+    """
+    Get the edit distance of two strings.
+
+    Edits are insertions, deletions, substitutions and transpositions of
+    adjacent characters (optimal string alignment distance), so a swapped
+    pair of letters counts as one typo.
+    """
+    if first == second:
+        return 0
+    if not first or not second:
+        return max(len(first), len(second))
+    before_previous = None
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i]
+        for j in range(1, len(second) + 1):
+            distance = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (first[i - 1] != second[j - 1])
+            )
+            if (i > 1 and j > 1 and first[i - 1] == second[j - 2]
+                    and first[i - 2] == second[j - 1]):
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+def edit_similarity(first: str, second: str) -> float:
+    """
+    Get the edit similarity of two strings.
+
+    Returns:
+        1 minus the edit distance divided by the longer length, so 1.0 for
+        identical strings and 0.0 for nothing in common
+    """
+    if not first and not second:
+        return 1.0
+    return 1.0 - edit_distance(first, second) / max(len(first), len(second))
+
+
+def allowed_edits(length: int) -> int:
+    """
+    Get the number of typos tolerated in a name of a given length.
+
+    Short names are often a real place one letter away from another
+    ("Delphi" and "Delhi", "Lyons" and "Lyon"), so they must match exactly.
+    """
+    if length < 8:
+        return 0
+    if length < 16:
+        return 1
+    return 2
+
+
+class LocalGeocoder:
+    """
+    Offline geocoder over gazetteer places.
+
+    Locations are matched on their normalized name, optionally followed by
+    the country code ("cambridge us"), where a shared name resolves to the
+    most populous place. Anything else is left to the remote geocoder.
+
+    Fuzzy matching of other spellings is only meant as a fallback while the
+    remote geocoder is unavailable: candidates sharing the most trigrams are
+    found through an inverted index and the closest by edit distance is
+    accepted if it is within allowed_edits of the name and similar enough.
+    """
+
+    def __init__(self, places: List[Dict], min_score: float = 0.8, candidates: int = 5):
+        """
+        Build the indexes.
+
+        Args:
+            places: Places loaded with load_gazetteer
+            min_score: Minimum edit similarity (0-1) of a fuzzy match
+            candidates: Number of trigram candidates compared by edit distance
+        """
+        self.min_score = min_score
+        self.candidates = candidates
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._keys: List[str] = []
+        self._names: List[str] = []
+        self._exact: Dict[str, int] = {}
+        coordinates = []
+        postings = defaultdict(list)
+        for index, place in enumerate(sorted(places, key=lambda place: -place['population'])):
+            key = normalize_location(place['name'])
+            self._keys.append(key)
+            self._names.append(place['name'])
+            coordinates.append(place['coordinates'])
+            if place['country']:
+                self._exact.setdefault(f"{key} {place['country'].casefold()}", index)
+            if key and key not in self._exact:
+                self._exact[key] = index
+                for trigram in set(trigrams(key)):
+                    postings[trigram].append(index)
+
+        self._coordinates = np.array(coordinates, dtype=np.float64).reshape(-1, 2)
+        self._trigram_counts = np.array([len(set(trigrams(key))) for key in self._keys], dtype=np.int32)
+        self._postings = {
+            trigram: np.array(indexes, dtype=np.int32) for trigram, indexes in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, location: str, fuzzy: bool = False) -> Optional[Tuple[float, float]]:
+        """
+        Geocode a location from the gazetteer.
+
+        Args:
+            location: Location string to geocode
+            fuzzy: Whether to also match misspelt names
+
+        Returns:
+            (longitude, latitude), or None if there is no confident match
+        """
+        match = self.match(location, fuzzy=fuzzy)
+        return match[1] if match is not None else None
+
+    def match(self, location: str, fuzzy: bool = False) -> Optional[Tuple[str, Tuple[float, float]]]:
+        """
+        Find the gazetteer place for a location.
+
+        Args:
+            location: Location string to geocode
+            fuzzy: Whether to also match misspelt names
+
+        Returns:
+            Tuple of (place name, (longitude, latitude)), or None if there is
+            no confident match
+        """
+        key = normalize_location(location)
+        index = self._exact.get(key) if key else None
+        score = 1.0
+        if index is None and key and fuzzy:
+            index, score = self._fuzzy_match(key)
+
+        with self._lock:
+            if index is None or score < self.min_score:
+                self.misses += 1
+                return None
+            self.hits += 1
+        logger.debug("Local geocode of %s matched %s (score %.2f)", location, self._names[index], score)
+        return self._names[index], tuple(self._coordinates[index].tolist())
+
+    def _fuzzy_match(self, key: str) -> Tuple[Optional[int], float]:
+        """Find the closest place name by trigram overlap, then edit distance."""
+        grams = set(trigrams(key))
+        matches = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not matches:
+            return None, 0.0
+
+        shared = np.bincount(np.concatenate(matches), minlength=len(self._keys))
+        dice = 2 * shared / (len(grams) + self._trigram_counts)
+        count = min(self.candidates, len(dice))
+        candidates = np.argpartition(-dice, count - 1)[:count]
+
+        best_index, best_distance = None, allowed_edits(len(key)) + 1
+        for index in candidates[np.argsort(-dice[candidates], kind='stable')]:
+            if shared[index] == 0:
+                break
+            distance = edit_distance(key, self._keys[index])
+            if distance < best_distance:
+                best_index, best_distance = int(index), distance
+        if best_index is None:
+            return None, 0.0
+        return best_index, edit_similarity(key, self._keys[best_index])
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of places."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._keys)}
+
+
+class _TrieNode:
+    """Prefix trie node holding the best ranked keys below it."""
+
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.top: List[str] = []
+
+
+class SuggestionIndex:
+    """
+    Prefix index of place names ranked by popularity.
+
+    Every trie node keeps its own short list of the best ranked names below
+    it, so a lookup costs one step per character of the prefix regardless of
+    the number of places. Places rank by how often they were geocoded
+    successfully, then by population. Names are matched from their start and
+    from the start of each later word, with whole-name matches listed first.
+    """
+
+    def __init__(self, limit: int = 10, max_entries: int = 50000):
+        """
+        Initialize the index.
+
+        Args:
+            limit: Maximum number of suggestions kept for any prefix
+            max_entries: Maximum number of places; once full, newly
+                geocoded names are no longer added
+        """
+        self.limit = limit
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict] = {}
+        self._names = _TrieNode()
+        self._words = _TrieNode()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str, coordinates: Tuple[float, float], country: str = '',
+            population: int = 0) -> None:
+        """
+        Add a place, or update the population and coordinates of a known one.
+
+        Args:
+            name: Display name
+            coordinates: (longitude, latitude)
+            country: Country code
+            population: Population used to rank places never geocoded
+        """
+        key = normalize_location(name)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    return
+                entry = self._entries[key] = {'name': name, 'hits': 0}
+            entry.update(country=country, coordinates=tuple(coordinates), population=population)
+            self._reindex(key)
+
+    def add_places(self, places: List[Dict]) -> None:
+        """Add places loaded with load_gazetteer."""
+        for place in places:
+            self.add(place['name'], place['coordinates'], place['country'], place['population'])
+
+    def record(self, name: str, coordinates: Tuple[float, float]) -> None:
+        """
+        Count a successful geocode of a name, adding the name if it is new.
+
+        Args:
+            name: Canonical place name from the gazetteer or geocoder,
+                never the text a user typed
+            coordinates: Geocoded (longitude, latitude)
+        """
+        key = normalize_location(name)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    return
+                entry = self._entries[key] = {
+                    'name': name.strip(),
+                    'hits': 0,
+                    'country': '',
+                    'coordinates': tuple(coordinates),
+                    'population': 0
+                }
+            entry['hits'] += 1
+            self._reindex(key)
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Get the best ranked places starting with a prefix.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions, at most the index limit
+
+        Returns:
+            List of suggestions with name, country, lat and lon
+        """
+        key = normalize_location(prefix)
+        if not key:
+            return []
+        limit = min(limit or self.limit, self.limit)
+
+        keys = []
+        for root in (self._names, self._words):
+            node = self._find(root, key)
+            if node is not None:
+                keys.extend(k for k in node.top if k not in keys)
+
+        suggestions = []
+        for key in keys[:limit]:
+            entry = self._entries[key]
+            suggestions.append({
+                'name': entry['name'],
+                'country': entry['country'],
+                'lat': entry['coordinates'][1],
+                'lon': entry['coordinates'][0]
+            })
+        return suggestions
+
+    def _find(self, root: _TrieNode, key: str) -> Optional[_TrieNode]:
+        node = root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _rank(self, key: str) -> Tuple[int, int, str]:
+        entry = self._entries[key]
+        return (-entry['hits'], -entry['population'], key)
+
+    def _reindex(self, key: str) -> None:
+        """Update the ranked lists along every path of a key; called with the lock held."""
+        words = key.split(' ')
+        self._insert(self._names, key)
+        for start in range(1, len(words)):
+            self._insert(self._words, ' '.join(words[start:]), key)
+
+    def _insert(self, root: _TrieNode, path: str, key: Optional[str] = None) -> None:
+        key = key or path
+        node = root
+        for char in path:
+            node = node.children.setdefault(char, _TrieNode())
+            top = node.top if key in node.top else node.top + [key]
+            # Replace rather than sort in place so lock-free readers never
+            # see a list mid-sort
+            node.top = sorted(top, key=self._rank)[:self.limit]
@@ -0,0 +1,357 @@
+"""
+Geometry utilities for route polylines.
+Provides Douglas-Peucker line simplification with tolerances picked from a
+map zoom level or a point budget, and compact encodings for shipping route
+geometry to clients.
+
+Route geometry is held as a contiguous (N, 2) NumPy array of [lat, lon] rows
+and only converted to nested lists at the serialization boundary.
+"""
+
+import base64
+import math
+from typing import Optional, Sequence, Union
+import numpy as np
+
+# Metres per pixel at zoom level 0 on the equator for 256px Web Mercator tiles
+METERS_PER_PIXEL_ZOOM_0 = 156543.03392
+
+# Approximate metres per degree of latitude
+METERS_PER_DEGREE = 111320.0
+
+# Mean Earth radius in metres
+EARTH_RADIUS = 6371008.8
+
+# Geometry encodings clients can request; 'latlon' is plain [[lat, lon], ...]
+GEOMETRY_FORMATS = ('latlon', 'polyline', 'polyline6', 'float32', 'delta')
+
+# Route geometry as an (N, 2) array or any sequence of [lat, lon] pairs
+Points = Union[np.ndarray, Sequence[Sequence[float]]]
+
+def as_points(points: Points) -> np.ndarray:
+    """Get points as an (N, 2) float64 array, without copying if it already is one."""
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+def to_latlon_array(coordinates: Points) -> np.ndarray:
+    """
+    Convert GeoJSON [lon, lat(, elevation)] coordinates to [lat, lon] rows.
+
+    Args:
+        coordinates: GeoJSON coordinate list
+
+    Returns:
+        Contiguous (N, 2) array of [lat, lon]
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    if coordinates.size == 0:
+        return np.empty((0, 2))
+    return np.ascontiguousarray(coordinates[:, 1::-1])
+
+
+def haversine_distances(start: Points, end: Points) -> np.ndarray:
+    """
+    Get the haversine distance between paired points.
+
+    Args:
+        start: [lat, lon] points
+        end: [lat, lon] points, one per start point
+
+    Returns:
+        Array of distances in metres
+    """
+    start = np.radians(as_points(start))
+    end = np.radians(as_points(end))
+    a = (np.sin((end[:, 0] - start[:, 0]) / 2) ** 2
+         + np.cos(start[:, 0]) * np.cos(end[:, 0]) * np.sin((end[:, 1] - start[:, 1]) / 2) ** 2)
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def segment_lengths(points: Points) -> np.ndarray:
+    """
+    Get the haversine length of every segment of a line.
+
+    Args:
+        points: Line as [lat, lon] points
+
+    Returns:
+        Array of N - 1 segment lengths in metres
+    """
+    points = as_points(points)
+    return haversine_distances(points[:-1], points[1:])
+
+
+def line_length(points: Points) -> float:
+    """Get the haversine length of a line in metres."""
+    return float(segment_lengths(points).sum())
+
+
+def bounding_box(points: Points) -> Optional[np.ndarray]:
+    """
+    Get the bounding box of a line in Leaflet bounds order.
+
+    Args:
+        points: Line as [lat, lon] points
+
+    Returns:
+        (2, 2) array [[south, west], [north, east]], or None for an empty line
+    """
+    points = as_points(points)
+    if len(points) == 0:
+        return None
+    return np.stack([points.min(axis=0), points.max(axis=0)])
+
+
+def resample_line(points: Points, spacing: float) -> np.ndarray:
+    """
+    Resample a line at a fixed distance along its length.
+
+    Args:
+        points: Line as [lat, lon] points
+        spacing: Distance in metres between resampled points
+
+    Returns:
+        Resampled line; both endpoints are kept
+    """
+    points = as_points(points)
+    if len(points) < 2 or spacing <= 0:
+        return points
+    distances = np.concatenate(([0.0], np.cumsum(segment_lengths(points))))
+    targets = np.append(np.arange(0.0, distances[-1], spacing), distances[-1])
+    return np.column_stack((
+        np.interp(targets, distances, points[:, 0]),
+        np.interp(targets, distances, points[:, 1])
+    ))
+
+
+def meters_per_pixel(zoom: float, latitude: float = 0.0) -> float:
+    """
+    Get the ground resolution of a Web Mercator map.
+
+    Args:
+        zoom: Map zoom level
+        latitude: Latitude in degrees at which to measure
+
+    Returns:
+        Metres covered by one screen pixel
+    """
+    return METERS_PER_PIXEL_ZOOM_0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+
+def tolerance_for_zoom(zoom: float, latitude: float = 0.0, pixel_tolerance: float = 1.0) -> float:
+    """
+    Get a simplification tolerance that is invisible at a zoom level.
+
+    Args:
+        zoom: Map zoom level
+        latitude: Latitude in degrees of the route
+        pixel_tolerance: Allowed deviation in screen pixels
+
+    Returns:
+        Tolerance in metres
+    """
+    return meters_per_pixel(zoom, latitude) * pixel_tolerance
+
+
+def point_significance(points: Points) -> np.ndarray:
+    """
+    Rank every point of a line by Douglas-Peucker significance.
+
+    A point's significance is the largest tolerance at which Douglas-Peucker
+    would still keep it, so one pass serves any tolerance or point budget.
+    Distances are measured in metres on a local equirectangular projection.
+
+    Args:
+        points: Line as [lat, lon] points
+
+    Returns:
+        Significance in metres for each point; endpoints are infinite
+    """
+    points = as_points(points)
+    count = len(points)
+    significance = np.zeros(count)
+    if count == 0:
+        return significance
+    significance[0] = significance[-1] = np.inf
+    if count < 3:
+        return significance
+
+    x_scale = METERS_PER_DEGREE * math.cos(math.radians(points[:, 0].mean()))
+    xs = points[:, 1] * x_scale
+    ys = points[:, 0] * METERS_PER_DEGREE
+
+    stack = [(0, count - 1, math.inf)]
+    while stack:
+        first, last, parent_significance = stack.pop()
+        if last - first < 2:
+            continue
+
+        x1, y1 = xs[first], ys[first]
+        dx, dy = xs[last] - x1, ys[last] - y1
+        px = xs[first + 1:last] - x1
+        py = ys[first + 1:last] - y1
+        length_squared = dx * dx + dy * dy
+        if length_squared == 0:
+            distances = np.hypot(px, py)
+        else:
+            t = np.clip((px * dx + py * dy) / length_squared, 0.0, 1.0)
+            distances = np.hypot(px - t * dx, py - t * dy)
+        offset = int(distances.argmax())
+        max_index = first + 1 + offset
+
+        # A point is never more significant than the split that exposed it
+        point_value = min(float(distances[offset]), parent_significance)
+        significance[max_index] = point_value
+        stack.append((first, max_index, point_value))
+        stack.append((max_index, last, point_value))
+
+    return significance
+
+
+def simplify_line(points: Points, tolerance: Optional[float] = None,
+                  max_points: Optional[int] = None) -> np.ndarray:
+    """
+    Simplify a line with Douglas-Peucker.
+
+    Args:
+        points: Line as [lat, lon] points
+        tolerance: Maximum deviation in metres of dropped points
+        max_points: Maximum number of points to keep
+
+    Returns:
+        Simplified line; endpoints are always kept
+    """
+    points = as_points(points)
+    if len(points) < 3 or (tolerance is None and not max_points):
+        return points
+
+    significance = point_significance(points)
+    keep = np.arange(len(points))
+    if tolerance is not None:
+        keep = keep[significance > tolerance]
+    if max_points and len(keep) > max_points:
+        ranked = np.argsort(-significance[keep], kind='stable')
+        keep = np.sort(keep[ranked[:max(2, max_points)]])
+    return points[keep]
+
+
+def simplify_for_display(points: Points, zoom: Optional[float] = None,
+                         max_points: Optional[int] = None) -> np.ndarray:
+    """
+    Simplify a route for display at a zoom level or within a point budget.
+
+    Args:
+        points: Line as [lat, lon] points
+        zoom: Map zoom level the route will be drawn at
+        max_points: Maximum number of points to keep
+
+    Returns:
+        Simplified line
+    """
+    points = as_points(points)
+    tolerance = None
+    if zoom is not None and len(points):
+        tolerance = tolerance_for_zoom(zoom, float(points[:, 0].mean()))
+    return simplify_line(points, tolerance=tolerance, max_points=max_points)
+
+def encode_polyline(points: Points, precision: int = 5) -> str:
+    """
+    Encode [lat, lon] points with the Google encoded polyline algorithm.
+
+    Args:
+        points: Line as [lat, lon] points
+        precision: Number of decimals kept (5 for Google, 6 for OSRM/Valhalla)
+
+    Returns:
+        Encoded polyline string
+    """
+    scaled = np.round(as_points(points) * 10 ** precision).astype(np.int64)
+    if len(scaled) == 0:
+        return ''
+    deltas = np.diff(scaled, axis=0, prepend=0).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    # Split every value into 5-bit chunks, least significant first; all but
+    # the last chunk of a value carry the 0x20 continuation flag
+    shifts = 5 * np.arange(7)
+    chunks = (values[:, None] >> shifts) & 0x1f
+    chunk_counts = 1 + ((values[:, None] >> shifts[1:]) > 0).sum(axis=1)
+    used = shifts < 5 * chunk_counts[:, None]
+    continued = shifts < 5 * (chunk_counts - 1)[:, None]
+    characters = (chunks | (continued * 0x20)) + 63
+    return characters[used].astype(np.uint8).tobytes().decode('ascii')
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> np.ndarray:
+    """
+    Decode a Google encoded polyline into [lat, lon] points.
+
+    Args:
+        encoded: Encoded polyline string
+        precision: Number of decimals used when encoding
+
+    Returns:
+        Line as [lat, lon] points
+    """
+    data = np.frombuffer(encoded.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    if data.size == 0:
+        return np.empty((0, 2))
+    ends = np.flatnonzero(data < 0x20)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    value_index = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = 5 * (np.arange(len(data)) - starts[value_index])
+    values = np.add.reduceat((data & 0x1f) << shifts, starts)
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 10 ** precision
+
+
+def pack_float32(points: Points) -> str:
+    """Pack [lat, lon] points as base64 little-endian float32 pairs."""
+    return base64.b64encode(as_points(points).astype('<f4').tobytes()).decode('ascii')
+
+
+def unpack_float32(encoded: str) -> np.ndarray:
+    """Unpack points produced by pack_float32."""
+    values = np.frombuffer(base64.b64decode(encoded), dtype='<f4')
+    return values.astype(np.float64).reshape(-1, 2)
+
+
+def pack_delta(points: Points) -> str:
+    """
+    Pack [lat, lon] points as base64 little-endian int32 microdegree deltas.
+
+    The first pair is absolute; every following pair is the difference from
+    the previous point.
+    """
+    scaled = np.round(as_points(points) * 1e6).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=0) if len(scaled) else scaled
+    return base64.b64encode(deltas.astype('<i4').tobytes()).decode('ascii')
+
+
+def unpack_delta(encoded: str) -> np.ndarray:
+    """Unpack points produced by pack_delta."""
+    deltas = np.frombuffer(base64.b64decode(encoded), dtype='<i4').astype(np.int64)
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 1e6
+
+
+def encode_geometry(points: Points, geometry_format: str = 'latlon') -> Union[str, np.ndarray]:
+    """
+    Encode route geometry in one of GEOMETRY_FORMATS.
+
+    Args:
+        points: Line as [lat, lon] points
+        geometry_format: Requested encoding
+
+    Returns:
+        The (N, 2) array for 'latlon', left for the app's JSON provider to
+        write as rounded [lat, lon] lists, otherwise the encoded string
+    """
+    if geometry_format == 'polyline':
+        return encode_polyline(points, precision=5)
+    if geometry_format == 'polyline6':
+        return encode_polyline(points, precision=6)
+    if geometry_format == 'float32':
+        return pack_float32(points)
+    if geometry_format == 'delta':
+        return pack_delta(points)
+    return as_points(points)
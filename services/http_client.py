@@ -0,0 +1,95 @@
+"""
+HTTP client setup for the OpenRouteService API.
+Provides a pooled keep-alive requests session with explicit timeouts and a
+retry policy, and an ORS client that sends all its requests through it.
+"""
+
+from typing import Optional, Tuple
+import openrouteservice
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+# Upstream statuses worth retrying; 429 is left to the ORS client
+RETRY_STATUSES = (502, 503, 504)
+
+def create_http_session(pool_size: int, retries: int = 2,
+                        backoff_factor: float = 0.2) -> requests.Session:
+    """
+    Create a pooled HTTP session.
+
+    Connections are kept alive and reused, so concurrent requests from the
+    route service threads skip the TCP and TLS handshakes. The session is
+    safe to share between those threads.
+
+    Args:
+        pool_size: Connections kept open per host, matching the number of
+            threads issuing requests
+        retries: Retries of failed connections and gateway errors
+        backoff_factor: Base delay in seconds of the exponential backoff
+
+    Returns:
+        Configured session
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'POST']),
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers['Connection'] = 'keep-alive'
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def create_ors_client(api_key: str, pool_size: Optional[int] = None,
+                      timeout: Optional[Tuple[float, float]] = None,
+                      retries: Optional[int] = None,
+                      retry_backoff: Optional[float] = None,
+                      retry_timeout: Optional[int] = None,
+                      retry_over_query_limit: Optional[bool] = None) -> openrouteservice.Client:
+    """
+    Create an ORS client using a pooled session.
+
+    Settings left as None are read from Config.
+
+    Args:
+        api_key: ORS API key
+        pool_size: Connections kept open, defaults to ORS_POOL_SIZE
+        timeout: (connect, read) timeout in seconds, defaults to
+            ORS_CONNECT_TIMEOUT and ORS_READ_TIMEOUT
+        retries: Session retries, defaults to ORS_RETRIES
+        retry_backoff: Session backoff factor, defaults to ORS_RETRY_BACKOFF
+        retry_timeout: Seconds the ORS client keeps retrying, defaults to
+            ORS_RETRY_TIMEOUT
+        retry_over_query_limit: Whether the ORS client retries rate-limited
+            calls, defaults to ORS_RETRY_OVER_QUERY_LIMIT
+
+    Returns:
+        ORS client
+    """
+    client = openrouteservice.Client(
+        key=api_key,
+        timeout=timeout or (Config.ORS_CONNECT_TIMEOUT, Config.ORS_READ_TIMEOUT),
+        retry_timeout=Config.ORS_RETRY_TIMEOUT if retry_timeout is None else retry_timeout,
+        retry_over_query_limit=(
+            Config.ORS_RETRY_OVER_QUERY_LIMIT
+            if retry_over_query_limit is None else retry_over_query_limit
+        )
+    )
+    # The client has no session argument; swap in the pooled session
+    client._session = create_http_session(
+        pool_size or Config.ORS_POOL_SIZE,
+        retries=Config.ORS_RETRIES if retries is None else retries,
+        backoff_factor=Config.ORS_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+    )
+    return client
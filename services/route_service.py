@@ -7,27 +7,202 @@ Provides a clean interface for the OpenRouteService API.
 """
 
 import logging
-from typing import List, Dict, Tuple, Optional
-import openrouteservice
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Iterator, List, Dict, Tuple, Optional, Union
 from openrouteservice.exceptions import ApiError
 from config import Config
-from utils.exceptions import RouteFinderException, GeocodingError
+from services.cache import MISSING, TTLCache, create_cache
+from services.concurrency import (
+    CircuitBreaker, Deadline, LatencyTracker, SingleFlight, bounded_as_completed, hedged_call
+)
+from services.gazetteer import LocalGeocoder, SuggestionIndex, load_gazetteer
+from services.http_client import create_ors_client
+from services.routing_engine import LocalRoutingEngine, create_routing_engine
+from services.geometry import bounding_box, simplify_line, to_latlon_array
+from utils.exceptions import (
+    CircuitOpenError, DeadlineExceededError, RouteFinderException, GeocodingError
+)
+from utils.validators import normalize_location
 
 logger = logging.getLogger(__name__)
 
+# A location string to geocode, or (longitude, latitude) coordinates
+Location = Union[str, Tuple[float, float]]
+
+def format_location(location: Location) -> str:
+    """Describe a location for messages, writing coordinates as 'lat,lon'."""
+    if isinstance(location, str):
+        return location
+    longitude, latitude = location
+    return f"{latitude:.6f},{longitude:.6f}"
+
+
+# Default of constructor arguments for which None means "disabled", so that
+# only an omitted argument is built from the Config settings
+FROM_CONFIG = object()
+
+# Pelias layers whose labels may be suggested to other users; addresses,
+# streets and venues can identify where a user lives or works
+SUGGESTION_LAYERS = frozenset({'locality', 'localadmin', 'county', 'region', 'country'})
+
+
 class RouteService:
     """Service for handling route calculations and geocoding."""
     
-    def __init__(self, api_key: str):
-        """Initialize the route service with API key."""
+    def __init__(self, api_key: str, max_workers: Optional[int] = None,
+                 batch_workers: Optional[int] = None,
+                 geocode_cache: Optional[TTLCache] = None,
+                 geocode_negative_ttl: Optional[float] = None,
+                 route_cache: Optional[TTLCache] = None,
+                 route_cache_precision: Optional[int] = None,
+                 suggestion_index: Optional[SuggestionIndex] = None,
+                 local_geocoder: Optional[LocalGeocoder] = FROM_CONFIG,
+                 routing_engine: Optional[LocalRoutingEngine] = FROM_CONFIG,
+                 ors_settings: Optional[Dict] = None,
+                 breaker_settings: Optional[Dict] = None,
+                 hedge_percentile: Optional[float] = FROM_CONFIG,
+                 hedge_min_samples: Optional[int] = None):
+        """
+        Initialize the route service with API key.
+        
+        Omitted arguments are built from Config. Pass local_geocoder=None to
+        disable offline geocoding and routing_engine=None to route with ORS.
+        ors_settings holds create_ors_client keyword arguments such as
+        timeout and retries; a missing or zero pool_size is sized for the
+        service's threads. breaker_settings holds CircuitBreaker keyword
+        arguments for every ORS endpoint, and hedge_percentile=None turns
+        hedged requests off.
+        """
         self.api_key = api_key
-        self.client = openrouteservice.Client(key=api_key)
         self.supported_modes = Config.get_supported_modes()
+        self.geometry_tolerance = Config.GEOMETRY_BASE_TOLERANCE
+        
+        # Geocoding results keyed by normalized location, with failed
+        # lookups remembered for a shorter time
+        if geocode_cache is None:
+            geocode_cache = create_cache(
+                Config.CACHE_TYPE,
+                max_size=Config.GEOCODE_CACHE_SIZE,
+                ttl=Config.GEOCODE_CACHE_TTL,
+                namespace='geocode'
+            )
+        self.geocode_cache = geocode_cache
+        self.geocode_negative_ttl = (
+            Config.GEOCODE_NEGATIVE_CACHE_TTL
+            if geocode_negative_ttl is None else geocode_negative_ttl
+        )
+        
+        # Place names for location suggestions, ranked up as they are geocoded
+        if suggestion_index is None:
+            suggestion_index = SuggestionIndex(
+                limit=Config.SUGGEST_MAX_RESULTS,
+                max_entries=Config.SUGGEST_MAX_ENTRIES
+            )
+            suggestion_index.add_places(load_gazetteer(Config.GAZETTEER_PATH))
+        self.suggestion_index = suggestion_index
+        
+        # Gazetteer lookups answered before the geocode cache and pelias_search
+        if local_geocoder is FROM_CONFIG:
+            local_geocoder = None
+            if Config.GEOCODE_LOCAL_ENABLED:
+                local_geocoder = LocalGeocoder(
+                    load_gazetteer(Config.GAZETTEER_PATH),
+                    min_score=Config.GEOCODE_LOCAL_MIN_SCORE
+                )
+        self.local_geocoder = local_geocoder
+        
+        # Parsed directions results keyed by rounded coordinates and profile
+        if route_cache is None:
+            route_cache = create_cache(
+                Config.CACHE_TYPE,
+                max_size=Config.ROUTE_CACHE_SIZE,
+                ttl=Config.CACHE_DEFAULT_TIMEOUT,
+                namespace='routes'
+            )
+        self.route_cache = route_cache
+        self.route_cache_precision = (
+            Config.ROUTE_CACHE_PRECISION
+            if route_cache_precision is None else route_cache_precision
+        )
+        
+        # Concurrent identical geocode/directions lookups share one upstream call
+        self.in_flight = SingleFlight()
+        self._lookups_lock = threading.Lock()
+        
+        # Bounded pool shared by all requests handled by this worker
+        self.max_workers = max_workers or Config.ROUTE_MAX_WORKERS
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='route-service'
+        )
+        
+        # Separate pool for batch pairs, whose tasks wait on the pool above
+        self.batch_workers = batch_workers or Config.BATCH_MAX_CONCURRENCY
+        self.batch_executor = ThreadPoolExecutor(
+            max_workers=self.batch_workers,
+            thread_name_prefix='route-batch'
+        )
+        
+        # Offline engine answering directions instead of ORS when the
+        # deployment selects ROUTING_ENGINE 'local'
+        if routing_engine is FROM_CONFIG:
+            routing_engine = create_routing_engine(
+                Config.ROUTING_ENGINE, Config.ROUTING_GRAPH_PATH,
+                landmarks=Config.ROUTING_LANDMARKS,
+                max_snap_distance=Config.ROUTING_MAX_SNAP_DISTANCE
+            )
+        self.routing_engine = routing_engine
+        
+        # Circuit breaker and latency window per ORS endpoint; with hedging
+        # enabled, calls slower than the latency percentile get a second
+        # attempt on their own pool
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self._upstream_lock = threading.Lock()
+        self.breaker_settings = {
+            'window_size': Config.ORS_BREAKER_WINDOW,
+            'min_calls': Config.ORS_BREAKER_MIN_CALLS,
+            'failure_rate': Config.ORS_BREAKER_FAILURE_RATE,
+            'slow_call_duration': Config.ORS_BREAKER_SLOW_CALL_SECONDS,
+            'slow_call_rate': Config.ORS_BREAKER_SLOW_CALL_RATE,
+            'reset_timeout': Config.ORS_BREAKER_RESET_TIMEOUT,
+            **(breaker_settings or {})
+        }
+        if hedge_percentile is FROM_CONFIG:
+            hedge_percentile = Config.ORS_HEDGE_PERCENTILE if Config.ORS_HEDGE_ENABLED else None
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = (
+            Config.ORS_HEDGE_MIN_SAMPLES if hedge_min_samples is None else hedge_min_samples
+        )
+        self.hedge_workers = 2 * self.max_workers
+        self.hedge_executor = ThreadPoolExecutor(
+            max_workers=self.hedge_workers,
+            thread_name_prefix='ors-hedge'
+        )
+        
+        # One pooled session per worker, sized for every thread that can be
+        # waiting on ORS at once, including hedged attempts and the losing
+        # attempts they leave running
+        ors_settings = dict(ors_settings or {})
+        pool_size = self.max_workers + self.batch_workers
+        if self.hedge_percentile is not None:
+            pool_size += self.hedge_workers
+        ors_settings['pool_size'] = (
+            ors_settings.get('pool_size', Config.ORS_POOL_SIZE) or pool_size
+        )
+        self.client = create_ors_client(api_key, **ors_settings)
     
     def geocode_location(self, location: str) -> Tuple[float, float]:
         """
         Geocode a location string to coordinates.
         
+        Exact gazetteer place names are resolved offline; other locations
+        go through the geocode cache and pelias_search, falling back to a
+        fuzzy gazetteer match only while the geocode circuit is open.
+        
         Args:
             location: Location string to geocode
             
@@ -37,22 +212,133 @@ class RouteService:
         Raises:
             GeocodingError: If geocoding fails
         """
+        if self.local_geocoder is not None:
+            match = self.local_geocoder.match(location)
+            if match is not None:
+                name, coordinates = match
+                self.suggestion_index.record(name, coordinates)
+                return coordinates
+        
+        cache_key = normalize_location(location)
+        place = MISSING
+        if cache_key:
+            place = self.geocode_cache.get(cache_key)
+            if place is None:
+                raise GeocodingError(f"Location not found: {location}")
+        if place is MISSING:
+            place = self.in_flight.do(
+                ('geocode', cache_key or location),
+                self._search_location, location, cache_key
+            )
+        
+        # Only the geocoder's canonical label becomes a suggestion, never the
+        # text as typed, which may be a private address or a typo
+        coordinates = tuple(place['coordinates'])
+        if place['label']:
+            self.suggestion_index.record(place['label'], coordinates)
+        return coordinates
+    
+    def _search_location(self, location: str, cache_key: str) -> Dict:
+        """
+        Geocode a location through pelias_search and cache the outcome.
+        
+        Returns:
+            Place dictionary with coordinates as (longitude, latitude) and
+            the pelias label, or None unless the place is a town or larger
+            area that may be suggested to other users
+        """
         try:
             logger.info(f"Geocoding location: {location}")
-            result = self.client.pelias_search(text=location, size=1)
+            result = self._call_ors('geocode', self.client.pelias_search, text=location, size=1)
             
             if not result.get('features'):
+                if cache_key:
+                    self.geocode_cache.set(cache_key, None, ttl=self.geocode_negative_ttl)
                 raise GeocodingError(f"Location not found: {location}")
             
-            coordinates = result['features'][0]['geometry']['coordinates']
-            return tuple(coordinates)
+            feature = result['features'][0]
+            properties = feature.get('properties') or {}
+            place = {
+                'coordinates': tuple(feature['geometry']['coordinates']),
+                'label': (
+                    properties.get('label')
+                    if properties.get('layer') in SUGGESTION_LAYERS else None
+                )
+            }
+            if cache_key:
+                self.geocode_cache.set(cache_key, place)
+            return place
             
+        except GeocodingError:
+            raise
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping geocoding of {location}: {e}")
+            # Misspelt gazetteer names are only trusted while pelias is down
+            match = self.local_geocoder.match(location, fuzzy=True) if self.local_geocoder else None
+            if match is not None:
+                name, coordinates = match
+                logger.warning(f"Geocoded {location} as gazetteer place {name} while the geocoder is unavailable")
+                return {'coordinates': coordinates, 'label': name}
+            raise GeocodingError(f"Geocoding service unavailable for location: {location}")
         except ApiError as e:
             logger.error(f"API error during geocoding: {e}")
             raise GeocodingError(f"Failed to geocode location: {location}")
         except Exception as e:
             logger.error(f"Unexpected error during geocoding: {e}")
-            raise GeocodingError(f"Geocoding service unavailable")
+            raise GeocodingError(f"Geocoding service unavailable for location: {location}")
+    
+    def geocode_locations(self, locations: List[Location],
+                          deadline: Optional[Deadline] = None,
+                          lookups: Optional[Dict[str, Future]] = None) -> List[Tuple[float, float]]:
+        """
+        Geocode several location strings concurrently.
+        
+        Locations already given as coordinates are not geocoded.
+        
+        Args:
+            locations: Location strings or (longitude, latitude) coordinates
+            deadline: Optional time budget for all lookups
+            lookups: Optional lookups shared between calls, keyed by
+                normalized location, so that each location is geocoded once
+                across all of them
+            
+        Returns:
+            List of (longitude, latitude) tuples in the same order as locations
+            
+        Raises:
+            GeocodingError: If any location fails to geocode, naming the first
+                failing location in input order
+            DeadlineExceededError: If a lookup is still running at the deadline
+        """
+        futures = [
+            self._submit_geocode(location, lookups) if isinstance(location, str) else None
+            for location in locations
+        ]
+        coordinates = []
+        for location, future in zip(locations, futures):
+            if future is None:
+                coordinates.append(tuple(location))
+                continue
+            try:
+                coordinates.append(future.result(timeout=deadline.remaining() if deadline else None))
+            except FutureTimeoutError:
+                if lookups is None:
+                    for pending in futures:
+                        if pending is not None:
+                            pending.cancel()
+                raise DeadlineExceededError(f"Timed out geocoding location: {location}")
+        return coordinates
+    
+    def _submit_geocode(self, location: str, lookups: Optional[Dict[str, Future]]) -> Future:
+        """Start geocoding a location, reusing a lookup already in lookups."""
+        if lookups is None:
+            return self.executor.submit(self.geocode_location, location)
+        key = normalize_location(location) or location
+        with self._lookups_lock:
+            future = lookups.get(key)
+            if future is None:
+                future = lookups[key] = self.executor.submit(self.geocode_location, location)
+        return future
     
     def get_route_for_mode(self, origin_coords: Tuple[float, float], 
                           destination_coords: Tuple[float, float], 
@@ -69,14 +355,38 @@ class RouteService:
         Returns:
             Dictionary with route information or None if route not found
         """
+        cache_key = self._route_cache_key(origin_coords, destination_coords, ors_mode)
+        cached = self.route_cache.get(cache_key)
+        if cached is not MISSING:
+            return dict(cached)
+        
+        route_info = self.in_flight.do(
+            ('route', cache_key),
+            self._fetch_route, origin_coords, destination_coords,
+            ors_mode, mode_name, cache_key
+        )
+        return dict(route_info) if route_info else None
+    
+    def _fetch_route(self, origin_coords: Tuple[float, float],
+                     destination_coords: Tuple[float, float],
+                     ors_mode: str, mode_name: str, cache_key: str) -> Optional[Dict]:
+        """Fetch and parse a route from the routing engine or ORS directions API and cache it."""
         try:
             logger.info(f"Getting route for mode: {mode_name}")
             
-            route = self.client.directions(
-                coordinates=(origin_coords, destination_coords),
-                profile=ors_mode,
-                format='geojson'
-            )
+            if self.routing_engine is not None:
+                route = self.routing_engine.directions(
+                    coordinates=(origin_coords, destination_coords),
+                    profile=ors_mode,
+                    format='geojson'
+                )
+            else:
+                route = self._call_ors(
+                    f"directions:{ors_mode}", self.client.directions,
+                    coordinates=(origin_coords, destination_coords),
+                    profile=ors_mode,
+                    format='geojson'
+                )
             
             if not route.get('features'):
                 logger.warning(f"No route found for mode: {mode_name}")
@@ -90,18 +400,32 @@ class RouteService:
             distance_km = round(distance_meters / 1000, 2)
             duration_seconds = properties['segments'][0]['duration']
             
-            # Convert geometry from [lon, lat] to [lat, lon] for Leaflet
-            geometry = feature['geometry']['coordinates']
-            geometry_latlon = [[coord[1], coord[0]] for coord in geometry]
+            # Convert geometry from [lon, lat] to a [lat, lon] array for Leaflet
+            # and drop points that are redundant at any zoom before caching.
+            # Cached arrays are shared between callers, so make them read-only.
+            geometry_latlon = simplify_line(
+                to_latlon_array(feature['geometry']['coordinates']),
+                tolerance=self.geometry_tolerance
+            )
+            geometry_latlon.flags.writeable = False
+            bbox = bounding_box(geometry_latlon)
+            if bbox is not None:
+                bbox.flags.writeable = False
             
-            return {
+            route_info = {
                 'mode': mode_name,
                 'distance': distance_km,
                 'duration': duration_seconds,
                 'duration_formatted': self._format_duration(duration_seconds),
-                'geometry': geometry_latlon
+                'geometry': geometry_latlon,
+                'bbox': bbox
             }
+            self.route_cache.set(cache_key, route_info)
+            return route_info
             
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping mode {mode_name}: {e}")
+            return None
         except ApiError as e:
             logger.warning(f"API error for mode {mode_name}: {e}")
             return None
@@ -109,13 +433,15 @@ class RouteService:
             logger.error(f"Unexpected error for mode {mode_name}: {e}")
             return None
     
-    def get_routes(self, origin: str, destination: str) -> List[Dict]:
+    def get_routes(self, origin: Location, destination: Location,
+                   deadline: Optional[Deadline] = None) -> List[Dict]:
         """
         Get all available routes between origin and destination.
         
         Args:
-            origin: Origin location string
-            destination: Destination location string
+            origin: Origin location string or (longitude, latitude)
+            destination: Destination location string or (longitude, latitude)
+            deadline: Optional time budget for the whole lookup
             
         Returns:
             List of route dictionaries
@@ -123,31 +449,54 @@ class RouteService:
         Raises:
             RouteFinderException: If no routes can be found
         """
-        try:
-            # Geocode locations
-            origin_coords = self.geocode_location(origin)
-            destination_coords = self.geocode_location(destination)
+        routes, _ = self.compare_routes(origin, destination, deadline=deadline)
+        return routes
+    
+    def compare_routes(self, origin: Location, destination: Location,
+                       deadline: Optional[Deadline] = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Get routes for every mode that completes within a deadline.
+        
+        Geocoding and the directions calls all share the deadline. Modes still
+        in flight when it expires are reported as missing instead of delaying
+        the response; their calls finish in the background and fill the cache.
+        
+        Args:
+            origin: Origin location string or (longitude, latitude)
+            destination: Destination location string or (longitude, latitude)
+            deadline: Optional time budget for the whole lookup
+            
+        Returns:
+            Tuple of (route dictionaries, names of modes that ran out of time)
             
-            logger.info(f"Finding routes from {origin} to {destination}")
+        Raises:
+            DeadlineExceededError: If geocoding or every mode ran out of time
+            RouteFinderException: If no routes can be found
+        """
+        try:
+            # Geocode both locations concurrently
+            origin_coords, destination_coords = self.geocode_locations(
+                [origin, destination], deadline=deadline
+            )
             
-            routes = []
+            logger.info(f"Finding routes from {format_location(origin)} to {format_location(destination)}")
             
-            # Get routes for each supported mode
-            for ors_mode, mode_name in self.supported_modes.items():
-                route = self.get_route_for_mode(
-                    origin_coords, destination_coords, ors_mode, mode_name
-                )
-                if route:
-                    routes.append(route)
+            routes, missing_modes = self._get_routes_for_coords(
+                origin_coords, destination_coords, deadline=deadline
+            )
             
             if not routes:
-                raise RouteFinderException(
-                    f"No routes found between {origin} and {destination}. "
-                    "Please check the locations and try again."
-                )
+                if missing_modes:
+                    raise DeadlineExceededError(
+                        f"Timed out finding routes between {format_location(origin)} "
+                        f"and {format_location(destination)}"
+                    )
+                raise self._no_routes_error(origin, destination)
             
+            if missing_modes:
+                logger.warning(f"Deadline expired before modes: {', '.join(missing_modes)}")
             logger.info(f"Found {len(routes)} routes")
-            return routes
+            return routes, missing_modes
             
         except GeocodingError:
             # Re-raise geocoding errors as-is
@@ -159,6 +508,339 @@ class RouteService:
             logger.error(f"Unexpected error getting routes: {e}")
             raise RouteFinderException("Service temporarily unavailable. Please try again later.")
     
+    def iter_routes(self, origin: Location, destination: Location,
+                    deadline: Optional[Deadline] = None) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Get routes for every mode, one at a time as each mode completes.
+        
+        Both locations are geocoded before this returns, so geocoding errors
+        are raised here rather than while iterating. The fastest mode is
+        available as soon as its directions call returns.
+        
+        Args:
+            origin: Origin location string or (longitude, latitude)
+            destination: Destination location string or (longitude, latitude)
+            deadline: Optional time budget for the whole lookup
+            
+        Returns:
+            Iterator of (mode name, route dictionary or None if the mode
+            failed) in completion order; modes never yielded ran out of time
+            
+        Raises:
+            GeocodingError: If a location cannot be geocoded
+            DeadlineExceededError: If geocoding ran out of time
+        """
+        origin_coords, destination_coords = self.geocode_locations(
+            [origin, destination], deadline=deadline
+        )
+        logger.info(f"Streaming routes from {format_location(origin)} to {format_location(destination)}")
+        return self._iter_routes_for_coords(origin_coords, destination_coords, deadline=deadline)
+    
+    def iter_routes_batch(self, pairs: List[Tuple[Location, Location]]
+                          ) -> Iterator[Tuple[int, Union[List[Dict], RouteFinderException]]]:
+        """
+        Get routes for many origin/destination pairs as they complete.
+        
+        Pairs are processed with at most batch_workers pairs in flight, each
+        routed as soon as its own endpoints are geocoded, so the first
+        results do not wait for the rest of the batch. Repeated locations are
+        geocoded once per batch, whether or not the geocode cache holds
+        them. Failures are reported per pair instead of aborting the batch.
+        
+        Args:
+            pairs: List of (origin, destination) location strings or
+                (longitude, latitude) coordinates
+            
+        Yields:
+            Tuples of (pair index, list of routes or the pair's error) in
+            completion order
+        """
+        lookups: Dict[str, Future] = {}
+        
+        def route_pair(pair: Tuple[Location, Location]) -> List[Dict]:
+            origin, destination = pair
+            origin_coords, destination_coords = self.geocode_locations(
+                [origin, destination], lookups=lookups
+            )
+            routes, _ = self._get_routes_for_coords(origin_coords, destination_coords)
+            if not routes:
+                raise self._no_routes_error(origin, destination)
+            return routes
+        
+        for index, future in bounded_as_completed(
+                self.batch_executor, route_pair, pairs, self.batch_workers):
+            try:
+                yield index, future.result()
+            except RouteFinderException as e:
+                yield index, e
+            except Exception as e:
+                logger.error(f"Unexpected error getting batch routes: {e}")
+                yield index, RouteFinderException(
+                    "Service temporarily unavailable. Please try again later."
+                )
+    
+    def get_routes_batch(self, pairs: List[Tuple[Location, Location]]
+                         ) -> List[Union[List[Dict], RouteFinderException]]:
+        """
+        Get routes for many origin/destination pairs.
+        
+        Args:
+            pairs: List of (origin, destination) location strings or
+                (longitude, latitude) coordinates
+            
+        Returns:
+            List with the routes or the error for each pair, in input order
+        """
+        results = [None] * len(pairs)
+        for index, result in self.iter_routes_batch(pairs):
+            results[index] = result
+        return results
+    
+    def get_matrix_for_mode(self, origin_coords: List[Tuple[float, float]],
+                            destination_coords: List[Tuple[float, float]],
+                            ors_mode: str, mode_name: str) -> Optional[Dict]:
+        """
+        Get distances and durations between all origins and destinations.
+        
+        Uses a single ORS matrix call for the profile instead of one
+        directions call per pair.
+        
+        Args:
+            origin_coords: Origin coordinates (longitude, latitude)
+            destination_coords: Destination coordinates (longitude, latitude)
+            ors_mode: OpenRouteService mode string
+            mode_name: Display name for the mode
+            
+        Returns:
+            Dictionary with 'distances' (km) and 'durations' (seconds) grids
+            indexed [origin][destination], with None for unreachable pairs,
+            or None if the matrix could not be fetched
+        """
+        try:
+            logger.info(f"Getting {len(origin_coords)}x{len(destination_coords)} matrix for mode: {mode_name}")
+            
+            locations = list(origin_coords) + list(destination_coords)
+            matrix = self._call_ors(
+                f"matrix:{ors_mode}", self.client.distance_matrix,
+                locations=locations,
+                profile=ors_mode,
+                sources=list(range(len(origin_coords))),
+                destinations=list(range(len(origin_coords), len(locations))),
+                metrics=['distance', 'duration']
+            )
+            
+            distances = [
+                [round(meters / 1000, 2) if meters is not None else None for meters in row]
+                for row in matrix['distances']
+            ]
+            return {
+                'mode': mode_name,
+                'distances': distances,
+                'durations': matrix['durations']
+            }
+            
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping {mode_name} matrix: {e}")
+            return None
+        except ApiError as e:
+            logger.warning(f"API error for {mode_name} matrix: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error for {mode_name} matrix: {e}")
+            return None
+    
+    def get_matrix(self, origins: List[str], destinations: List[str]) -> List[Dict]:
+        """
+        Get distance/duration matrices for every supported mode.
+        
+        Args:
+            origins: Origin location strings
+            destinations: Destination location strings
+            
+        Returns:
+            List of matrix dictionaries (see get_matrix_for_mode) in
+            supported-mode order
+            
+        Raises:
+            GeocodingError: If a location cannot be geocoded
+            RouteFinderException: If no mode returned a matrix
+        """
+        coordinates = self.geocode_locations(list(origins) + list(destinations))
+        origin_coords = coordinates[:len(origins)]
+        destination_coords = coordinates[len(origins):]
+        
+        futures = [
+            self.executor.submit(
+                self.get_matrix_for_mode,
+                origin_coords, destination_coords, ors_mode, mode_name
+            )
+            for ors_mode, mode_name in self.supported_modes.items()
+        ]
+        matrices = [matrix for matrix in (future.result() for future in futures) if matrix]
+        
+        if not matrices:
+            raise RouteFinderException(
+                "No distance matrix could be calculated for these locations. "
+                "Please check the locations and try again."
+            )
+        return matrices
+    
+    def _no_routes_error(self, origin: Location, destination: Location) -> RouteFinderException:
+        """Build the error reported when no mode has a route."""
+        return RouteFinderException(
+            f"No routes found between {format_location(origin)} and {format_location(destination)}. "
+            "Please check the locations and try again."
+        )
+    
+    def _get_routes_for_coords(self, origin_coords: Tuple[float, float],
+                               destination_coords: Tuple[float, float],
+                               deadline: Optional[Deadline] = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Fetch routes for every supported mode concurrently.
+        
+        All directions calls are issued at once on the shared executor and the
+        results are collected in supported-mode order. Modes that fail are
+        left out, exactly as get_route_for_mode reports them.
+        
+        Args:
+            origin_coords: Origin coordinates (longitude, latitude)
+            destination_coords: Destination coordinates (longitude, latitude)
+            deadline: Optional time budget; modes not done by then are skipped
+            
+        Returns:
+            Tuple of (route dictionaries in supported-mode order, names of
+            modes still in flight at the deadline)
+        """
+        results = dict(self._iter_routes_for_coords(
+            origin_coords, destination_coords, deadline=deadline
+        ))
+        
+        routes = [
+            results[mode_name] for mode_name in self.supported_modes.values()
+            if results.get(mode_name)
+        ]
+        missing_modes = [
+            mode_name for mode_name in self.supported_modes.values()
+            if mode_name not in results
+        ]
+        return routes, missing_modes
+    
+    def _iter_routes_for_coords(self, origin_coords: Tuple[float, float],
+                                destination_coords: Tuple[float, float],
+                                deadline: Optional[Deadline] = None
+                                ) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Fetch routes for every supported mode, yielding each as it completes.
+        
+        Args:
+            origin_coords: Origin coordinates (longitude, latitude)
+            destination_coords: Destination coordinates (longitude, latitude)
+            deadline: Optional time budget; iteration stops when it expires
+            
+        Yields:
+            Tuples of (mode name, route dictionary or None if the mode
+            failed) in completion order; modes never yielded ran out of time
+        """
+        futures = {
+            self.executor.submit(
+                self.get_route_for_mode,
+                origin_coords, destination_coords, ors_mode, mode_name
+            ): mode_name
+            for ors_mode, mode_name in self.supported_modes.items()
+        }
+        try:
+            for future in as_completed(futures, timeout=deadline.remaining() if deadline else None):
+                yield futures[future], future.result()
+        except FutureTimeoutError:
+            return
+        finally:
+            # Drop modes still queued on the shared executor once the caller
+            # gives up, so later requests do not wait behind them; calls
+            # already running finish and fill the route cache
+            for future in futures:
+                future.cancel()
+    
+    def _call_ors(self, endpoint: str, func, *args, **kwargs):
+        """
+        Call an ORS client method through the endpoint's circuit breaker.
+        
+        Args:
+            endpoint: Breaker name, e.g. 'geocode' or 'directions:driving-car'
+            func: ORS client method
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Result of func
+            
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        with self._upstream_lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = CircuitBreaker(
+                    endpoint, is_failure=self._is_upstream_failure, **self.breaker_settings
+                )
+                self.latencies[endpoint] = LatencyTracker()
+            latency = self.latencies[endpoint]
+        
+        delay = None
+        if self.hedge_percentile is not None:
+            delay = latency.percentile(self.hedge_percentile, min_samples=self.hedge_min_samples)
+        
+        def attempt():
+            start = time.monotonic()
+            result = func(*args, **kwargs)
+            latency.record(time.monotonic() - start)
+            return result
+        
+        return breaker.call(hedged_call, self.hedge_executor, delay, attempt)
+    
+    @staticmethod
+    def _is_upstream_failure(error: Exception) -> bool:
+        """Count everything but ORS client errors (4xx other than 429) as failures."""
+        if isinstance(error, ApiError):
+            try:
+                status = int(error.status)
+            except (TypeError, ValueError):
+                return True
+            return status == 429 or status >= 500
+        return True
+    
+    def get_upstream_stats(self) -> Dict[str, Dict]:
+        """Get circuit state and p50/p95 latency in seconds per ORS endpoint."""
+        with self._upstream_lock:
+            endpoints = list(self.breakers.items())
+        return {
+            endpoint: {
+                **breaker.stats(),
+                'p50': self.latencies[endpoint].percentile(50),
+                'p95': self.latencies[endpoint].percentile(95)
+            }
+            for endpoint, breaker in endpoints
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get hit/miss counters for the caches and request coalescing."""
+        return {
+            'geocode': self.geocode_cache.stats(),
+            'routes': self.route_cache.stats(),
+            'in_flight': self.in_flight.stats(),
+            'local_geocode': self.local_geocoder.stats() if self.local_geocoder is not None else {}
+        }
+    
+    def _route_cache_key(self, origin_coords: Tuple[float, float],
+                         destination_coords: Tuple[float, float],
+                         ors_mode: str) -> str:
+        """Build the directions cache key from rounded coordinates and profile."""
+        precision = self.route_cache_precision
+        points = ':'.join(
+            f"{lon:.{precision}f},{lat:.{precision}f}"
+            for lon, lat in (origin_coords, destination_coords)
+        )
+        return f"{ors_mode}:{points}"
+    
     def _format_duration(self, seconds: int) -> str:
         """Format duration in seconds to human-readable string."""
         if seconds < 60:
@@ -0,0 +1,578 @@
+"""
+Offline routing engine for the route finder.
+Loads a road graph from an OpenStreetMap XML extract into compressed sparse
+row (CSR) arrays per travel profile, precomputes ALT landmark distances and
+answers fastest-route queries with A*, so directions can be served without
+the OpenRouteService API.
+"""
+
+import heapq
+import logging
+import math
+import re
+import xml.etree.ElementTree as ElementTree
+from operator import sub
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from services.geometry import EARTH_RADIUS, haversine_distances
+from utils.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# Travel speeds in km/h by highway type; other highway types are not
+# routable for the profile unless an access tag explicitly allows them
+PROFILE_SPEEDS = {
+    'driving-car': {
+        'motorway': 110, 'motorway_link': 60, 'trunk': 90, 'trunk_link': 50,
+        'primary': 65, 'primary_link': 40, 'secondary': 55, 'secondary_link': 35,
+        'tertiary': 45, 'tertiary_link': 30, 'unclassified': 35, 'residential': 30,
+        'living_street': 10, 'service': 15
+    },
+    'cycling-regular': {
+        'trunk': 18, 'trunk_link': 18, 'primary': 18, 'primary_link': 18,
+        'secondary': 18, 'secondary_link': 18, 'tertiary': 18, 'tertiary_link': 18,
+        'unclassified': 18, 'residential': 18, 'living_street': 15, 'service': 15,
+        'cycleway': 20, 'track': 12, 'path': 12
+    },
+    'foot-walking': {
+        'trunk': 5, 'trunk_link': 5, 'primary': 5, 'primary_link': 5,
+        'secondary': 5, 'secondary_link': 5, 'tertiary': 5, 'tertiary_link': 5,
+        'unclassified': 5, 'residential': 5, 'living_street': 5, 'service': 5,
+        'pedestrian': 5, 'footway': 5, 'path': 5, 'track': 5, 'cycleway': 5, 'steps': 2
+    }
+}
+
+# Speed in km/h on highways missing from PROFILE_SPEEDS that are tagged as
+# explicitly open to the profile
+PROFILE_DEFAULT_SPEED = {'driving-car': 30, 'cycling-regular': 15, 'foot-walking': 5}
+
+# Access tags checked for each profile, most specific first
+PROFILE_ACCESS_TAGS = {
+    'driving-car': ('motorcar', 'motor_vehicle', 'vehicle', 'access'),
+    'cycling-regular': ('bicycle', 'vehicle', 'access'),
+    'foot-walking': ('foot', 'access')
+}
+
+ACCESS_DENIED = ('no', 'private')
+ACCESS_GRANTED = ('yes', 'designated', 'permissive')
+ONEWAY_FORWARD = ('yes', 'true', '1')
+
+MPH_TO_KMH = 1.609344
+
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+# Landmark times are stored as float32; subtracting two of them can overstate
+# a bound by their rounding error, so bounds give up this fraction of the
+# longest landmark time to stay admissible
+LANDMARK_BOUND_SLACK = 2 ** -22
+
+def parse_maxspeed(value: Optional[str]) -> Optional[float]:
+    """Parse an OSM maxspeed tag such as '50' or '30 mph' into km/h."""
+    match = re.match(r'\s*(\d+(?:\.\d+)?)\s*(mph)?', value or '')
+    if not match:
+        return None
+    speed = float(match.group(1))
+    return speed * MPH_TO_KMH if match.group(2) else speed
+
+
+def way_speed(tags: Dict[str, str], profile: str) -> Optional[float]:
+    """
+    Get the travel speed of a way for a profile.
+
+    Args:
+        tags: OSM tags of the way
+        profile: Routing profile
+
+    Returns:
+        Speed in km/h, or None if the profile may not use the way
+    """
+    highway = tags.get('highway')
+    if not highway:
+        return None
+
+    access = next(
+        (tags[tag] for tag in PROFILE_ACCESS_TAGS[profile] if tag in tags), None
+    )
+    if access in ACCESS_DENIED:
+        return None
+
+    speed = PROFILE_SPEEDS[profile].get(highway)
+    if speed is None:
+        if access not in ACCESS_GRANTED:
+            return None
+        speed = PROFILE_DEFAULT_SPEED[profile]
+    if profile == 'driving-car':
+        speed = parse_maxspeed(tags.get('maxspeed')) or speed
+    return speed
+
+
+def way_directions(tags: Dict[str, str], profile: str) -> Tuple[bool, bool]:
+    """
+    Get whether a profile may travel a way forwards and backwards.
+
+    Args:
+        tags: OSM tags of the way
+        profile: Routing profile
+
+    Returns:
+        Tuple of (forward allowed, backward allowed)
+    """
+    if profile == 'foot-walking':
+        return True, True
+    oneway = tags.get('oneway')
+    if profile == 'cycling-regular' and (
+            tags.get('oneway:bicycle') == 'no'
+            or tags.get('cycleway', '').startswith('opposite')):
+        return True, True
+    if oneway == '-1':
+        return False, True
+    if oneway in ONEWAY_FORWARD:
+        return True, False
+    implied = tags.get('junction') == 'roundabout' or tags.get('highway') == 'motorway'
+    if implied and oneway != 'no':
+        return True, False
+    return True, True
+
+
+def parse_osm(path: str) -> Tuple[Dict[int, Tuple[float, float]], List[Tuple[List[int], Dict[str, str]]]]:
+    """
+    Read nodes and highway ways from an OSM XML extract.
+
+    Args:
+        path: Path of the .osm file
+
+    Returns:
+        Tuple of ({node id: (lat, lon)}, [(node ids, tags) of each highway])
+    """
+    nodes = {}
+    ways = []
+    for _, element in ElementTree.iterparse(path, events=('end',)):
+        if element.tag == 'node':
+            nodes[int(element.get('id'))] = (float(element.get('lat')), float(element.get('lon')))
+            element.clear()
+        elif element.tag == 'way':
+            tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+            if 'highway' in tags:
+                ways.append(([int(nd.get('ref')) for nd in element.iter('nd')], tags))
+            element.clear()
+    return nodes, ways
+
+
+def build_csr(node_count: int, sources: np.ndarray, targets: np.ndarray,
+              *weights: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Build a compressed sparse row adjacency structure.
+
+    Args:
+        node_count: Number of nodes
+        sources: Edge start nodes
+        targets: Edge end nodes
+        weights: Per-edge arrays stored alongside the targets
+
+    Returns:
+        Tuple of (row offsets, targets, *weights) with the edges of node i
+        at positions offsets[i]:offsets[i + 1]
+    """
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(node_count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return (offsets, targets[order].astype(np.int32)) + tuple(weight[order] for weight in weights)
+
+
+def shortest_times(offsets: np.ndarray, targets: np.ndarray, times: np.ndarray,
+                   source: int) -> np.ndarray:
+    """
+    Get the travel time from a node to every node with Dijkstra's algorithm.
+
+    Returns:
+        Array of times in seconds, infinite for unreachable nodes
+    """
+    best = np.full(len(offsets) - 1, np.inf)
+    best[source] = 0.0
+    queue = [(0.0, source)]
+    while queue:
+        time, node = heapq.heappop(queue)
+        if time > best[node]:
+            continue
+        start, end = offsets[node], offsets[node + 1]
+        for target, edge_time in zip(targets[start:end].tolist(), times[start:end].tolist()):
+            candidate = time + edge_time
+            if candidate < best[target]:
+                best[target] = candidate
+                heapq.heappush(queue, (candidate, target))
+    return best
+
+
+class ProfileGraph:
+    """
+    Road graph of one routing profile with ALT landmark distances.
+
+    Edges are held in CSR arrays in both directions; travel time is the edge
+    weight. Landmark distances give A* a lower bound from the triangle
+    inequality, so queries only explore nodes near the fastest route. The
+    landmark tables are node-major float32 arrays, so the bound of a node
+    reads one contiguous row.
+    """
+
+    def __init__(self, profile: str, node_count: int, sources: np.ndarray,
+                 targets: np.ndarray, lengths: np.ndarray, times: np.ndarray,
+                 landmarks: int = 8):
+        """
+        Build the adjacency arrays and landmark distances.
+
+        Args:
+            profile: Routing profile
+            node_count: Number of nodes in the shared node arrays
+            sources: Edge start nodes
+            targets: Edge end nodes
+            lengths: Edge lengths in metres
+            times: Edge travel times in seconds
+            landmarks: Number of ALT landmarks; 0 makes queries plain Dijkstra
+        """
+        self.profile = profile
+        self.offsets, self.targets, self.lengths, self.times = build_csr(
+            node_count, sources, targets, lengths, times
+        )
+        self.reverse_offsets, self.reverse_targets, self.reverse_times = build_csr(
+            node_count, targets, sources, times
+        )
+        self.routable = np.diff(self.offsets) + np.diff(self.reverse_offsets) > 0
+        self.landmarks, self.from_landmarks, self.to_landmarks = self._select_landmarks(landmarks)
+        landmark_times = np.concatenate([self.from_landmarks.ravel(), self.to_landmarks.ravel()])
+        landmark_times = landmark_times[np.isfinite(landmark_times)]
+        self.bound_slack = float(landmark_times.max()) * LANDMARK_BOUND_SLACK if len(landmark_times) else 0.0
+
+    def _select_landmarks(self, count: int) -> Tuple[List[int], np.ndarray, np.ndarray]:
+        """
+        Pick landmarks by farthest-point selection and store their times.
+
+        Returns:
+            Tuple of (landmark nodes, (nodes, landmarks) times from each
+            landmark to every node, (nodes, landmarks) times from every node
+            to each landmark)
+        """
+        node_count = len(self.routable)
+        candidates = np.flatnonzero(self.routable)
+        landmarks, from_landmarks, to_landmarks = [], [], []
+        if count <= 0 or len(candidates) == 0:
+            empty = np.empty((node_count, 0), dtype=np.float32)
+            return landmarks, empty, empty
+
+        # Start from the node farthest from an arbitrary one, then keep
+        # adding the node farthest from every landmark chosen so far; nodes
+        # no landmark reaches come first, covering disconnected parts
+        separation = shortest_times(self.offsets, self.targets, self.times, int(candidates[0]))
+        for _ in range(min(count, len(candidates))):
+            separation[~self.routable] = -1.0
+            separation[landmarks] = -1.0
+            landmark = int(separation.argmax())
+            if separation[landmark] <= 0:
+                break
+            landmarks.append(landmark)
+            from_landmarks.append(shortest_times(self.offsets, self.targets, self.times, landmark))
+            to_landmarks.append(shortest_times(
+                self.reverse_offsets, self.reverse_targets, self.reverse_times, landmark
+            ))
+            separation = np.minimum(separation, np.minimum(from_landmarks[-1], to_landmarks[-1]))
+        return (
+            landmarks,
+            np.ascontiguousarray(np.array(from_landmarks, dtype=np.float32).T),
+            np.ascontiguousarray(np.array(to_landmarks, dtype=np.float32).T)
+        )
+
+    def lower_bounds(self, target: int) -> Callable[[int], float]:
+        """
+        Get an admissible estimate of the travel time from a node to a target.
+
+        Bounds are only computed for the nodes a query asks about, and are
+        remembered for the rest of the query.
+
+        Returns:
+            Function giving the bound of a node in seconds, infinite if the
+            node cannot reach the target
+        """
+        if not self.landmarks:
+            return lambda node: 0.0
+        from_landmarks, to_landmarks, slack = self.from_landmarks, self.to_landmarks, self.bound_slack
+        target_from = from_landmarks[target].tolist()
+        target_to = to_landmarks[target].tolist()
+        bounds = {target: 0.0}
+
+        def bound(node: int) -> float:
+            value = bounds.get(node)
+            if value is None:
+                # inf - inf gives NaN where a landmark says nothing about the
+                # node, and NaN never wins a comparison in max
+                value = max(
+                    0.0,
+                    *map(sub, target_from, from_landmarks[node].tolist()),
+                    *map(sub, to_landmarks[node].tolist(), target_to)
+                )
+                value = bounds[node] = max(value - slack, 0.0)
+            return value
+
+        return bound
+
+    def shortest_path(self, source: int, target: int) -> Optional[List[int]]:
+        """
+        Find the fastest path between two nodes with A*.
+
+        Returns:
+            Node indexes of the path, or None if the target is unreachable
+        """
+        bound = self.lower_bounds(target)
+        if bound(source) == np.inf:
+            return None
+        best = {source: 0.0}
+        previous = {}
+        settled = set()
+        queue = [(bound(source), source)]
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node in settled:
+                continue
+            if node == target:
+                path = [node]
+                while node in previous:
+                    node = previous[node]
+                    path.append(node)
+                return path[::-1]
+            settled.add(node)
+            time = best[node]
+            start, end = self.offsets[node], self.offsets[node + 1]
+            for neighbour, edge_time in zip(self.targets[start:end].tolist(),
+                                            self.times[start:end].tolist()):
+                candidate = time + edge_time
+                if candidate < best.get(neighbour, np.inf) and bound(neighbour) != np.inf:
+                    best[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(queue, (candidate + bound(neighbour), neighbour))
+        return None
+
+    def edge_values(self, path: List[int]) -> Tuple[float, float]:
+        """Get the length in metres and travel time in seconds of a path."""
+        distance = duration = 0.0
+        for node, following in zip(path, path[1:]):
+            start, end = self.offsets[node], self.offsets[node + 1]
+            # Parallel edges can join the same nodes; the search used the fastest
+            edges = start + np.flatnonzero(self.targets[start:end] == following)
+            edge = edges[self.times[edges].argmin()]
+            distance += float(self.lengths[edge])
+            duration += float(self.times[edge])
+        return distance, duration
+
+
+class LocalRoutingEngine:
+    """
+    Routing engine answering directions queries from a local OSM extract.
+
+    Node coordinates are shared by all profiles; each profile in
+    PROFILE_SPEEDS gets its own ProfileGraph. The directions method takes
+    the same arguments as the openrouteservice client's and returns the
+    same GeoJSON shape, so it can stand in for ORS directions calls.
+    Nodes are bucketed in a grid of max_snap_distance cells, so snapping a
+    coordinate only measures the nodes in the cells around it.
+    """
+
+    def __init__(self, path: str, profiles: Optional[List[str]] = None, landmarks: int = 8,
+                 max_snap_distance: float = 2000):
+        """
+        Load the extract and build the profile graphs.
+
+        Args:
+            path: Path of the OSM XML extract
+            profiles: Profiles to build, defaults to every profile in PROFILE_SPEEDS
+            landmarks: Number of ALT landmarks per profile
+            max_snap_distance: Maximum distance in metres from a requested
+                coordinate to the nearest routable node
+        """
+        self.max_snap_distance = max_snap_distance
+        nodes, ways = parse_osm(path)
+
+        # Keep only nodes on highways, numbered 0..N-1
+        node_ids = sorted({ref for refs, _ in ways for ref in refs if ref in nodes})
+        index_of = {node_id: index for index, node_id in enumerate(node_ids)}
+        self.coordinates = np.array([nodes[node_id] for node_id in node_ids], dtype=np.float64).reshape(-1, 2)
+        self.cell_size, self.grid = self._build_grid()
+
+        self.graphs: Dict[str, ProfileGraph] = {}
+        for profile in profiles or PROFILE_SPEEDS:
+            if profile not in PROFILE_SPEEDS:
+                raise ConfigurationError(f"Unsupported routing profile: {profile}")
+            sources, targets, speeds = [], [], []
+            for refs, tags in ways:
+                speed = way_speed(tags, profile)
+                if speed is None:
+                    continue
+                forward, backward = way_directions(tags, profile)
+                refs = [index_of[ref] for ref in refs if ref in index_of]
+                for start, end in zip(refs, refs[1:]):
+                    if forward:
+                        sources.append(start)
+                        targets.append(end)
+                        speeds.append(speed)
+                    if backward:
+                        sources.append(end)
+                        targets.append(start)
+                        speeds.append(speed)
+
+            sources = np.array(sources, dtype=np.int32)
+            targets = np.array(targets, dtype=np.int32)
+            lengths = haversine_distances(self.coordinates[sources], self.coordinates[targets])
+            times = lengths / (np.array(speeds, dtype=np.float64) / 3.6)
+            self.graphs[profile] = ProfileGraph(
+                profile, len(node_ids), sources, targets,
+                lengths.astype(np.float32), times.astype(np.float32), landmarks=landmarks
+            )
+
+        logger.info(
+            f"Loaded routing graph from {path}: {len(node_ids)} nodes, profiles "
+            + ', '.join(f"{profile} ({len(graph.targets)} edges)" for profile, graph in self.graphs.items())
+        )
+
+    def _build_grid(self) -> Tuple[float, Dict[Tuple[int, int], np.ndarray]]:
+        """
+        Bucket the nodes in square latitude/longitude cells.
+
+        Cells are max_snap_distance high, so every node within snapping
+        distance of a point lies in the rows next to the point's row.
+
+        Returns:
+            Tuple of (cell size in degrees, {(row, column): node indexes})
+        """
+        cell_size = max(self.max_snap_distance, 1.0) / METRES_PER_DEGREE
+        cells = np.floor(self.coordinates / cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        keys, starts = np.unique(cells[order], axis=0, return_index=True)
+        grid = {
+            (row, column): members
+            for (row, column), members in zip(keys.tolist(), np.split(order, starts[1:]))
+        }
+        return cell_size, grid
+
+    def _nearby_nodes(self, longitude: float, latitude: float) -> np.ndarray:
+        """Get the nodes of the grid cells that can hold a node within snapping distance."""
+        row = math.floor(latitude / self.cell_size)
+        column = math.floor(longitude / self.cell_size)
+        # A degree of longitude shrinks towards the poles, so more columns
+        # are needed to cover the snapping distance
+        widest_latitude = abs(latitude) + self.cell_size
+        if widest_latitude >= 90:
+            cells = list(self.grid.values())
+        else:
+            span = math.ceil(1 / math.cos(math.radians(widest_latitude)))
+            cells = [
+                self.grid[cell]
+                for cell in ((row + rows, column + columns)
+                             for rows in (-1, 0, 1) for columns in range(-span, span + 1))
+                if cell in self.grid
+            ]
+        return np.concatenate(cells) if cells else np.empty(0, dtype=np.int64)
+
+    def nearest_node(self, coordinates: Tuple[float, float], profile: str) -> Optional[int]:
+        """
+        Snap a (longitude, latitude) coordinate to the nearest node a profile can use.
+
+        Returns:
+            Node index, or None if no node is within max_snap_distance
+        """
+        candidates = self._nearby_nodes(*coordinates)
+        candidates = candidates[self.graphs[profile].routable[candidates]]
+        if len(candidates) == 0:
+            return None
+        point = np.array([[coordinates[1], coordinates[0]]])
+        distances = haversine_distances(point, self.coordinates[candidates])
+        nearest = int(distances.argmin())
+        if distances[nearest] > self.max_snap_distance:
+            return None
+        return int(candidates[nearest])
+
+    def route(self, origin_coords: Tuple[float, float], destination_coords: Tuple[float, float],
+              profile: str) -> Optional[Dict]:
+        """
+        Find the fastest route between two coordinates.
+
+        Args:
+            origin_coords: Origin (longitude, latitude)
+            destination_coords: Destination (longitude, latitude)
+            profile: Routing profile
+
+        Returns:
+            Dictionary with distance in metres, duration in seconds and the
+            path as an (N, 2) array of [lon, lat], or None if either point is
+            off the network or no path exists
+
+        Raises:
+            ValueError: If the profile is not loaded
+        """
+        if profile not in self.graphs:
+            raise ValueError(f"Routing profile not loaded: {profile}")
+        graph = self.graphs[profile]
+        source = self.nearest_node(origin_coords, profile)
+        target = self.nearest_node(destination_coords, profile)
+        if source is None or target is None:
+            return None
+
+        path = graph.shortest_path(source, target)
+        if path is None:
+            return None
+        distance, duration = graph.edge_values(path)
+        return {
+            'distance': distance,
+            'duration': duration,
+            'coordinates': self.coordinates[path][:, ::-1]
+        }
+
+    def directions(self, coordinates: Tuple[Tuple[float, float], Tuple[float, float]],
+                   profile: str, **kwargs) -> Dict:
+        """
+        Answer a directions request like openrouteservice.Client.directions.
+
+        Args:
+            coordinates: (origin, destination) as (longitude, latitude) pairs
+            profile: Routing profile
+            kwargs: Other ORS request options, ignored
+
+        Returns:
+            GeoJSON FeatureCollection with one feature, or none if there is no route
+        """
+        origin_coords, destination_coords = coordinates
+        route = self.route(origin_coords, destination_coords, profile)
+        if route is None:
+            return {'type': 'FeatureCollection', 'features': []}
+        return {
+            'type': 'FeatureCollection',
+            'features': [{
+                'type': 'Feature',
+                'properties': {
+                    'segments': [{'distance': route['distance'], 'duration': route['duration']}]
+                },
+                'geometry': {'type': 'LineString', 'coordinates': route['coordinates']}
+            }]
+        }
+
+
+def create_routing_engine(engine: str, graph_path: str, landmarks: int = 8,
+                          max_snap_distance: float = 2000) -> Optional[LocalRoutingEngine]:
+    """
+    Create the routing engine selected by the ROUTING_ENGINE setting.
+
+    Args:
+        engine: 'ors' for the OpenRouteService API or 'local' for the
+            offline engine
+        graph_path: OSM extract loaded by the local engine
+        landmarks: ALT landmarks per profile
+        max_snap_distance: Maximum snapping distance in metres
+
+    Returns:
+        Local routing engine, or None to use ORS
+
+    Raises:
+        ConfigurationError: If the engine is not supported
+    """
+    engine = (engine or 'ors').lower()
+    if engine == 'ors':
+        return None
+    if engine == 'local':
+        return LocalRoutingEngine(graph_path, landmarks=landmarks, max_snap_distance=max_snap_distance)
+    raise ConfigurationError(f"Unsupported routing engine: {engine}")
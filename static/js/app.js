@@ -34,26 +34,71 @@ document.addEventListener("DOMContentLoaded", function () {
         return false;
       }
 
+      // Stream routes into the page when the browser supports it,
+      // otherwise submit the form and wait for the results page
+      if (routeForm.dataset.streamUrl && supportsRouteStreaming()) {
+        e.preventDefault();
+        streamRoutes(routeForm);
+        return false;
+      }
+
       // Show loading state
       showLoading();
     });
+
+    // Full results page for the same form values
+    const detailedResults = document.getElementById("detailedResults");
+    if (detailedResults) {
+      detailedResults.addEventListener("click", function () {
+        routeForm.submit();
+      });
+    }
   }
 
   // Auto-complete functionality for location inputs
   const locationInputs = document.querySelectorAll(
     'input[name="origin"], input[name="destination"]'
   );
+  const suggestUrl = routeForm ? routeForm.dataset.suggestUrl : null;
   locationInputs.forEach((input) => {
+    if (!suggestUrl || !("fetch" in window)) {
+      return;
+    }
+    const datalist = document.createElement("datalist");
+    datalist.id = `${input.id}-suggestions`;
+    input.parentNode.appendChild(datalist);
+    input.setAttribute("list", datalist.id);
+    input.setAttribute("autocomplete", "off");
+
     input.addEventListener(
       "input",
       debounce(function () {
         const query = this.value.trim();
-        if (query.length > 2) {
-          // Here you could implement actual geocoding API calls
-          // For now, we'll just show a placeholder
-          console.log("Searching for:", query);
+        if (query.length < 2) {
+          datalist.innerHTML = "";
+          return;
         }
-      }, 300)
+        fetch(`${suggestUrl}?q=${encodeURIComponent(query)}`)
+          .then((response) => response.json())
+          .then((data) => {
+            // Ignore answers to a query the user has already typed past
+            if (!data.success || input.value.trim() !== query) {
+              return;
+            }
+            datalist.innerHTML = "";
+            data.suggestions.forEach((suggestion) => {
+              const option = document.createElement("option");
+              option.value = suggestion.name;
+              option.label = suggestion.country
+                ? `${suggestion.name}, ${suggestion.country}`
+                : suggestion.name;
+              datalist.appendChild(option);
+            });
+          })
+          .catch((err) => {
+            console.log("Location suggestions failed:", err);
+          });
+      }, 150)
     );
   });
 
@@ -136,6 +181,260 @@ function initializeMap() {
   }
 }
 
+// Route geometry decoding
+// Routes may carry geometry as [[lat, lon], ...] or in one of the compact
+// encodings selected with the geometry_format request option.
+function decodePolyline(encoded, precision = 5) {
+  const factor = Math.pow(10, precision);
+  const points = [];
+  let index = 0;
+  let lat = 0;
+  let lon = 0;
+
+  while (index < encoded.length) {
+    const deltas = [];
+    for (let i = 0; i < 2; i++) {
+      let shift = 0;
+      let result = 0;
+      let byte;
+      do {
+        byte = encoded.charCodeAt(index++) - 63;
+        result |= (byte & 0x1f) << shift;
+        shift += 5;
+      } while (byte >= 0x20);
+      deltas.push(result & 1 ? ~(result >> 1) : result >> 1);
+    }
+    lat += deltas[0];
+    lon += deltas[1];
+    points.push([lat / factor, lon / factor]);
+  }
+  return points;
+}
+
+function base64ToBuffer(encoded) {
+  const binary = atob(encoded);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes.buffer;
+}
+
+function decodeFloat32Geometry(encoded) {
+  const view = new DataView(base64ToBuffer(encoded));
+  const points = [];
+  for (let offset = 0; offset < view.byteLength; offset += 8) {
+    points.push([view.getFloat32(offset, true), view.getFloat32(offset + 4, true)]);
+  }
+  return points;
+}
+
+function decodeDeltaGeometry(encoded) {
+  const view = new DataView(base64ToBuffer(encoded));
+  const points = [];
+  let lat = 0;
+  let lon = 0;
+  for (let offset = 0; offset < view.byteLength; offset += 8) {
+    lat += view.getInt32(offset, true);
+    lon += view.getInt32(offset + 4, true);
+    points.push([lat / 1e6, lon / 1e6]);
+  }
+  return points;
+}
+
+function decodeGeometry(geometry, format = "latlon") {
+  switch (format) {
+    case "polyline":
+      return decodePolyline(geometry, 5);
+    case "polyline6":
+      return decodePolyline(geometry, 6);
+    case "float32":
+      return decodeFloat32Geometry(geometry);
+    case "delta":
+      return decodeDeltaGeometry(geometry);
+    default:
+      return geometry;
+  }
+}
+
+// Progressive route results
+// The route form posts to /api/routes/stream, which sends a Server-Sent
+// Event per travel mode as soon as it is routed, so the fastest mode is
+// shown while slower ones are still being calculated.
+const MODE_STYLES = {
+  driving: { icon: "fa-car", textClass: "text-danger", color: "#e74c3c" },
+  transit: { icon: "fa-bus", textClass: "text-primary", color: "#3498db" },
+  bicycling: { icon: "fa-bicycle", textClass: "text-success", color: "#2ecc71" },
+  walking: { icon: "fa-walking", textClass: "text-purple", color: "#9b59b6" },
+};
+
+let liveMap = null;
+let liveLayers = null;
+
+function supportsRouteStreaming() {
+  return (
+    "fetch" in window &&
+    "ReadableStream" in window &&
+    "TextDecoder" in window &&
+    typeof L !== "undefined"
+  );
+}
+
+function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  function pump() {
+    return reader.read().then(({ done, value }) => {
+      if (done) {
+        return;
+      }
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = "message";
+        const data = [];
+        block.split("\n").forEach((line) => {
+          if (line.startsWith("event: ")) {
+            event = line.slice(7);
+          } else if (line.startsWith("data: ")) {
+            data.push(line.slice(6));
+          }
+        });
+        if (data.length) {
+          onEvent(event, JSON.parse(data.join("\n")));
+        }
+      }
+      return pump();
+    });
+  }
+  return pump();
+}
+
+function resetLiveMap() {
+  if (!liveMap) {
+    liveMap = L.map("liveMap").setView([0, 0], 2);
+    L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
+      attribution: "© OpenStreetMap contributors",
+    }).addTo(liveMap);
+    liveLayers = L.featureGroup().addTo(liveMap);
+  }
+  liveLayers.clearLayers();
+  liveMap.invalidateSize();
+}
+
+function addLiveRoute(route) {
+  const style = MODE_STYLES[route.mode] || MODE_STYLES.driving;
+  const points = decodeGeometry(route.geometry, route.geometry_format);
+  if (points.length > 0) {
+    L.polyline(points, { color: style.color, weight: 5, opacity: 0.7 })
+      .bindPopup(`<b class="text-capitalize">${route.mode}</b>`)
+      .addTo(liveLayers);
+    liveMap.fitBounds(liveLayers.getBounds(), { padding: [20, 20] });
+  }
+
+  const card = document.createElement("div");
+  card.className = "col-md-4 mb-3";
+  card.dataset.mode = route.mode;
+  card.innerHTML = `
+        <div class="card h-100">
+          <div class="card-body">
+            <h5 class="card-title text-capitalize">
+              <i class="fas ${style.icon} ${style.textClass} me-2"></i>${route.mode}
+            </h5>
+            <p class="mb-1"><strong>Distance:</strong> ${route.distance.toFixed(1)} km</p>
+            <p class="mb-1"><strong>Duration:</strong> ${route.duration_formatted}</p>
+            <p class="mb-0"><strong>Emissions:</strong> ${route.emission.toFixed(2)} kg CO₂</p>
+          </div>
+        </div>
+    `;
+  document.getElementById("liveRouteCards").appendChild(card);
+}
+
+function markBestRoute(mode) {
+  const card = document.querySelector(`#liveRouteCards [data-mode="${mode}"] .card`);
+  if (card) {
+    card.classList.add("border-success");
+    card
+      .querySelector(".card-title")
+      .insertAdjacentHTML("beforeend", '<span class="badge bg-success ms-2">Best</span>');
+  }
+}
+
+function streamRoutes(form) {
+  const results = document.getElementById("liveResults");
+  const status = document.getElementById("liveStatus");
+  const detailedResults = document.getElementById("detailedResults");
+  const submitBtn = form.querySelector('button[type="submit"]');
+  const originalText = submitBtn.innerHTML;
+  const formData = new FormData(form);
+  let routeCount = 0;
+
+  submitBtn.innerHTML = '<span class="loading-spinner me-2"></span>Finding routes...';
+  submitBtn.disabled = true;
+  detailedResults.disabled = true;
+  document.getElementById("liveRouteCards").innerHTML = "";
+  status.textContent = "Finding routes...";
+  results.style.display = "block";
+  resetLiveMap();
+
+  function handleEvent(event, data) {
+    if (event === "route") {
+      routeCount += 1;
+      addLiveRoute(data);
+      status.textContent = `Found ${routeCount} route${routeCount === 1 ? "" : "s"}, still searching...`;
+    } else if (event === "done") {
+      markBestRoute(data.best_mode);
+      status.textContent = `Found ${routeCount} route${routeCount === 1 ? "" : "s"}.`;
+      if (data.missing_modes.length) {
+        showAlert(
+          `Some travel modes took too long and are not shown: ${data.missing_modes.join(", ")}.`,
+          "warning"
+        );
+      }
+      detailedResults.disabled = false;
+    } else if (event === "failure") {
+      status.textContent = "";
+      showAlert(data.error, "warning");
+    }
+  }
+
+  fetch(form.dataset.streamUrl, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify({
+      origin: formData.get("origin").trim(),
+      destination: formData.get("destination").trim(),
+      vehicle_type: formData.get("vehicle_type") || "",
+      vehicle_model: formData.get("vehicle_model") || "",
+      geometry_format: "polyline",
+    }),
+  })
+    .then((response) => {
+      if (!response.ok) {
+        return response.json().then((data) => {
+          throw new Error(data.error || "Could not find routes. Please try again.");
+        });
+      }
+      return readEventStream(response, handleEvent);
+    })
+    .catch((err) => {
+      console.log("Route stream failed:", err);
+      status.textContent = "";
+      if (!routeCount) {
+        results.style.display = "none";
+      }
+      showAlert(err.message, "error");
+    })
+    .finally(() => {
+      submitBtn.innerHTML = originalText;
+      submitBtn.disabled = false;
+    });
+}
+
 // Route sharing functionality
 function shareRoute() {
   const text = `Eco-friendly route found! Check out this sustainable travel option.`;
@@ -4,9 +4,33 @@ Basic tests for the Sustainable Travel Route Finder application.
 """
 
 import unittest
+import gzip
 import json
+import time
+from unittest.mock import Mock, patch
 from app import create_app
-from config import DevelopmentConfig
+from config import Config, DevelopmentConfig
+
+
+def make_directions_response(distance=10000, duration=600):
+    """Build a minimal ORS GeoJSON directions response."""
+    return {
+        'features': [{
+            'properties': {
+                'segments': [{'distance': distance, 'duration': duration}]
+            },
+            'geometry': {
+                'coordinates': [[-0.1278, 51.5074], [-0.1, 51.51]]
+            }
+        }]
+    }
+
+
+def pelias_search(text, size):
+    """Geocode every location except 'Atlantis' to a fixed point."""
+    if text == 'Atlantis':
+        return {'features': []}
+    return {'features': [{'geometry': {'coordinates': [-0.1278, 51.5074]}}]}
 
 
 class TestSustainableTravelApp(unittest.TestCase):
@@ -54,6 +78,32 @@ class TestSustainableTravelApp(unittest.TestCase):
                                   content_type='application/json')
         self.assertEqual(response.status_code, 400)
 
+    def test_vehicles_endpoint_revalidates(self):
+        """Test that the vehicle catalogue is served with a strong ETag and 304s."""
+        response = self.client.get('/api/vehicles')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['vehicles']['car']['hybrid']['name'], 'Hybrid Vehicle')
+        etag, weak = response.get_etag()
+        self.assertFalse(weak)
+        self.assertIn('max-age', response.headers['Cache-Control'])
+
+        cached = self.client.get('/api/vehicles', headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+        compressed = self.client.get('/api/vehicles', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.data), response.data)
+        gzip_etag, _ = compressed.get_etag()
+        self.assertEqual(gzip_etag, f'{etag}-gzip')
+        cached = self.client.get('/api/vehicles', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': f'"{gzip_etag}"'
+        })
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+        self.assertEqual(cached.get_etag(), (gzip_etag, False))
+
     def test_404_error(self):
         """Test 404 error handling."""
         response = self.client.get('/nonexistent-page')
@@ -73,6 +123,409 @@ class TestSustainableTravelApp(unittest.TestCase):
         self.assertEqual(response.status_code, 302)  # Redirect to home
 
 
+class TestBatchRoutes(unittest.TestCase):
+    """Test the batch route comparison endpoint."""
+
+    def setUp(self):
+        """Set up test client with a mocked ORS client."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+        self.ors_client.directions.return_value = make_directions_response()
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def post_batch(self, pairs):
+        """Post a batch of pairs and return the decoded response."""
+        response = self.client.post('/api/routes/batch',
+                                    data=json.dumps({'pairs': pairs}),
+                                    content_type='application/json')
+        return response, json.loads(response.data)
+
+    def test_batch_matches_single_pair_endpoint(self):
+        """Test that batch results equal the single-pair results."""
+        pair = {'origin': 'London', 'destination': 'Cambridge',
+                'vehicle_type': 'car', 'vehicle_model': 'hybrid'}
+        _, batch = self.post_batch([pair])
+        single = json.loads(self.client.post('/api/routes',
+                                             data=json.dumps(pair),
+                                             content_type='application/json').data)
+        self.assertTrue(batch['results'][0]['success'])
+        self.assertEqual(batch['results'][0]['routes'], single['routes'])
+
+    def test_repeated_locations_are_geocoded_once(self):
+        """Test that locations shared by pairs are deduplicated."""
+        self.app.extensions['route_service'].local_geocoder = None
+        pairs = [
+            {'origin': 'London', 'destination': 'Cambridge'},
+            {'origin': 'london', 'destination': 'Oxford'},
+            {'origin': 'Cambridge', 'destination': 'Oxford'}
+        ]
+        response, data = self.post_batch(pairs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(self.ors_client.pelias_search.call_count, 3)
+
+    def test_per_pair_errors(self):
+        """Test that failing pairs are reported without failing the batch."""
+        pairs = [
+            {'origin': 'London', 'destination': 'Cambridge'},
+            {'origin': '', 'destination': 'Cambridge'},
+            {'origin': 'Atlantis', 'destination': 'Cambridge'}
+        ]
+        response, data = self.post_batch(pairs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['success'] for r in data['results']], [True, False, False])
+        self.assertIn('Atlantis', data['results'][2]['error'])
+
+    def test_batch_streams_ndjson(self):
+        """Test that streamed batches yield one JSON record per line."""
+        pairs = [
+            {'origin': 'London', 'destination': 'Cambridge'},
+            {'origin': '', 'destination': 'Cambridge'},
+            {'origin': 'Oxford', 'destination': 'Cambridge'}
+        ]
+        response = self.client.post('/api/routes/batch',
+                                    data=json.dumps({'pairs': pairs}),
+                                    content_type='application/json',
+                                    headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(sorted(r['index'] for r in records), [0, 1, 2])
+        by_index = {r['index']: r for r in records}
+        self.assertFalse(by_index[1]['success'])
+        self.assertTrue(by_index[2]['success'])
+
+    def test_batch_geometry_format(self):
+        """Test that batches honour the requested geometry encoding."""
+        response = self.client.post('/api/routes/batch',
+                                    data=json.dumps({
+                                        'pairs': [{'origin': 'London', 'destination': 'Cambridge'}],
+                                        'geometry_format': 'polyline'
+                                    }),
+                                    content_type='application/json')
+        route = json.loads(response.data)['results'][0]['routes'][0]
+        self.assertEqual(route['geometry_format'], 'polyline')
+        self.assertIsInstance(route['geometry'], str)
+
+    def test_batch_requires_pairs(self):
+        """Test that an empty batch is rejected."""
+        response, _ = self.post_batch([])
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/routes/batch', data=json.dumps([1]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRouteStream(unittest.TestCase):
+    """Test the Server-Sent Events route endpoint."""
+
+    def setUp(self):
+        """Set up test client with a mocked ORS client."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+        self.ors_client.directions.return_value = make_directions_response()
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def post_stream(self, data):
+        """Post a route request to the stream endpoint."""
+        return self.client.post('/api/routes/stream', data=json.dumps(data),
+                                content_type='application/json')
+
+    def read_events(self, response):
+        """Decode the (event, data) pairs of an event stream."""
+        events = []
+        for block in response.data.decode().split('\n\n'):
+            if block:
+                event, data = block.split('\n')
+                events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+
+    def test_routes_are_streamed(self):
+        """Test that every mode is sent as its own event, then a summary."""
+        pair = {'origin': 'London', 'destination': 'Cambridge'}
+        response = self.post_stream(pair)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = self.read_events(response)
+        self.assertEqual([event for event, _ in events], ['start', 'route', 'route', 'route', 'done'])
+        self.assertEqual(events[0][1]['modes'], ['driving', 'bicycling', 'walking'])
+        self.assertEqual(events[-1][1]['missing_modes'], [])
+
+        single = json.loads(self.client.post('/api/routes', data=json.dumps(pair),
+                                             content_type='application/json').data)
+        streamed = sorted((data for event, data in events if event == 'route'),
+                          key=lambda route: route['emission'])
+        self.assertEqual(streamed, single['routes'])
+        self.assertEqual(events[-1][1]['best_mode'], single['best_route']['mode'])
+
+    def test_fast_modes_are_sent_first(self):
+        """Test that a slow mode does not hold back the others."""
+        def directions(profile, **kwargs):
+            if profile == 'driving-car':
+                time.sleep(0.2)
+            return make_directions_response()
+
+        self.ors_client.directions.side_effect = directions
+        events = self.read_events(self.post_stream({'origin': 'London', 'destination': 'Cambridge'}))
+        modes = [data['mode'] for event, data in events if event == 'route']
+        self.assertEqual(modes[-1], 'driving')
+
+    def test_errors_before_stream(self):
+        """Test that invalid requests and geocoding failures return JSON errors."""
+        response = self.post_stream({'origin': '', 'destination': 'Cambridge'})
+        self.assertEqual(response.status_code, 400)
+        response = self.post_stream({'origin': 'Atlantis', 'destination': 'Cambridge'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Atlantis', json.loads(response.data)['error'])
+
+    def test_no_routes_failure_event(self):
+        """Test that a failure event ends the stream when no mode has a route."""
+        self.ors_client.directions.return_value = {'features': []}
+        events = self.read_events(self.post_stream({'origin': 'London', 'destination': 'Cambridge'}))
+        self.assertEqual(events[-1][0], 'failure')
+        self.assertIn('No routes found', events[-1][1]['error'])
+
+
+class TestLocationSuggestions(unittest.TestCase):
+    """Test the location suggestion endpoint."""
+
+    def setUp(self):
+        """Set up test client with a mocked ORS client."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+        self.ors_client.directions.return_value = make_directions_response()
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def suggest(self, query, **params):
+        """Get suggestions for a query."""
+        response = self.client.get('/api/geocode/suggest', query_string={'q': query, **params})
+        return response, json.loads(response.data)
+
+    def test_gazetteer_suggestions(self):
+        """Test that gazetteer places are suggested without geocoding."""
+        response, data = self.suggest('lond')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['suggestions'][0]['name'], 'London')
+        self.assertEqual(data['suggestions'][0]['country'], 'GB')
+        self.ors_client.pelias_search.assert_not_called()
+
+    def test_geocoded_labels_are_suggested(self):
+        """Test that the geocoder's labels become suggestions, never the text typed."""
+        self.ors_client.pelias_search.side_effect = None
+        self.ors_client.pelias_search.return_value = {'features': [{
+            'geometry': {'coordinates': [-0.1239, 51.5308]},
+            'properties': {'label': "King's Cross, London, England, United Kingdom", 'layer': 'locality'}
+        }]}
+        self.client.post('/api/routes', data=json.dumps({
+            'origin': '12 Kings Road flat 3', 'destination': 'Cambridge'
+        }), content_type='application/json')
+        _, data = self.suggest('king')
+        self.assertEqual(
+            [s['name'] for s in data['suggestions']],
+            ["King's Cross, London, England, United Kingdom"]
+        )
+        _, data = self.suggest('12 k')
+        self.assertEqual(data['suggestions'], [])
+
+    def test_limit(self):
+        """Test that the number of suggestions can be limited."""
+        _, data = self.suggest('b', limit=2)
+        self.assertEqual(len(data['suggestions']), 2)
+        response, _ = self.suggest('b', limit='none')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestCoordinateLocations(unittest.TestCase):
+    """Test routes between coordinates, which skip geocoding."""
+
+    def setUp(self):
+        """Set up test client with a mocked ORS client."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+        self.ors_client.directions.return_value = make_directions_response()
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def post_routes(self, origin, destination):
+        """Post a route request and return the response."""
+        data = {'origin': origin, 'destination': destination}
+        return self.client.post('/api/routes', data=json.dumps(data),
+                                content_type='application/json')
+
+    def test_coordinates_skip_geocoding(self):
+        """Test that lat/lon objects are routed without geocoding."""
+        response = self.post_routes({'lat': 51.5074, 'lon': -0.1278}, 'Atlantis Road')
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['origin'], '51.507400,-0.127800')
+        self.assertEqual(data['destination'], 'Atlantis Road')
+        self.assertEqual(self.ors_client.pelias_search.call_count, 1)
+        self.assertEqual(
+            self.ors_client.directions.call_args.kwargs['coordinates'][0], (-0.1278, 51.5074)
+        )
+
+    def test_invalid_coordinates(self):
+        """Test that out-of-range or non-numeric coordinates are rejected."""
+        for origin in ({'lat': 91, 'lon': 0}, {'lat': '51.5', 'lon': 0}, {'lat': True, 'lon': 0}, 42):
+            response = self.post_routes(origin, {'lat': 52.2, 'lon': 0.12})
+            self.assertEqual(response.status_code, 400)
+        self.ors_client.pelias_search.assert_not_called()
+        self.ors_client.directions.assert_not_called()
+
+    def test_result_page_coordinates(self):
+        """Test that the form accepts coordinates in place of place names."""
+        response = self.client.post('/result', data={
+            'origin_lat': '51.5074', 'origin_lon': '-0.1278',
+            'destination_lat': '52.2', 'destination_lon': '0.12'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'52.200000,0.120000', response.data)
+        self.ors_client.pelias_search.assert_not_called()
+        response = self.client.post('/result', data={
+            'origin_lat': 'north', 'origin_lon': '0', 'destination': 'Cambridge'
+        })
+        self.assertEqual(response.status_code, 302)
+
+
+class TestVehicleComparison(unittest.TestCase):
+    """Test the optional per-route emissions of every vehicle."""
+
+    def setUp(self):
+        """Set up test client with a mocked ORS client."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+        self.ors_client.directions.return_value = make_directions_response()
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def post_routes(self, **options):
+        """Post a route request and return the response."""
+        data = {'origin': 'London', 'destination': 'Cambridge', **options}
+        return self.client.post('/api/routes', data=json.dumps(data),
+                                content_type='application/json')
+
+    def test_all_vehicles_are_scored(self):
+        """Test that each route carries the emissions of every vehicle."""
+        data = json.loads(self.post_routes(all_vehicles=True).data)
+        for route in data['routes']:
+            self.assertEqual(route['vehicle_emissions']['car']['hybrid'], 0.8)
+            self.assertEqual(route['vehicle_emissions']['truck']['large'], 5.0)
+
+    def test_vehicle_emissions_are_optional(self):
+        """Test that routes omit the vehicle table unless requested."""
+        data = json.loads(self.post_routes().data)
+        self.assertNotIn('vehicle_emissions', data['routes'][0])
+        self.assertEqual(self.post_routes(all_vehicles='maybe').status_code, 400)
+
+    def test_result_page_compares_vehicles(self):
+        """Test that the results page renders the vehicle comparison."""
+        response = self.client.post('/result', data={
+            'origin': 'London', 'destination': 'Cambridge', 'all_vehicles': 'on'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Compare Vehicles', response.data)
+        self.assertIn(b'vehicleEmissions', response.data)
+        self.assertEqual(self.ors_client.directions.call_count, 3)
+
+
+class TestRouteDeadline(unittest.TestCase):
+    """Test partial results when a mode runs out of time."""
+
+    def setUp(self):
+        """Set up test client whose walking directions are slow."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.app.config['ROUTE_REQUEST_TIMEOUT'] = 0.2
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+
+        def directions(profile, **kwargs):
+            if profile == 'foot-walking':
+                time.sleep(0.5)
+            return make_directions_response()
+
+        self.ors_client.directions.side_effect = directions
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def test_api_reports_missing_modes(self):
+        """Test that the API returns the finished modes and flags the slow one."""
+        response = self.client.post('/api/routes', data=json.dumps({
+            'origin': 'London', 'destination': 'Cambridge'
+        }), content_type='application/json')
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(data['routes']), 2)
+        self.assertEqual(data['missing_modes'], ['walking'])
+
+    def test_result_page_flags_missing_modes(self):
+        """Test that the results page warns about modes left out."""
+        response = self.client.post('/result', data={
+            'origin': 'London', 'destination': 'Cambridge'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'took too long', response.data)
+
+
+class TestMatrixRoutes(unittest.TestCase):
+    """Test the many-to-many matrix endpoint."""
+
+    def setUp(self):
+        """Set up test client with a mocked ORS client."""
+        self.app = create_app(DevelopmentConfig)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ors_client = Mock()
+        self.ors_client.pelias_search.side_effect = pelias_search
+        self.ors_client.distance_matrix.return_value = {
+            'distances': [[10000.0, None], [25000.0, 0.0]],
+            'durations': [[600.0, None], [1500.0, 0.0]]
+        }
+        self.app.extensions['route_service'].client = self.ors_client
+
+    def test_matrix_uses_one_call_per_profile(self):
+        """Test that the matrix mode makes one upstream call per mode."""
+        response = self.client.post('/api/routes/matrix',
+                                    data=json.dumps({
+                                        'origins': ['London', 'Oxford'],
+                                        'destinations': ['Cambridge', 'Oxford']
+                                    }),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(self.ors_client.distance_matrix.call_count, 3)
+        driving = data['modes']['driving']
+        self.assertEqual(driving['distances'], [[10.0, None], [25.0, 0.0]])
+        self.assertEqual(driving['emissions'], [[1.2, None], [3.0, 0.0]])
+        self.assertNotIn('geometry', driving)
+
+    def test_matrix_requires_locations(self):
+        """Test that missing origins are rejected."""
+        response = self.client.post('/api/routes/matrix',
+                                    data=json.dumps({'destinations': ['Cambridge']}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_matrix_rejects_malformed_bodies(self):
+        """Test that non-object bodies and non-string vehicles are rejected."""
+        for body in ([1], {'origins': ['London'], 'destinations': ['Cambridge'], 'vehicle_type': 5}):
+            response = self.client.post('/api/routes/matrix', data=json.dumps(body),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        self.ors_client.distance_matrix.assert_not_called()
+
+
 class TestConfig(unittest.TestCase):
     """Test configuration settings."""
 
@@ -93,6 +546,53 @@ class TestConfig(unittest.TestCase):
         self.assertIn('cycling-regular', modes)
         self.assertIn('foot-walking', modes)
 
+    def test_app_config_disables_local_geocoder(self):
+        """Test that an app config turning off offline geocoding is respected."""
+        class NoLocalGeocodeConfig(DevelopmentConfig):
+            GEOCODE_LOCAL_ENABLED = False
+
+        app = create_app(NoLocalGeocodeConfig)
+        self.assertIsNone(app.extensions['route_service'].local_geocoder)
+
+    def test_app_config_selects_ors_routing(self):
+        """Test that an app config choosing ORS overrides 'local' from the environment."""
+        class OrsRoutingConfig(DevelopmentConfig):
+            ROUTING_ENGINE = 'ors'
+
+        with patch.object(Config, 'ROUTING_ENGINE', 'local'):
+            app = create_app(OrsRoutingConfig)
+        self.assertIsNone(app.extensions['route_service'].routing_engine)
+
+    def test_app_config_sets_ors_client(self):
+        """Test that the ORS timeouts and pool size come from the app config."""
+        class TunedOrsConfig(DevelopmentConfig):
+            ORS_POOL_SIZE = 3
+            ORS_READ_TIMEOUT = 1.5
+            ORS_RETRIES = 0
+
+        client = create_app(TunedOrsConfig).extensions['route_service'].client
+        self.assertEqual(client._timeout, (Config.ORS_CONNECT_TIMEOUT, 1.5))
+        adapter = client._session.get_adapter('https://api.openrouteservice.org')
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(adapter.max_retries.total, 0)
+
+    def test_app_config_sets_breakers_and_hedging(self):
+        """Test that breaker and hedging settings come from the app config."""
+        class TunedUpstreamConfig(DevelopmentConfig):
+            ORS_BREAKER_MIN_CALLS = 2
+            ORS_HEDGE_ENABLED = True
+            ORS_HEDGE_PERCENTILE = 90
+
+        route_service = create_app(TunedUpstreamConfig).extensions['route_service']
+        self.assertEqual(route_service.hedge_percentile, 90)
+        route_service.client = Mock()
+        route_service.client.pelias_search.side_effect = RuntimeError('down')
+        for location in ('Town A', 'Town B', 'Town C'):
+            with self.assertRaises(Exception):
+                route_service.geocode_location(location)
+        self.assertEqual(route_service.get_upstream_stats()['geocode']['state'], 'open')
+        self.assertEqual(route_service.client.pelias_search.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
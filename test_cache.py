@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Tests for the caching utilities of the Sustainable Travel Route Finder.
+"""
+
+import time
+import unittest
+import numpy as np
+from services.cache import (
+    MISSING, NullCache, RedisCache, TieredCache, TTLCache, create_cache,
+    deserialize_value, serialize_value
+)
+from utils.exceptions import ConfigurationError
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of the Redis client used by the cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        entry = self.store.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, value, px=None):
+        self.store[key] = (time.monotonic() + px / 1000, value)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def pttl(self, key):
+        if self.get(key) is None:
+            return -2
+        return int((self.store[key][0] - time.monotonic()) * 1000)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Pipeline stand-in that runs the queued commands on execute."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+class UnreachableRedis:
+    """Redis stand-in whose every call fails like a refused connection."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _fail(self, *args, **kwargs):
+        self.calls += 1
+        raise ConnectionError('Connection refused')
+
+    get = set = delete = pipeline = _fail
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test the in-process LRU cache with expiry."""
+
+    def test_get_and_set(self):
+        """Test storing and retrieving a value."""
+        cache = TTLCache(max_size=4, ttl=60)
+        cache.set('london', (-0.1278, 51.5074))
+        self.assertEqual(cache.get('london'), (-0.1278, 51.5074))
+        self.assertIs(cache.get('paris'), MISSING)
+
+    def test_cached_none_is_a_hit(self):
+        """Test that None can be cached and told apart from a miss."""
+        cache = TTLCache(max_size=4, ttl=60)
+        cache.set('atlantis', None)
+        self.assertIsNone(cache.get('atlantis'))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual(len(cache), 2)
+
+    def test_expiry(self):
+        """Test that entries expire after their time-to-live."""
+        cache = TTLCache(max_size=4, ttl=60)
+        cache.set('a', 1, ttl=0.01)
+        time.sleep(0.02)
+        self.assertIs(cache.get('a'), MISSING)
+
+    def test_stats(self):
+        """Test hit and miss counters."""
+        cache = TTLCache(max_size=4, ttl=60)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['size'], 1)
+
+
+class TestSharedCache(unittest.TestCase):
+    """Test the Redis tier and the tiered cache in front of it."""
+
+    def test_serialization_round_trip(self):
+        """Test that routes and coordinates survive compact serialization."""
+        route = {
+            'mode': 'driving',
+            'distance': 12.5,
+            'duration': 900,
+            'geometry': [[51.5074, -0.1278], [51.50741, -0.12779]]
+        }
+        bbox = np.array([[1.0, 2.0], [3.0, 4.0]])
+        restored = deserialize_value(serialize_value(dict(route, bbox=bbox)))
+        self.assertEqual(restored.pop('bbox').tolist(), [[1.0, 2.0], [3.0, 4.0]])
+        self.assertEqual(restored['geometry'].tolist(), route['geometry'])
+        self.assertEqual(dict(restored, geometry=route['geometry']), route)
+        self.assertEqual(
+            deserialize_value(serialize_value((-0.1278, 51.5074))), (-0.1278, 51.5074)
+        )
+        self.assertIsNone(deserialize_value(serialize_value(None)))
+
+    def test_entries_are_shared_between_workers(self):
+        """Test that one worker's result is visible to another worker."""
+        shared = FakeRedis()
+        worker_a = TieredCache(TTLCache(), RedisCache(shared, namespace='routes'))
+        worker_b = TieredCache(TTLCache(), RedisCache(shared, namespace='routes'))
+        worker_a.set('driving-car:key', {'mode': 'driving', 'geometry': np.array([[1.0, 2.0]])})
+        route = worker_b.get('driving-car:key')
+        self.assertEqual(route['mode'], 'driving')
+        self.assertEqual(route['geometry'].tolist(), [[1.0, 2.0]])
+        # The second lookup is served by worker B's local tier
+        worker_b.get('driving-car:key')
+        self.assertEqual(worker_b.stats()['remote_hits'], 1)
+        self.assertEqual(worker_b.stats()['hits'], 1)
+
+    def test_local_copy_keeps_remote_expiry(self):
+        """Test that entries read from Redis expire locally with the shared entry."""
+        shared = FakeRedis()
+        worker_a = TieredCache(TTLCache(ttl=86400), RedisCache(shared, ttl=86400))
+        worker_b = TieredCache(TTLCache(ttl=86400), RedisCache(shared, ttl=86400))
+        worker_a.set('atlantis', None, ttl=0.05)
+        self.assertIsNone(worker_b.get('atlantis'))
+        time.sleep(0.06)
+        self.assertIs(worker_b.get('atlantis'), MISSING)
+
+    def test_namespaces_do_not_collide(self):
+        """Test that geocode and route entries use separate key spaces."""
+        shared = FakeRedis()
+        RedisCache(shared, namespace='geocode').set('london', (-0.1278, 51.5074))
+        self.assertIs(RedisCache(shared, namespace='routes').get('london'), MISSING)
+
+    def test_falls_back_to_local_cache_when_redis_is_down(self):
+        """Test that an unreachable Redis degrades to local-only caching."""
+        remote = UnreachableRedis()
+        cache = TieredCache(TTLCache(), RedisCache(remote), retry_interval=60)
+        cache.set('london', (-0.1278, 51.5074))
+        self.assertEqual(cache.get('london'), (-0.1278, 51.5074))
+        self.assertIs(cache.get('paris'), MISSING)
+        # The failed write opens the retry window; later calls skip Redis
+        self.assertEqual(remote.calls, 1)
+        self.assertFalse(cache.stats()['remote_available'])
+
+    def test_create_redis_cache(self):
+        """Test that 'redis' selects a tiered cache over the given client."""
+        cache = create_cache('redis', max_size=8, ttl=30, redis_client=FakeRedis())
+        self.assertIsInstance(cache, TieredCache)
+
+
+class TestCreateCache(unittest.TestCase):
+    """Test cache backend selection from CACHE_TYPE."""
+
+    def test_simple_cache(self):
+        """Test that 'simple' selects the in-process cache."""
+        cache = create_cache('simple', max_size=8, ttl=30)
+        self.assertIsInstance(cache, TTLCache)
+        self.assertEqual(cache.ttl, 30)
+
+    def test_null_cache(self):
+        """Test that 'null' disables caching."""
+        cache = create_cache('null', max_size=8, ttl=30)
+        self.assertIsInstance(cache, NullCache)
+        cache.set('a', 1)
+        self.assertIs(cache.get('a'), MISSING)
+
+    def test_unknown_cache_type(self):
+        """Test that unsupported cache types are rejected."""
+        with self.assertRaises(ConfigurationError):
+            create_cache('memcached', max_size=8, ttl=30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the response compression of the Sustainable Travel Route Finder.
+"""
+
+import gzip
+import json
+import unittest
+from flask import Flask, Response, jsonify
+from config import Config
+from utils import compression
+from utils.compression import init_compression
+
+
+def make_app(**settings):
+    """Build a minimal app with compression and a few test routes."""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(settings)
+    init_compression(app)
+
+    @app.route('/large')
+    def large():
+        return jsonify({'geometry': [[51.5 + index / 1e5, -0.12] for index in range(500)]})
+
+    @app.route('/small')
+    def small():
+        return jsonify({'success': True})
+
+    @app.route('/binary')
+    def binary():
+        return Response(b'\x00' * 5000, mimetype='application/octet-stream')
+
+    @app.route('/stream')
+    def stream():
+        return Response((f'{index}\n' * 100 for index in range(50)), mimetype='text/plain')
+
+    return app
+
+
+class TestCompression(unittest.TestCase):
+    """Test compression of application responses."""
+
+    def setUp(self):
+        """Set up a test client for a compressed app."""
+        self.client = make_app().test_client()
+
+    def test_large_json_is_gzipped(self):
+        """Test that a large JSON body is gzipped when the client accepts it."""
+        plain = self.client.get('/large')
+        response = self.client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(plain.data) / 2)
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    def test_identity_without_accept_encoding(self):
+        """Test that clients not accepting gzip get the plain body."""
+        response = self.client.get('/large')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(json.loads(response.data)['geometry']), 500)
+
+    def test_small_and_unlisted_bodies_are_not_compressed(self):
+        """Test the size threshold and the content-type allowlist."""
+        for path in ('/small', '/binary'):
+            response = self.client.get(path, headers={'Accept-Encoding': 'gzip'})
+            self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_streamed_responses_are_not_buffered(self):
+        """Test that streamed responses are passed through unchanged."""
+        response = self.client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertTrue(response.data.startswith(b'0\n'))
+
+    def test_compression_can_be_disabled(self):
+        """Test that COMPRESS_ENABLED turns compression off."""
+        client = make_app(COMPRESS_ENABLED=False).test_client()
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    @unittest.skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        """Test that brotli is used when both encodings are accepted."""
+        response = self.client.get('/large', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrency utilities of the Sustainable Travel Route Finder.
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from services.concurrency import CircuitBreaker, LatencyTracker, SingleFlight, hedged_call
+from utils.exceptions import CircuitOpenError
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test coalescing of identical in-flight calls."""
+
+    def run_concurrently(self, count, target):
+        """Run target in count threads and wait for all of them."""
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def test_identical_calls_share_one_execution(self):
+        """Test that concurrent callers with the same key share a result."""
+        single_flight = SingleFlight()
+        executions = []
+        results = []
+
+        def slow_lookup():
+            executions.append(1)
+            time.sleep(0.1)
+            return (-0.1278, 51.5074)
+
+        self.run_concurrently(
+            5, lambda: results.append(single_flight.do('london', slow_lookup))
+        )
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(results, [(-0.1278, 51.5074)] * 5)
+        self.assertEqual(single_flight.stats()['coalesced'], 4)
+
+    def test_waiters_receive_the_same_error(self):
+        """Test that an exception reaches every waiter."""
+        single_flight = SingleFlight()
+        errors = []
+
+        def failing_lookup():
+            time.sleep(0.1)
+            raise ValueError('upstream failure')
+
+        def call():
+            try:
+                single_flight.do('london', failing_lookup)
+            except ValueError as e:
+                errors.append(e)
+
+        self.run_concurrently(3, call)
+        self.assertEqual(len(errors), 3)
+
+    def test_calls_after_completion_run_again(self):
+        """Test that results are not kept once the call has finished."""
+        single_flight = SingleFlight()
+        executions = []
+        single_flight.do('london', lambda: executions.append(1))
+        single_flight.do('london', lambda: executions.append(1))
+        self.assertEqual(len(executions), 2)
+        self.assertEqual(single_flight.stats()['in_flight'], 0)
+
+
+
+def fail():
+    """Stand-in for a failing upstream call."""
+    raise RuntimeError('upstream down')
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test failing fast on an unhealthy upstream."""
+
+    def setUp(self):
+        """Set up a breaker that opens after half of four calls fail."""
+        self.breaker = CircuitBreaker('directions', window_size=4, min_calls=4,
+                                      failure_rate=0.5, reset_timeout=0.05)
+
+    def trip(self):
+        """Fail enough calls to open the circuit."""
+        for _ in range(4):
+            with self.assertRaises(RuntimeError):
+                self.breaker.call(fail)
+
+    def test_opens_on_failure_rate(self):
+        """Test that calls are rejected without running once the circuit opens."""
+        self.trip()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        calls = []
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(calls.append, 1)
+        self.assertEqual(calls, [])
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_probe_closes_circuit(self):
+        """Test that a successful probe after the reset timeout closes the circuit."""
+        self.trip()
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens_circuit(self):
+        """Test that a failing probe opens the circuit again."""
+        self.trip()
+        time.sleep(0.06)
+        with self.assertRaises(RuntimeError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()['opened'], 2)
+
+    def test_ignored_errors_do_not_trip(self):
+        """Test that errors rejected by is_failure leave the circuit closed."""
+        breaker = CircuitBreaker('geocode', min_calls=2, is_failure=lambda error: False)
+        for _ in range(5):
+            with self.assertRaises(RuntimeError):
+                breaker.call(fail)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_opens_on_slow_calls(self):
+        """Test that slow successful calls open the circuit."""
+        breaker = CircuitBreaker('matrix', min_calls=2, slow_call_duration=0.01, slow_call_rate=1.0)
+        for _ in range(2):
+            breaker.call(time.sleep, 0.02)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+
+class TestHedgedCall(unittest.TestCase):
+    """Test hedging of slow calls."""
+
+    def setUp(self):
+        """Set up an executor for the attempts."""
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_second_attempt_wins_when_first_stalls(self):
+        """Test that a stalled first attempt is overtaken by the hedge."""
+        attempts = []
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                attempts.append(len(attempts))
+                attempt = attempts[-1]
+            if attempt == 0:
+                time.sleep(1)
+                return 'slow'
+            return 'fast'
+
+        start = time.monotonic()
+        self.assertEqual(hedged_call(self.executor, 0.05, call), 'fast')
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(len(attempts), 2)
+
+    def test_fast_call_is_not_hedged(self):
+        """Test that a call finishing within the delay runs once."""
+        calls = []
+        self.assertEqual(hedged_call(self.executor, 0.5, lambda: calls.append(1) or 'ok'), 'ok')
+        self.assertEqual(calls, [1])
+
+    def test_both_attempts_failing_raise(self):
+        """Test that the error surfaces when every attempt fails."""
+        def slow_fail():
+            time.sleep(0.05)
+            fail()
+
+        with self.assertRaises(RuntimeError):
+            hedged_call(self.executor, 0.01, slow_fail)
+
+    def test_latency_percentile(self):
+        """Test the percentile and the minimum sample count."""
+        tracker = LatencyTracker(size=100)
+        self.assertIsNone(tracker.percentile(95))
+        for value in range(1, 101):
+            tracker.record(value / 100)
+        self.assertAlmostEqual(tracker.percentile(50), 0.505)
+        self.assertIsNone(tracker.percentile(95, min_samples=101))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the gazetteer and location suggestions of the Sustainable Travel Route Finder.
+"""
+
+import os
+import tempfile
+import unittest
+from config import Config
+from services.gazetteer import LocalGeocoder, SuggestionIndex, edit_similarity, load_gazetteer
+
+
+class TestLoadGazetteer(unittest.TestCase):
+    """Test loading gazetteer files."""
+
+    def test_bundled_gazetteer(self):
+        """Test that the bundled gazetteer loads with (lon, lat) coordinates."""
+        places = {place['name']: place for place in load_gazetteer(Config.GAZETTEER_PATH)}
+        self.assertIn('London', places)
+        self.assertEqual(places['London']['country'], 'GB')
+        self.assertAlmostEqual(places['London']['coordinates'][0], -0.12574)
+        self.assertAlmostEqual(places['London']['coordinates'][1], 51.50853)
+
+    def test_malformed_rows_are_skipped(self):
+        """Test that bad rows are skipped and a missing file loads nothing."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as gazetteer_file:
+            gazetteer_file.write('name,latitude,longitude\nSomewhere,1.5,2.5\nNowhere,north,2\n')
+        try:
+            places = load_gazetteer(gazetteer_file.name)
+        finally:
+            os.unlink(gazetteer_file.name)
+        self.assertEqual([place['name'] for place in places], ['Somewhere'])
+        self.assertEqual(places[0]['population'], 0)
+        self.assertEqual(load_gazetteer(gazetteer_file.name), [])
+
+
+class TestLocalGeocoder(unittest.TestCase):
+    """Test offline geocoding from gazetteer places."""
+
+    def setUp(self):
+        """Set up a geocoder over a few places."""
+        self.geocoder = LocalGeocoder([
+            {'name': 'Cambridge', 'country': 'US', 'coordinates': (-71.1, 42.37), 'population': 118000},
+            {'name': 'Cambridge', 'country': 'GB', 'coordinates': (0.12, 52.2), 'population': 158000},
+            {'name': 'Manchester', 'country': 'GB', 'coordinates': (-2.24, 53.48), 'population': 552000},
+            {'name': 'Newcastle upon Tyne', 'country': 'GB', 'coordinates': (-1.61, 54.97), 'population': 300000}
+        ])
+
+    def test_exact_names(self):
+        """Test normalized and country-qualified names."""
+        self.assertEqual(self.geocoder.lookup(' CAMBRIDGE. '), (0.12, 52.2))
+        self.assertEqual(self.geocoder.lookup('Cambridge, US'), (-71.1, 42.37))
+        self.assertEqual(self.geocoder.lookup('manchester gb'), (-2.24, 53.48))
+
+    def test_fuzzy_names(self):
+        """Test that misspellings match only on request and unrelated text never does."""
+        self.assertIsNone(self.geocoder.lookup('Manchestr'))
+        self.assertEqual(self.geocoder.lookup('Manchestr', fuzzy=True), (-2.24, 53.48))
+        self.assertEqual(self.geocoder.lookup('Newcastle upon Tine', fuzzy=True), (-1.61, 54.97))
+        self.assertIsNone(self.geocoder.lookup('Manchester Airport Terminal 2', fuzzy=True))
+        self.assertIsNone(self.geocoder.lookup('Zanzibar', fuzzy=True))
+        self.assertEqual(self.geocoder.stats(), {'hits': 2, 'misses': 3, 'size': 4})
+
+    def test_near_miss_place_names(self):
+        """Test that real places a letter away from a gazetteer place never match it."""
+        geocoder = LocalGeocoder(load_gazetteer(Config.GAZETTEER_PATH))
+        for location in ('Delphi', 'Parish', 'Lyons', 'Bathe', 'Yorks'):
+            self.assertIsNone(geocoder.lookup(location, fuzzy=True), location)
+        self.assertEqual(geocoder.match('Edinbrugh', fuzzy=True)[0], 'Edinburgh')
+
+    def test_edit_similarity(self):
+        """Test the edit similarity, counting a transposition as one edit."""
+        self.assertEqual(edit_similarity('london', 'london'), 1.0)
+        self.assertAlmostEqual(edit_similarity('londn', 'london'), 5 / 6)
+        self.assertAlmostEqual(edit_similarity('lodnon', 'london'), 5 / 6)
+        self.assertEqual(edit_similarity('', 'london'), 0.0)
+
+
+class TestSuggestionIndex(unittest.TestCase):
+    """Test ranked prefix suggestions."""
+
+    def setUp(self):
+        """Set up an index with a few places."""
+        self.index = SuggestionIndex(limit=3)
+        self.index.add('Newcastle upon Tyne', (-1.61, 54.97), 'GB', 300000)
+        self.index.add('New York', (-74.0, 40.71), 'US', 8000000)
+        self.index.add('Newport', (-3.0, 51.58), 'GB', 150000)
+        self.index.add('York', (-1.08, 53.96), 'GB', 150000)
+
+    def names(self, prefix, limit=None):
+        """Get the suggested names for a prefix."""
+        return [suggestion['name'] for suggestion in self.index.suggest(prefix, limit)]
+
+    def test_ranked_by_population(self):
+        """Test that prefix matches are ranked by population."""
+        self.assertEqual(self.names('new'), ['New York', 'Newcastle upon Tyne', 'Newport'])
+        self.assertEqual(self.names('NEW  y'), ['New York'])
+        self.assertEqual(self.names('new', limit=1), ['New York'])
+        self.assertEqual(self.names('x'), [])
+        self.assertEqual(self.names(' '), [])
+
+    def test_word_matches_follow_name_matches(self):
+        """Test that later words match after names starting with the prefix."""
+        self.assertEqual(self.names('york'), ['York', 'New York'])
+        self.assertEqual(self.names('tyne'), ['Newcastle upon Tyne'])
+
+    def test_geocoded_places_rank_first(self):
+        """Test that successful geocodes raise a place's rank and add new names."""
+        self.index.record('newport', (-3.0, 51.58))
+        self.assertEqual(self.names('new')[0], 'Newport')
+        self.index.record('Newbury', (-1.32, 51.4))
+        self.index.record('Newbury', (-1.32, 51.4))
+        self.assertEqual(self.names('new')[:2], ['Newbury', 'Newport'])
+        suggestion = self.index.suggest('newb')[0]
+        self.assertEqual((suggestion['lat'], suggestion['lon']), (51.4, -1.32))
+
+    def test_max_entries(self):
+        """Test that a full index no longer learns new names."""
+        index = SuggestionIndex(max_entries=1)
+        index.record('Oxford', (-1.26, 51.75))
+        index.record('Cambridge', (0.12, 52.2))
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.suggest('cam'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
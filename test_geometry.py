@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the route geometry utilities of the Sustainable Travel Route Finder.
+"""
+
+import json
+import math
+import unittest
+from services.geometry import (
+    bounding_box, decode_polyline, encode_geometry, encode_polyline, line_length,
+    pack_delta, pack_float32, point_significance, resample_line, segment_lengths,
+    simplify_for_display, simplify_line, to_latlon_array, tolerance_for_zoom,
+    unpack_delta, unpack_float32
+)
+
+
+def make_wiggly_line(count=2001):
+    """Build a west-east line near London with a small sideways wiggle."""
+    return [
+        [51.5 + 0.0001 * math.sin(index / 10), -0.5 + index * 0.0005]
+        for index in range(count)
+    ]
+
+
+class TestSimplification(unittest.TestCase):
+    """Test Douglas-Peucker simplification."""
+
+    def test_collinear_points_are_dropped(self):
+        """Test that points on a straight segment are removed."""
+        line = [[51.5, -0.1 + index * 0.001] for index in range(10)]
+        self.assertEqual(simplify_line(line, tolerance=0.5).tolist(), [line[0], line[-1]])
+
+    def test_endpoints_are_kept(self):
+        """Test that the first and last points always survive."""
+        line = make_wiggly_line()
+        simplified = simplify_line(line, max_points=10)
+        self.assertEqual(simplified[0].tolist(), line[0])
+        self.assertEqual(simplified[-1].tolist(), line[-1])
+
+    def test_point_budget(self):
+        """Test that the point budget is respected."""
+        simplified = simplify_line(make_wiggly_line(), max_points=100)
+        self.assertLessEqual(len(simplified), 100)
+
+    def test_tolerance_bounds_deviation(self):
+        """Test that no point deviates more than its tolerance from the result."""
+        line = make_wiggly_line()
+        significance = point_significance(line)
+        kept = simplify_line(line, tolerance=5.0).tolist()
+        self.assertLess(len(kept), len(line))
+        self.assertTrue(all(value > 5.0 for value, point in zip(significance, line) if point in kept))
+
+    def test_lower_zoom_keeps_fewer_points(self):
+        """Test that zooming out simplifies more aggressively."""
+        line = make_wiggly_line()
+        city = simplify_for_display(line, zoom=16)
+        country = simplify_for_display(line, zoom=6)
+        self.assertLess(len(country), len(city))
+        self.assertLessEqual(len(city), len(line))
+
+    def test_tolerance_for_zoom(self):
+        """Test that each zoom level halves the tolerance."""
+        self.assertAlmostEqual(tolerance_for_zoom(10) / tolerance_for_zoom(11), 2.0)
+        self.assertLess(tolerance_for_zoom(10, latitude=60), tolerance_for_zoom(10))
+
+
+class TestGeometryMeasures(unittest.TestCase):
+    """Test vectorized line measurements."""
+
+    def test_geojson_coordinates_are_swapped(self):
+        """Test that [lon, lat, elevation] becomes a contiguous [lat, lon] array."""
+        points = to_latlon_array([[-0.1278, 51.5074, 11.0], [2.3522, 48.8566, 35.0]])
+        self.assertEqual(points.tolist(), [[51.5074, -0.1278], [48.8566, 2.3522]])
+        self.assertTrue(points.flags['C_CONTIGUOUS'])
+
+    def test_segment_lengths(self):
+        """Test haversine lengths against one degree of latitude."""
+        lengths = segment_lengths([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0]])
+        self.assertAlmostEqual(lengths[0], 111195, delta=1)
+        self.assertAlmostEqual(lengths[1], 111178, delta=1)
+        self.assertAlmostEqual(line_length([[0.0, 0.0], [1.0, 0.0]]), 111195, delta=1)
+
+    def test_bounding_box(self):
+        """Test that bounds are returned south-west then north-east."""
+        line = [[51.5, -0.1], [48.8, 2.3], [50.0, 1.0]]
+        self.assertEqual(bounding_box(line).tolist(), [[48.8, -0.1], [51.5, 2.3]])
+        self.assertIsNone(bounding_box([]))
+
+    def test_resample_line(self):
+        """Test that resampling spaces points evenly and keeps the endpoints."""
+        line = [[0.0, 0.0], [0.0, 1.0]]
+        resampled = resample_line(line, 10000)
+        self.assertEqual(len(resampled), 13)
+        self.assertEqual(resampled[0].tolist(), line[0])
+        self.assertEqual(resampled[-1].tolist(), line[-1])
+        self.assertLessEqual(segment_lengths(resampled).max(), 10000 + 1e-6)
+
+
+class TestGeometryEncoding(unittest.TestCase):
+    """Test compact geometry encodings."""
+
+    def setUp(self):
+        """Use the reference line from the encoded polyline documentation."""
+        self.points = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+
+    def test_encode_polyline(self):
+        """Test the Google encoded polyline reference example."""
+        self.assertEqual(encode_polyline(self.points), '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+
+    def test_polyline_round_trip(self):
+        """Test that polyline6 keeps six decimals."""
+        points = [[51.507412, -0.127758], [48.856613, 2.352222]]
+        self.assertEqual(decode_polyline(encode_polyline(points, 6), 6).tolist(), points)
+
+    def test_delta_round_trip(self):
+        """Test that delta packing is exact to microdegrees."""
+        self.assertEqual(unpack_delta(pack_delta(self.points)).tolist(), self.points)
+
+    def test_float32_round_trip(self):
+        """Test that float32 packing stays within float32 precision."""
+        for unpacked, point in zip(unpack_float32(pack_float32(self.points)), self.points):
+            self.assertAlmostEqual(unpacked[0], point[0], places=4)
+            self.assertAlmostEqual(unpacked[1], point[1], places=4)
+
+    def test_encodings_are_smaller(self):
+        """Test that every compact encoding beats plain JSON on a long route."""
+        line = make_wiggly_line()
+        plain = len(json.dumps(line))
+        for geometry_format in ('polyline', 'polyline6', 'float32', 'delta'):
+            self.assertLess(len(encode_geometry(line, geometry_format)), plain / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the ORS HTTP client setup of the Sustainable Travel Route Finder.
+"""
+
+import json
+import threading
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import Config
+from services.http_client import create_http_session, create_ors_client
+from services.route_service import RouteService
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answer 503 to the first request and 200 afterwards."""
+
+    protocol_version = 'HTTP/1.1'
+    requests_seen = 0
+
+    def do_GET(self):
+        FlakyHandler.requests_seen += 1
+        status = 503 if FlakyHandler.requests_seen == 1 else 200
+        body = json.dumps({'ok': status == 200}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    """Test the pooled HTTP session."""
+
+    def test_pool_and_retry_settings(self):
+        """Test that the adapter pool and retry policy are configured."""
+        session = create_http_session(12, retries=3, backoff_factor=0.5)
+        adapter = session.get_adapter('https://api.openrouteservice.org')
+        self.assertEqual(adapter._pool_maxsize, 12)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.5)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertIn('POST', adapter.max_retries.allowed_methods)
+
+    def test_gateway_errors_are_retried(self):
+        """Test that a 503 is retried on the same keep-alive session."""
+        FlakyHandler.requests_seen = 0
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            session = create_http_session(2, retries=2, backoff_factor=0)
+            response = session.get(f'http://127.0.0.1:{server.server_port}/', timeout=(1, 1))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(FlakyHandler.requests_seen, 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestOrsClient(unittest.TestCase):
+    """Test the ORS client built on the pooled session."""
+
+    def test_client_uses_pooled_session(self):
+        """Test that the client gets the session and split timeouts."""
+        client = create_ors_client('test-api-key', pool_size=6, timeout=(2, 9))
+        self.assertEqual(client._requests_kwargs['timeout'], (2, 9))
+        adapter = client._session.get_adapter('https://api.openrouteservice.org')
+        self.assertEqual(adapter._pool_maxsize, 6)
+
+    def test_pool_matches_route_service_threads(self):
+        """Test that the default pool covers both route service pools."""
+        route_service = RouteService('test-api-key', max_workers=5, batch_workers=3)
+        adapter = route_service.client._session.get_adapter('https://api.openrouteservice.org')
+        self.assertEqual(adapter._pool_maxsize, Config.ORS_POOL_SIZE or 8)
+
+    def test_pool_covers_hedged_attempts(self):
+        """Test that hedging adds the hedge pool's threads to the default pool."""
+        with patch.object(Config, 'ORS_HEDGE_ENABLED', True):
+            route_service = RouteService('test-api-key', max_workers=5, batch_workers=3)
+        adapter = route_service.client._session.get_adapter('https://api.openrouteservice.org')
+        self.assertEqual(adapter._pool_maxsize, Config.ORS_POOL_SIZE or 18)
+
+
+if __name__ == '__main__':
+    unittest.main()
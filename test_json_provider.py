@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON provider of the Sustainable Travel Route Finder.
+"""
+
+import json
+import unittest
+from unittest.mock import patch
+import numpy as np
+from flask import Flask
+from config import Config
+from services.geometry import bounding_box
+from utils import json_provider
+from utils.json_provider import RouteJSONProvider
+
+
+class TestRouteJSONProvider(unittest.TestCase):
+    """Test JSON serialization of route payloads."""
+
+    def setUp(self):
+        """Set up an app using the route JSON provider."""
+        self.app = Flask(__name__)
+        self.app.config.from_object(Config)
+        self.app.json = RouteJSONProvider(self.app)
+        self.payload = {
+            'mode': 'driving',
+            'distance': 12.34,
+            'geometry': np.array([[51.507412345, -0.127758901], [48.8566, 2.3522]]),
+            'bbox': bounding_box([[51.507412345, -0.127758901], [48.8566, 2.3522]]),
+            'points': np.int64(2)
+        }
+
+    def assert_payload_serialized(self):
+        """Check the serialized test payload."""
+        data = json.loads(self.app.json.dumps(self.payload))
+        self.assertEqual(data['geometry'], [[51.507412, -0.127759], [48.8566, 2.3522]])
+        self.assertEqual(data['bbox'], [[48.8566, -0.127759], [51.507412, 2.3522]])
+        self.assertEqual(data['distance'], 12.34)
+        self.assertEqual(data['points'], 2)
+
+    def test_arrays_are_rounded(self):
+        """Test that float arrays are written with JSON_FLOAT_PRECISION decimals."""
+        self.assert_payload_serialized()
+        self.app.config['JSON_FLOAT_PRECISION'] = 2
+        data = json.loads(self.app.json.dumps(self.payload))
+        self.assertEqual(data['geometry'][0], [51.51, -0.13])
+
+    def test_stdlib_fallback(self):
+        """Test that the provider works without orjson."""
+        with patch.object(json_provider, 'orjson', None):
+            self.assert_payload_serialized()
+
+    def test_keys_are_sorted(self):
+        """Test that output keeps Flask's sorted keys with either encoder."""
+        expected = '{"a":1,"b":2}'
+        self.assertEqual(self.app.json.dumps({'b': 2, 'a': 1}, separators=(',', ':')), expected)
+        with patch.object(json_provider, 'orjson', None):
+            self.assertEqual(self.app.json.dumps({'b': 2, 'a': 1}, separators=(',', ':')), expected)
+
+    def test_response(self):
+        """Test that jsonify responses use the provider."""
+        with self.app.app_context():
+            response = self.app.json.response(self.payload)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(response.data)['geometry'][0], [51.507412, -0.127759])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Tests for the route service of the Sustainable Travel Route Finder.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from openrouteservice.exceptions import ApiError
+from services.cache import NullCache
+from services.concurrency import Deadline
+from services.route_service import RouteService
+from utils.exceptions import DeadlineExceededError, GeocodingError
+
+
+def make_directions_response(distance=1000, duration=600):
+    """Build a minimal ORS GeoJSON directions response."""
+    return {
+        'features': [{
+            'properties': {
+                'segments': [{'distance': distance, 'duration': duration}]
+            },
+            'geometry': {
+                'coordinates': [[-0.1278, 51.5074], [-0.1, 51.51]]
+            }
+        }]
+    }
+
+
+class TestRouteServiceFanOut(unittest.TestCase):
+    """Test concurrent per-mode route fetching."""
+
+    def setUp(self):
+        """Set up a route service with a mocked ORS client."""
+        self.route_service = RouteService('test-api-key', max_workers=4, local_geocoder=None)
+        self.route_service.client = Mock()
+        self.route_service.client.pelias_search.return_value = {
+            'features': [{'geometry': {'coordinates': [-0.1278, 51.5074]}}]
+        }
+
+    def test_modes_are_fetched_concurrently(self):
+        """Test that all directions calls are in flight at the same time."""
+        barrier = threading.Barrier(len(self.route_service.supported_modes), timeout=5)
+
+        def directions(**kwargs):
+            barrier.wait()
+            return make_directions_response()
+
+        self.route_service.client.directions.side_effect = directions
+        routes = self.route_service.get_routes('London', 'Paris')
+        self.assertEqual(len(routes), 3)
+
+    def test_routes_keep_supported_mode_order(self):
+        """Test that results are assembled in supported-mode order."""
+        self.route_service.client.directions.return_value = make_directions_response()
+        routes = self.route_service.get_routes('London', 'Paris')
+        self.assertEqual(
+            [route['mode'] for route in routes],
+            list(self.route_service.supported_modes.values())
+        )
+
+    def test_failed_mode_is_left_out(self):
+        """Test that a failing mode degrades to a missing route."""
+        def directions(profile, **kwargs):
+            if profile == 'cycling-regular':
+                raise RuntimeError('upstream failure')
+            return make_directions_response()
+
+        self.route_service.client.directions.side_effect = directions
+        routes = self.route_service.get_routes('London', 'Paris')
+        self.assertEqual([route['mode'] for route in routes], ['driving', 'walking'])
+
+
+class TestRouteServiceGeocoding(unittest.TestCase):
+    """Test concurrent geocoding of route endpoints."""
+
+    def setUp(self):
+        """Set up a route service with a mocked ORS client."""
+        self.route_service = RouteService('test-api-key', max_workers=4, local_geocoder=None)
+        self.route_service.client = Mock()
+        self.route_service.client.directions.return_value = make_directions_response()
+
+    def test_endpoints_are_geocoded_concurrently(self):
+        """Test that origin and destination lookups overlap."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def pelias_search(text, size):
+            barrier.wait()
+            return {'features': [{'geometry': {'coordinates': [2.35, 48.85]}}]}
+
+        self.route_service.client.pelias_search.side_effect = pelias_search
+        routes = self.route_service.get_routes('London', 'Paris')
+        self.assertEqual(len(routes), 3)
+
+    def test_geocoding_error_names_failed_location(self):
+        """Test that the failing location is named in the error."""
+        def pelias_search(text, size):
+            if text == 'Atlantis':
+                return {'features': []}
+            return {'features': [{'geometry': {'coordinates': [2.35, 48.85]}}]}
+
+        self.route_service.client.pelias_search.side_effect = pelias_search
+        with self.assertRaises(GeocodingError) as context:
+            self.route_service.get_routes('Paris', 'Atlantis')
+        self.assertIn('Location not found: Atlantis', str(context.exception))
+
+    def test_coordinates_are_not_geocoded(self):
+        """Test that (lon, lat) endpoints are routed without geocoding."""
+        self.route_service.client.pelias_search.return_value = {
+            'features': [{'geometry': {'coordinates': [2.35, 48.85]}}]
+        }
+        routes = self.route_service.get_routes((-0.1278, 51.5074), 'Quai de Valmy')
+        self.assertEqual(len(routes), 3)
+        self.route_service.client.pelias_search.assert_called_once()
+        coordinates = self.route_service.client.directions.call_args.kwargs['coordinates']
+        self.assertEqual(coordinates, ((-0.1278, 51.5074), (2.35, 48.85)))
+
+
+class TestRouteServiceGeocodeCache(unittest.TestCase):
+    """Test the geocoding cache in front of pelias_search."""
+
+    def setUp(self):
+        """Set up a route service with a mocked ORS client."""
+        self.route_service = RouteService('test-api-key', max_workers=4)
+        # Resolve every location through the mocked pelias_search
+        self.route_service.local_geocoder = None
+        self.route_service.client = Mock()
+        self.route_service.client.pelias_search.return_value = {
+            'features': [{'geometry': {'coordinates': [-0.1278, 51.5074]}}]
+        }
+
+    def test_normalized_names_share_an_entry(self):
+        """Test that case, whitespace and punctuation variants hit the cache."""
+        for location in ['London', ' london ', 'LONDON.']:
+            coords = self.route_service.geocode_location(location)
+            self.assertEqual(coords, (-0.1278, 51.5074))
+        self.assertEqual(self.route_service.client.pelias_search.call_count, 1)
+        stats = self.route_service.get_cache_stats()['geocode']
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_location_not_found_is_cached(self):
+        """Test that unknown locations are negatively cached."""
+        self.route_service.client.pelias_search.return_value = {'features': []}
+        for _ in range(2):
+            with self.assertRaises(GeocodingError):
+                self.route_service.geocode_location('Atlantis')
+        self.assertEqual(self.route_service.client.pelias_search.call_count, 1)
+
+    def test_service_errors_are_not_cached(self):
+        """Test that transient upstream failures are retried."""
+        self.route_service.client.pelias_search.side_effect = RuntimeError('down')
+        with self.assertRaises(GeocodingError):
+            self.route_service.geocode_location('London')
+        self.route_service.client.pelias_search.side_effect = None
+        self.assertEqual(
+            self.route_service.geocode_location('London'), (-0.1278, 51.5074)
+        )
+
+
+class TestRouteServiceLocalGeocoder(unittest.TestCase):
+    """Test the gazetteer tier in front of pelias_search."""
+
+    def setUp(self):
+        """Set up a route service with a mocked ORS client."""
+        self.route_service = RouteService('test-api-key', max_workers=4)
+        self.route_service.client = Mock()
+        self.route_service.client.pelias_search.return_value = {
+            'features': [{'geometry': {'coordinates': [-0.1, 51.5]}}]
+        }
+
+    def test_gazetteer_places_skip_pelias(self):
+        """Test that exact place names are geocoded offline and misspellings are not."""
+        self.assertEqual(self.route_service.geocode_location('London'), (-0.12574, 51.50853))
+        self.assertEqual(self.route_service.geocode_location('edinburgh gb'), (-3.19648, 55.95206))
+        self.route_service.client.pelias_search.assert_not_called()
+        self.assertEqual(self.route_service.geocode_location('Edinbrugh'), (-0.1, 51.5))
+        self.route_service.client.pelias_search.assert_called_once()
+        self.assertEqual(self.route_service.get_cache_stats()['local_geocode']['hits'], 2)
+
+    def test_misspellings_match_while_geocoder_is_down(self):
+        """Test the fuzzy gazetteer fallback once the geocode circuit opens."""
+        self.route_service.client.pelias_search.side_effect = RuntimeError('down')
+        for index in range(5):
+            with self.assertRaises(GeocodingError):
+                self.route_service.geocode_location(f'Town {index}')
+        self.assertEqual(self.route_service.geocode_location('Edinbrugh'), (-3.19648, 55.95206))
+        with self.assertRaises(GeocodingError) as context:
+            self.route_service.geocode_location('Parish')
+        self.assertIn('unavailable', str(context.exception))
+        self.assertEqual(self.route_service.client.pelias_search.call_count, 5)
+
+    def test_gazetteer_names_are_recorded(self):
+        """Test that suggestions learn the matched place name, not the spelling typed."""
+        self.route_service.geocode_location('Lodnon')
+        self.assertEqual(self.route_service.suggestion_index.suggest('lod'), [])
+        self.assertEqual(self.route_service.suggestion_index.suggest('lon')[0]['name'], 'London')
+
+    def test_addresses_are_not_suggested(self):
+        """Test that only town-level pelias labels become suggestions."""
+        self.route_service.client.pelias_search.return_value = {'features': [{
+            'geometry': {'coordinates': [-0.1276, 51.5034]},
+            'properties': {
+                'label': '10 Downing Street, London, England, United Kingdom',
+                'layer': 'address'
+            }
+        }]}
+        self.route_service.geocode_location('10 downing st london')
+        self.assertEqual(self.route_service.suggestion_index.suggest('10 d'), [])
+        self.route_service.client.pelias_search.return_value = {'features': [{
+            'geometry': {'coordinates': [-1.32, 51.4]},
+            'properties': {'label': 'Newbury, England, United Kingdom', 'layer': 'locality'}
+        }]}
+        self.route_service.geocode_location('newbury berks')
+        self.assertEqual(
+            self.route_service.suggestion_index.suggest('newb')[0]['name'],
+            'Newbury, England, United Kingdom'
+        )
+
+    def test_unknown_locations_use_pelias(self):
+        """Test that locations missing from the gazetteer fall back to pelias_search."""
+        self.assertEqual(self.route_service.geocode_location('10 Downing Street'), (-0.1, 51.5))
+        self.route_service.client.pelias_search.assert_called_once()
+
+
+class TestRouteServiceRouteCache(unittest.TestCase):
+    """Test the directions cache in front of the ORS directions API."""
+
+    def setUp(self):
+        """Set up a route service with a mocked ORS client."""
+        self.route_service = RouteService('test-api-key', max_workers=4)
+        self.route_service.client = Mock()
+        self.route_service.client.directions.return_value = make_directions_response()
+
+    def test_repeated_route_is_served_from_cache(self):
+        """Test that nearby coordinates with the same profile hit the cache."""
+        first = self.route_service.get_route_for_mode(
+            (-0.1278, 51.5074), (2.3522, 48.8566), 'driving-car', 'driving'
+        )
+        second = self.route_service.get_route_for_mode(
+            (-0.127800001, 51.5074), (2.3522, 48.8566), 'driving-car', 'driving'
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(self.route_service.client.directions.call_count, 1)
+
+    def test_profile_is_part_of_the_key(self):
+        """Test that different profiles are cached separately."""
+        for ors_mode, mode_name in [('driving-car', 'driving'), ('foot-walking', 'walking')]:
+            self.route_service.get_route_for_mode(
+                (-0.1278, 51.5074), (2.3522, 48.8566), ors_mode, mode_name
+            )
+        self.assertEqual(self.route_service.client.directions.call_count, 2)
+
+    def test_cached_route_is_not_shared(self):
+        """Test that callers can annotate a returned route without touching the cache."""
+        route = self.route_service.get_route_for_mode(
+            (-0.1278, 51.5074), (2.3522, 48.8566), 'driving-car', 'driving'
+        )
+        route['vehicle_name'] = 'Hybrid Vehicle'
+        cached = self.route_service.get_route_for_mode(
+            (-0.1278, 51.5074), (2.3522, 48.8566), 'driving-car', 'driving'
+        )
+        self.assertNotIn('vehicle_name', cached)
+
+
+class TestRouteServiceCoalescing(unittest.TestCase):
+    """Test coalescing of identical concurrent upstream lookups."""
+
+    def setUp(self):
+        """Set up a route service with a slow mocked ORS client."""
+        self.route_service = RouteService('test-api-key', max_workers=8)
+        # Resolve every location through the mocked pelias_search
+        self.route_service.local_geocoder = None
+        self.route_service.client = Mock()
+
+        def pelias_search(text, size):
+            time.sleep(0.1)
+            return {'features': [{'geometry': {'coordinates': [-0.1278, 51.5074]}}]}
+
+        def directions(**kwargs):
+            time.sleep(0.1)
+            return make_directions_response()
+
+        self.route_service.client.pelias_search.side_effect = pelias_search
+        self.route_service.client.directions.side_effect = directions
+
+    def test_concurrent_geocodes_share_one_call(self):
+        """Test that concurrent lookups of one location hit pelias_search once."""
+        futures = [
+            self.route_service.executor.submit(self.route_service.geocode_location, location)
+            for location in ['London', 'london', ' LONDON ', 'London']
+        ]
+        results = [future.result() for future in futures]
+        self.assertEqual(set(results), {(-0.1278, 51.5074)})
+        self.assertEqual(self.route_service.client.pelias_search.call_count, 1)
+
+    def test_concurrent_directions_share_one_call(self):
+        """Test that concurrent identical route lookups hit directions once."""
+        futures = [
+            self.route_service.executor.submit(
+                self.route_service.get_route_for_mode,
+                (-0.1278, 51.5074), (2.3522, 48.8566), 'driving-car', 'driving'
+            )
+            for _ in range(4)
+        ]
+        routes = [future.result() for future in futures]
+        self.assertEqual(self.route_service.client.directions.call_count, 1)
+        self.assertTrue(all(route['distance'] == 1.0 for route in routes))
+        self.assertEqual(len({id(route) for route in routes}), 4)
+
+
+class TestRouteServiceDeadline(unittest.TestCase):
+    """Test the time budget of a route comparison."""
+
+    def setUp(self):
+        """Set up a route service whose walking directions are slow."""
+        self.route_service = RouteService('test-api-key', max_workers=4)
+        # Resolve every location through the mocked pelias_search
+        self.route_service.local_geocoder = None
+        self.route_service.client = Mock()
+        self.route_service.client.pelias_search.return_value = {
+            'features': [{'geometry': {'coordinates': [-0.1278, 51.5074]}}]
+        }
+
+        def directions(profile, **kwargs):
+            if profile == 'foot-walking':
+                time.sleep(0.5)
+            return make_directions_response()
+
+        self.route_service.client.directions.side_effect = directions
+
+    def test_slow_mode_is_reported_missing(self):
+        """Test that modes finished within the deadline are returned without waiting."""
+        start = time.monotonic()
+        routes, missing_modes = self.route_service.compare_routes(
+            'London', 'Paris', deadline=Deadline(0.2)
+        )
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual([route['mode'] for route in routes], ['driving', 'bicycling'])
+        self.assertEqual(missing_modes, ['walking'])
+
+    def test_no_deadline_waits_for_every_mode(self):
+        """Test that without a deadline every mode is returned."""
+        routes, missing_modes = self.route_service.compare_routes('London', 'Paris')
+        self.assertEqual(len(routes), 3)
+        self.assertEqual(missing_modes, [])
+
+    def test_slow_geocoding_exceeds_deadline(self):
+        """Test that geocoding past the deadline fails with a timeout."""
+        def pelias_search(text, size):
+            time.sleep(0.3)
+            return {'features': [{'geometry': {'coordinates': [2.35, 48.85]}}]}
+
+        self.route_service.client.pelias_search.side_effect = pelias_search
+        with self.assertRaises(DeadlineExceededError):
+            self.route_service.compare_routes('London', 'Paris', deadline=Deadline(0.1))
+
+    def test_queued_modes_are_cancelled_at_deadline(self):
+        """Test that modes still queued at the deadline never reach ORS."""
+        route_service = RouteService('test-api-key', max_workers=1, local_geocoder=None)
+        route_service.client = self.route_service.client
+
+        def directions(profile, **kwargs):
+            time.sleep(0.3)
+            return make_directions_response()
+
+        route_service.client.directions.side_effect = directions
+        with self.assertRaises(DeadlineExceededError):
+            route_service.compare_routes('London', 'Paris', deadline=Deadline(0.1))
+        route_service.executor.shutdown(wait=True)
+        self.assertEqual(
+            [call.kwargs['profile'] for call in route_service.client.directions.call_args_list],
+            ['driving-car']
+        )
+
+
+class TestRouteServiceCircuitBreaker(unittest.TestCase):
+    """Test circuit breaking of ORS endpoints."""
+
+    def setUp(self):
+        """Set up a route service whose directions endpoint is down."""
+        self.route_service = RouteService('test-api-key', max_workers=4)
+        # Resolve every location through the mocked pelias_search
+        self.route_service.local_geocoder = None
+        self.route_service.client = Mock()
+        self.route_service.client.directions.side_effect = ApiError(503, 'unavailable')
+
+    def fetch(self, destination):
+        """Request a driving route to a distinct destination."""
+        return self.route_service.get_route_for_mode(
+            (-0.1278, 51.5074), destination, 'driving-car', 'driving'
+        )
+
+    def test_failing_profile_fails_fast(self):
+        """Test that the driving circuit opens and stops calling ORS."""
+        for index in range(10):
+            self.assertIsNone(self.fetch((2.35, 48.85 + index)))
+        stats = self.route_service.get_upstream_stats()['directions:driving-car']
+        self.assertEqual(stats['state'], 'open')
+        self.assertEqual(self.route_service.client.directions.call_count, 5)
+
+    def test_client_errors_do_not_trip(self):
+        """Test that ORS 4xx responses such as unroutable points keep the circuit closed."""
+        self.route_service.client.directions.side_effect = ApiError(404, 'no route')
+        for index in range(10):
+            self.fetch((2.35, 48.85 + index))
+        self.assertEqual(self.route_service.client.directions.call_count, 10)
+
+    def test_open_geocoder_raises_geocoding_error(self):
+        """Test that an open geocode circuit surfaces as a geocoding error."""
+        self.route_service.client.pelias_search.side_effect = RuntimeError('down')
+        for index in range(5):
+            with self.assertRaises(GeocodingError):
+                self.route_service.geocode_location(f'Town {index}')
+        with self.assertRaises(GeocodingError) as context:
+            self.route_service.geocode_location('London')
+        self.assertIn('unavailable', str(context.exception))
+        self.assertEqual(self.route_service.client.pelias_search.call_count, 5)
+
+
+
+class TestRouteServiceBatch(unittest.TestCase):
+    """Test routing many origin/destination pairs."""
+
+    def setUp(self):
+        """Set up a route service with a mocked ORS client."""
+        self.route_service = RouteService(
+            'test-api-key', max_workers=4, batch_workers=2, local_geocoder=None
+        )
+        self.route_service.client = Mock()
+        self.route_service.client.directions.return_value = make_directions_response()
+
+    def test_pairs_are_routed_as_their_endpoints_resolve(self):
+        """Test that a slow geocode does not hold back other pairs."""
+        release = threading.Event()
+
+        def pelias_search(text, size):
+            if text == 'Slow Lane':
+                release.wait(timeout=5)
+            return {'features': [{'geometry': {'coordinates': [2.35, 48.85]}}]}
+
+        self.route_service.client.pelias_search.side_effect = pelias_search
+        results = self.route_service.iter_routes_batch([
+            ('Slow Lane', 'Quai de Valmy'),
+            ('Rue de Rivoli', 'Quai de Valmy')
+        ])
+        index, routes = next(results)
+        self.assertEqual(index, 1)
+        self.assertEqual(len(routes), 3)
+        release.set()
+        self.assertEqual(next(results)[0], 0)
+
+    def test_repeated_locations_are_geocoded_once_without_cache(self):
+        """Test that a batch dedupes its locations even with caching disabled."""
+        self.route_service.geocode_cache = NullCache()
+        self.route_service.client.pelias_search.return_value = {
+            'features': [{'geometry': {'coordinates': [2.35, 48.85]}}]
+        }
+        results = self.route_service.get_routes_batch([('Rue de Rivoli', 'quai de valmy')] * 5)
+        self.assertTrue(all(len(routes) == 3 for routes in results))
+        self.assertEqual(self.route_service.client.pelias_search.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline routing engine of the Sustainable Travel Route Finder.
+"""
+
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from config import Config
+from services.geometry import haversine_distances
+from services.route_service import RouteService
+from services.routing_engine import (
+    LocalRoutingEngine, create_routing_engine, parse_maxspeed, way_directions, way_speed
+)
+from utils.exceptions import ConfigurationError
+
+# Corners and junctions of the bundled synthetic street grid, as (lon, lat)
+SOUTH_WEST = (0.1200, 52.2000)
+NORTH_EAST = (0.1350, 52.2100)
+MARKET_WALK_SOUTH = (0.1260, 52.2020)
+MARKET_WALK_NORTH = (0.1260, 52.2080)
+SECOND_STREET_WEST = (0.1230, 52.2040)
+SECOND_STREET_EAST = (0.1320, 52.2040)
+
+ENGINE = LocalRoutingEngine(Config.ROUTING_GRAPH_PATH, landmarks=4)
+
+
+class TestWayRules(unittest.TestCase):
+    """Test the OSM tag rules of the routing profiles."""
+
+    def test_speeds_and_access(self):
+        """Test highway speeds, maxspeed and access restrictions."""
+        self.assertEqual(way_speed({'highway': 'residential'}, 'driving-car'), 30)
+        self.assertAlmostEqual(way_speed({'highway': 'primary', 'maxspeed': '40 mph'}, 'driving-car'), 64.37376)
+        self.assertIsNone(way_speed({'highway': 'footway'}, 'driving-car'))
+        self.assertIsNone(way_speed({'highway': 'motorway'}, 'foot-walking'))
+        self.assertIsNone(way_speed({'highway': 'service', 'access': 'private'}, 'driving-car'))
+        self.assertEqual(way_speed({'highway': 'service', 'access': 'private', 'foot': 'yes'}, 'foot-walking'), 5)
+        self.assertEqual(way_speed({'highway': 'footway', 'bicycle': 'yes'}, 'cycling-regular'), 15)
+        self.assertIsNone(parse_maxspeed('none'))
+
+    def test_oneway(self):
+        """Test one-way rules per profile."""
+        self.assertEqual(way_directions({'oneway': 'yes'}, 'driving-car'), (True, False))
+        self.assertEqual(way_directions({'oneway': '-1'}, 'driving-car'), (False, True))
+        self.assertEqual(way_directions({'junction': 'roundabout'}, 'driving-car'), (True, False))
+        self.assertEqual(way_directions({'oneway': 'yes'}, 'foot-walking'), (True, True))
+        self.assertEqual(
+            way_directions({'oneway': 'yes', 'oneway:bicycle': 'no'}, 'cycling-regular'), (True, True)
+        )
+
+
+class TestLocalRoutingEngine(unittest.TestCase):
+    """Test routing on the bundled extract."""
+
+    def route(self, origin, destination, profile):
+        """Get a route on the bundled extract."""
+        return ENGINE.route(origin, destination, profile)
+
+    def test_graph_is_compact(self):
+        """Test that only highway nodes are kept and every profile is built."""
+        self.assertEqual(len(ENGINE.coordinates), 36)
+        self.assertEqual(set(ENGINE.graphs), set(Config.get_supported_modes()))
+        for graph in ENGINE.graphs.values():
+            self.assertEqual(len(graph.offsets), 37)
+            self.assertEqual(graph.offsets[-1], len(graph.targets))
+
+    def test_landmarks_match_dijkstra(self):
+        """Test that ALT queries find routes as fast as plain Dijkstra."""
+        plain = LocalRoutingEngine(Config.ROUTING_GRAPH_PATH, landmarks=0)
+        for profile, graph in ENGINE.graphs.items():
+            for source in range(0, 36, 5):
+                for target in range(36):
+                    path = graph.shortest_path(source, target)
+                    expected = plain.graphs[profile].shortest_path(source, target)
+                    self.assertEqual(path is None, expected is None)
+                    if path is not None:
+                        self.assertAlmostEqual(
+                            graph.edge_values(path)[1],
+                            plain.graphs[profile].edge_values(expected)[1],
+                            places=3
+                        )
+
+    def test_nearest_node_matches_scan(self):
+        """Test that grid snapping finds the node a full scan finds."""
+        engine = LocalRoutingEngine(Config.ROUTING_GRAPH_PATH, landmarks=0, max_snap_distance=300)
+        for profile, graph in engine.graphs.items():
+            candidates = np.flatnonzero(graph.routable)
+            for lon in np.linspace(0.115, 0.140, 11):
+                for lat in np.linspace(52.197, 52.213, 9):
+                    distances = haversine_distances(
+                        np.array([[lat, lon]]), engine.coordinates[candidates]
+                    )
+                    expected = int(candidates[distances.argmin()]) if distances.min() <= 300 else None
+                    self.assertEqual(engine.nearest_node((lon, lat), profile), expected)
+
+    def test_route_shape(self):
+        """Test the distance, duration and [lon, lat] geometry of a route."""
+        route = self.route(SOUTH_WEST, NORTH_EAST, 'foot-walking')
+        self.assertAlmostEqual(route['distance'], 2134, delta=5)
+        self.assertAlmostEqual(route['duration'], route['distance'] / (5 / 3.6), delta=1)
+        self.assertEqual(route['coordinates'][0].tolist(), list(SOUTH_WEST))
+        self.assertEqual(route['coordinates'][-1].tolist(), list(NORTH_EAST))
+
+    def test_footway_is_walking_only(self):
+        """Test that cars and bikes detour around a footway."""
+        walking = self.route(MARKET_WALK_SOUTH, MARKET_WALK_NORTH, 'foot-walking')
+        driving = self.route(MARKET_WALK_SOUTH, MARKET_WALK_NORTH, 'driving-car')
+        cycling = self.route(MARKET_WALK_SOUTH, MARKET_WALK_NORTH, 'cycling-regular')
+        self.assertAlmostEqual(walking['distance'], 667, delta=5)
+        self.assertGreater(driving['distance'], walking['distance'])
+        self.assertGreater(cycling['distance'], walking['distance'])
+
+    def test_one_way_street(self):
+        """Test that cars follow a one-way street in one direction only."""
+        eastbound = self.route(SECOND_STREET_WEST, SECOND_STREET_EAST, 'driving-car')
+        westbound = self.route(SECOND_STREET_EAST, SECOND_STREET_WEST, 'driving-car')
+        walking = self.route(SECOND_STREET_EAST, SECOND_STREET_WEST, 'foot-walking')
+        self.assertGreater(westbound['distance'], eastbound['distance'])
+        self.assertAlmostEqual(walking['distance'], eastbound['distance'], delta=1)
+
+    def test_directions_response(self):
+        """Test the ORS-compatible response, including points off the network."""
+        response = ENGINE.directions(coordinates=(SOUTH_WEST, NORTH_EAST), profile='driving-car')
+        segment = response['features'][0]['properties']['segments'][0]
+        self.assertGreater(segment['duration'], 0)
+        far_away = ENGINE.directions(coordinates=(SOUTH_WEST, (2.35, 48.85)), profile='driving-car')
+        self.assertEqual(far_away['features'], [])
+
+
+class TestRoutingEngineSelection(unittest.TestCase):
+    """Test selecting the routing engine for a deployment."""
+
+    def test_create_routing_engine(self):
+        """Test the ROUTING_ENGINE values."""
+        self.assertIsNone(create_routing_engine('ors', Config.ROUTING_GRAPH_PATH))
+        self.assertIsInstance(
+            create_routing_engine('local', Config.ROUTING_GRAPH_PATH, landmarks=2), LocalRoutingEngine
+        )
+        with self.assertRaises(ConfigurationError):
+            create_routing_engine('osrm', Config.ROUTING_GRAPH_PATH)
+
+    def test_route_service_uses_local_engine(self):
+        """Test that directions come from the local engine without ORS calls."""
+        route_service = RouteService('test-api-key', max_workers=4, routing_engine=ENGINE)
+        route_service.client = Mock()
+        walking = route_service.get_route_for_mode(SOUTH_WEST, NORTH_EAST, 'foot-walking', 'walking')
+        driving = route_service.get_route_for_mode(SOUTH_WEST, NORTH_EAST, 'driving-car', 'driving')
+        self.assertEqual(walking['mode'], 'walking')
+        self.assertAlmostEqual(walking['distance'], 2.13, places=2)
+        self.assertLess(driving['duration'], walking['duration'])
+        self.assertEqual(driving['geometry'][0].tolist(), [SOUTH_WEST[1], SOUTH_WEST[0]])
+        self.assertEqual(driving['bbox'].tolist(), [[52.2, 0.12], [52.21, 0.135]])
+        route_service.client.directions.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -138,6 +138,30 @@ class TestVehicleEmissions(unittest.TestCase):
         # Should fall back to average car rate (0.120)
         self.assertEqual(emission, 12.0)  # 100 * 0.120
 
+    def test_vehicle_emission_table(self):
+        """Test that every vehicle is scored for each distance like the scalar path."""
+        tables = self.emissions_service.calculate_vehicle_emission_table([100, 0])
+        self.assertEqual(len(tables), 2)
+        self.assertEqual(set(tables[0]), set(self.emissions_service.vehicle_emissions))
+        for vehicle_type, models in self.emissions_service.vehicle_emissions.items():
+            for vehicle_model in models:
+                self.assertEqual(
+                    tables[0][vehicle_type][vehicle_model],
+                    self.emissions_service.calculate_vehicle_emission(100, vehicle_type, vehicle_model)
+                )
+                self.assertEqual(tables[1][vehicle_type][vehicle_model], 0.0)
+
+    def test_vehicle_catalogue_is_read_only(self):
+        """Test that the catalogue is built once and cannot be modified."""
+        vehicles = self.emissions_service.get_available_vehicles()
+        self.assertIs(vehicles, self.emissions_service.get_available_vehicles())
+        with self.assertRaises(TypeError):
+            vehicles['car']['hybrid']['name'] = 'Changed'
+        self.assertIs(
+            self.emissions_service.get_vehicle_info('car', 'hybrid'), vehicles['car']['hybrid']
+        )
+        self.assertEqual(self.emissions_service.get_vehicle_info('car', 'unknown'), {})
+
     def test_zero_distance(self):
         """Test that zero distance returns zero emissions."""
         emission = self.emissions_service.calculate_vehicle_emission(
@@ -145,6 +169,43 @@ class TestVehicleEmissions(unittest.TestCase):
         )
         self.assertEqual(emission, 0.0)
 
+    def test_emission_matrix(self):
+        """Test that a distance grid is scored with one vehicle rate."""
+        emissions = self.emissions_service.calculate_emission_matrix(
+            [[100, None], [0, 50]], 'driving', 'car', 'hybrid'
+        )
+        self.assertEqual(emissions, [[8.0, None], [0.0, 4.0]])
+
+    def test_batch_emissions_match_scalar(self):
+        """Test that batch emissions round and fall back like the scalar path."""
+        distances = [12.345, 0, -3, 2.675, 306.5, 1.0005]
+        modes = ['driving', 'transit', 'walking', 'driving', 'unknown', 'transit']
+        emissions = self.emissions_service.calculate_emissions(distances, modes)
+        self.assertEqual(
+            emissions.tolist(),
+            [self.emissions_service.calculate_emission(d, m) for d, m in zip(distances, modes)]
+        )
+
+    def test_batch_vehicle_emissions_match_scalar(self):
+        """Test that batch vehicle emissions use the same model fallbacks."""
+        distances = [100, 42.5, 0, 10]
+        vehicle_types = ['car', 'car', 'truck', 'spaceship']
+        vehicle_models = ['hybrid', 'unknown', 'large', 'average']
+        emissions = self.emissions_service.calculate_vehicle_emissions(
+            distances, vehicle_types, vehicle_models
+        )
+        self.assertEqual(
+            emissions.tolist(),
+            [
+                self.emissions_service.calculate_vehicle_emission(d, t, m)
+                for d, t, m in zip(distances, vehicle_types, vehicle_models)
+            ]
+        )
+        self.assertEqual(
+            self.emissions_service.calculate_vehicle_emissions(distances, 'car', 'electric').tolist(),
+            [4.0, 1.7, 0.0, 0.4]
+        )
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -5,13 +5,16 @@
 Utilities package initialization.
 """
 
-from .validators import validate_location_input, validate_coordinates, validate_transport_mode
+from .validators import (
+    validate_location_input, validate_coordinates, validate_transport_mode, normalize_location
+)
 from .exceptions import RouteFinderException, ValidationError, GeocodingError
 
 __all__ = [
     'validate_location_input',
     'validate_coordinates', 
     'validate_transport_mode',
+    'normalize_location',
     'RouteFinderException',
     'ValidationError',
     'GeocodingError'
@@ -0,0 +1,105 @@
+"""
+Response compression for the Flask application.
+Compresses large text responses with brotli when the package is installed
+and the client accepts it, otherwise with gzip.
+"""
+
+import gzip
+import threading
+from typing import Dict, Tuple
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+# Compressed bodies of strong-ETag responses, keyed by (ETag, encoding)
+_MAX_CACHED_BODIES = 64
+
+def compress_body(data: bytes, encoding: str, level: int, brotli_quality: int) -> bytes:
+    """
+    Compress a response body.
+
+    Args:
+        data: Uncompressed body
+        encoding: 'br' or 'gzip'
+        level: gzip compression level (1-9)
+        brotli_quality: brotli quality (0-11)
+
+    Returns:
+        Compressed body
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Get the strong ETag of a compressed variant, e.g. '<etag>-gzip'."""
+    return f"{etag}-{encoding}"
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Compress responses of an application according to its COMPRESS_* settings.
+
+    Streamed and passthrough responses (NDJSON batches, static files), error
+    and 304 responses, bodies below COMPRESS_MIN_SIZE and content types not
+    in COMPRESS_MIMETYPES are sent unchanged.
+
+    Args:
+        app: Flask application
+    """
+    encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+    mimetypes = frozenset(app.config['COMPRESS_MIMETYPES'])
+    cached_bodies: Dict[Tuple[str, str], bytes] = {}
+    cache_lock = threading.Lock()
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+        if (response.status_code < 200 or response.status_code >= 300
+                or response.status_code == 204
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in mimetypes):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        # Bodies with a strong ETag never change, so compress them once
+        etag, weak = response.get_etag()
+        cache_key = (etag, encoding) if etag and not weak else None
+        with cache_lock:
+            compressed = cached_bodies.get(cache_key) if cache_key else None
+
+        if compressed is None:
+            data = response.get_data()
+            if len(data) < app.config['COMPRESS_MIN_SIZE']:
+                return response
+            compressed = compress_body(
+                data, encoding, app.config['COMPRESS_LEVEL'], app.config['COMPRESS_BROTLI_QUALITY']
+            )
+            if cache_key:
+                with cache_lock:
+                    if len(cached_bodies) >= _MAX_CACHED_BODIES:
+                        cached_bodies.clear()
+                    cached_bodies[cache_key] = compressed
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if cache_key:
+            # A strong validator must differ between content-codings; the
+            # encoded variant is revalidated against its own ETag here since
+            # the view only knew the identity one
+            response.set_etag(encoded_etag(etag, encoding))
+            response.make_conditional(request)
+        return response
@@ -27,4 +27,12 @@ class ApiError(RouteFinderException):
 
 class ConfigurationError(RouteFinderException):
     """Exception raised for configuration errors."""
-    pass
\ No newline at end of file
+    pass
+
+class CircuitOpenError(RouteFinderException):
+    """Exception raised when calls to a failing upstream service are cut off."""
+    pass
+
+class DeadlineExceededError(RouteFinderException):
+    """Exception raised when a request runs out of its time budget."""
+    pass
@@ -0,0 +1,78 @@
+"""
+JSON provider for the Flask application.
+Serializes responses with orjson when it is installed and the standard json
+module otherwise, and writes NumPy arrays such as route geometry with a
+limited number of decimals.
+"""
+
+import json
+from typing import Any
+import numpy as np
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+class RouteJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes NumPy values and prefers orjson.
+
+    Float arrays are rounded to the app's JSON_FLOAT_PRECISION decimals;
+    plain Python floats are written unchanged. Calls using json.dumps
+    options orjson does not support fall back to the standard library.
+    """
+
+    def default(self, o: Any) -> Any:
+        """Convert values the encoders do not support natively."""
+        if isinstance(o, np.ndarray):
+            if o.dtype.kind == 'f':
+                o = np.round(o, self._app.config['JSON_FLOAT_PRECISION'])
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, kwargs) -> Any:
+        """Map json.dumps keyword arguments to orjson options, or None if unsupported."""
+        options = orjson.OPT_NON_STR_KEYS
+        for key, value in kwargs.items():
+            if key == 'sort_keys':
+                options |= orjson.OPT_SORT_KEYS if value else 0
+            elif key == 'indent' and value == 2:
+                options |= orjson.OPT_INDENT_2
+            elif key == 'separators' and value == (',', ':'):
+                continue
+            elif key not in ('ensure_ascii', 'default'):
+                return None
+        return options
+
+    def _dumps_bytes(self, obj: Any, **kwargs) -> bytes:
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        options = self._orjson_options(kwargs) if orjson is not None else None
+        if options is None:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            return json.dumps(obj, **kwargs).encode('utf-8')
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=options)
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        """Serialize data as JSON text."""
+        return self._dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs) -> Any:
+        """Deserialize JSON text or bytes."""
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs) -> Response:
+        """Serialize data as a JSON response, skipping the str round trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = self._dumps_bytes(obj, indent=2)
+        else:
+            body = self._dumps_bytes(obj, separators=(',', ':'))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
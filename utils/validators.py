@@ -7,6 +7,7 @@ Validation utilities for input validation and data sanitization.
 """
 
 import re
+import unicodedata
 from typing import Any
 from utils.exceptions import ValidationError
 
@@ -72,7 +73,7 @@ def validate_coordinates(lat: float, lon: float) -> tuple:
     Raises:
         ValidationError: If coordinates are invalid
     """
-    if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
+    if any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in (lat, lon)):
         raise ValidationError("Coordinates must be numeric")
     
     if not (-90 <= lat <= 90):
@@ -127,4 +128,21 @@ def sanitize_string(value: str, max_length: int = 255) -> str:
     if len(value) > max_length:
         value = value[:max_length]
     
-    return value
\ No newline at end of file
+    return value
+
+def normalize_location(location: str) -> str:
+    """
+    Normalize a location string for use as a lookup key.
+    
+    Case, surrounding and repeated whitespace, and punctuation are ignored,
+    so " London ", "london" and "LONDON." all normalize to "london".
+    
+    Args:
+        location: Location string to normalize
+        
+    Returns:
+        Normalized location key
+    """
+    value = unicodedata.normalize('NFKC', location).casefold()
+    value = re.sub(r'[\W_]+', ' ', value)
+    return value.strip()
\ No newline at end of file